@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import user, data, game
+from app.api.api_v1.endpoints import user, data, game, service
 
 
 api_router = APIRouter()
@@ -12,3 +12,6 @@ api_router.include_router(
 api_router.include_router(
     game.router, prefix="/game", tags=['game', ]
         )
+api_router.include_router(
+    service.router, prefix="/service", tags=['service', ]
+        )
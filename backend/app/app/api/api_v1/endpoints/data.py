@@ -1,9 +1,12 @@
-from fastapi import status, Depends, APIRouter, HTTPException
-from app.schemas.scheme_user import User
+from typing import Optional, Union
+from fastapi import (
+    status, Depends, APIRouter, Header, HTTPException, Path, Response
+        )
 from app.schemas.scheme_game_current_api import CurrentGameDataApi
 from app.schemas.scheme_game_static import StaticGameData
+from app.schemas.scheme_user import User
 from app.crud import crud_game_static, crud_game_current
-from app.core import security_user, logic
+from app.core import security_user
 from app.config import settings
 
 
@@ -17,14 +20,29 @@ router = APIRouter()
     summary='Static game data',
     response_description="OK. As response you recieve static game data."
         )
-def get_static_data() -> StaticGameData:
-    """Get all static game data.
+def get_static_data(
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+        ) -> Union[StaticGameData, Response]:
+    """Get all static game data. Response has ETag header and
+    request with matched If-None-Match header gets 304 without body.
     """
+    etag = crud_game_static.static.get_static_etag()
+    if if_none_match is not None and (
+        if_none_match.strip() == '*'
+        or etag in [tag.strip() for tag in if_none_match.split(',')]
+            ):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={'ETag': etag, 'Cache-Control': 'no-cache'},
+                )
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
     return crud_game_static.static.get_static_game_data()
 
 
 @router.post(
-    "/current",
+    "/current/{game_id}",
     response_model=CurrentGameDataApi,
     status_code=status.HTTP_200_OK,
     responses=settings.CURRENT_DATA_ERRORS,
@@ -32,17 +50,20 @@ def get_static_data() -> StaticGameData:
     response_description="OK. As response you recieve current game data."
         )
 def get_current_data(
-    user: User = Depends(security_user.get_current_active_user)
-        ) -> CurrentGameDataApi:
+    game_id: str = Path(title="Game id"),
+    user: User = Depends(security_user.get_current_active_user),
+        ) -> Response:
     """Get all current game data (game statement) for current user.
+    Api view is stored with game, so it is sent without game logic.
     """
-    current = crud_game_current.game.get_last_game(user.login)
-
-    if current:
-        return logic.GameLogic(current).get_api_scheme()
-    else:
+    game = crud_game_current.game.get_api_view(game_id, user.login)
+    view = None if game is None else game.api_view
+    if game is not None and view is None:
+        view = crud_game_current.game.render_api_view(game_id, user.login)
+    if view is None:
         raise HTTPException(
             status_code=404,
-            detail="Cant find current game data in db. For start "
+            detail="Cant find game with this id in db. For start "
                    "new game use /game/create endpoint",
                 )
+    return Response(content=view, media_type='application/json')
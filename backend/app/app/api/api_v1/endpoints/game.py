@@ -1,9 +1,13 @@
 from fastapi import status, Depends, APIRouter, Query, HTTPException
 from typing import Optional
 from app.schemas.scheme_user import User
+from app.schemas.scheme_game_current_api import GameId, GamesList, GameSummary
 from app.crud import crud_game_current
-from app.core import security_user, logic
-from app.constructs import Factions, Groups, Agents
+from app.crud.crud_game_current import STEPS, PLAYERS, GROUPS, OBJECTIVES
+from app.core import security_user, logic, bot, inference
+from app.core.profiler import profiler
+from app.api import deps
+from app.constructs import Factions, Groups, Agents, Sides
 from app.config import settings
 
 
@@ -12,106 +16,137 @@ router = APIRouter()
 
 @router.post(
     "/create",
+    response_model=GameId,
     status_code=status.HTTP_201_CREATED,
     responses=settings.ACCESS_ERRORS,
     summary='Create new game',
-    response_description="Created. New game object created in db."
+    response_description="Created. New game object created in db. "
+                         "As response you recieve id of the game."
         )
 def create_new_game(
     user: User = Depends(security_user.get_current_active_user)
-        ) -> None:
+        ) -> GameId:
     """Create new game.
     """
-    crud_game_current.game.create_new_game(user.login)
+    game = crud_game_current.game.create_new_game(user.login)
+    return GameId(id=str(game.id))
+
+
+@router.get(
+    "/list",
+    response_model=GamesList,
+    status_code=status.HTTP_200_OK,
+    responses=settings.ACCESS_ERRORS,
+    summary='List games of current user',
+    response_description="OK. As response you recieve page of games, "
+                         "newest first."
+        )
+def list_games(
+    after: Optional[str] = Query(
+        default=None,
+        title="Id of last game of previous page",
+            ),
+    limit: int = Query(default=20, ge=1, le=100, title="Page size"),
+    user: User = Depends(security_user.get_current_active_user),
+        ) -> GamesList:
+    """List games of current user. Use **next** from response
+    as **after** to get next page.
+    """
+    games = crud_game_current.game.get_games(user.login, after, limit)
+    summaries = [
+        GameSummary(
+            id=str(game.id),
+            game_turn=game.steps.game_turn,
+            turn_phase=game.steps.turn_phase,
+            is_game_ends=game.steps.is_game_ends,
+            faction=game.players.player.faction,
+                )
+        for game in games
+            ]
+    return GamesList(
+        games=summaries,
+        next=summaries[-1].id if len(summaries) == limit else None,
+            )
 
 
 @router.patch(
-    "/preset",
+    "/{game_id}/preset",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Preset faction before game start and deal a mission card',
     response_description="Ok. Faction is set."
         )
-def preset(
+async def preset(
     q: Factions = Query(
         title="Preset faction",
             ),
-    user: User = Depends(security_user.get_current_active_user),
+    play: deps.Play = Depends(deps.GameMove(PLAYERS, OBJECTIVES)),
         ) -> None:
     """Preset faction of player. Next deal a mission card.
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).set_faction(q).set_mission_card()
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(lambda game_logic: game_logic.set_faction(q).set_mission_card())
 
 
 @router.patch(
-    "/next_turn",
+    "/{game_id}/next_turn",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Go to next turn',
     response_description="Ok.",
         )
-def next_turn(
-    user: User = Depends(security_user.get_current_active_user),
+async def next_turn(
+    play: deps.Play = Depends(deps.GameMove(STEPS)),
         ) -> None:
     """Change turn number to next
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).set_next_turn()
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(logic.GameLogic.set_next_turn)
 
 
 @router.patch(
-    "/next_phase",
+    "/{game_id}/next_phase",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Go to next phase',
     response_description="Ok.",
         )
-def next_phase(
-    user: User = Depends(security_user.get_current_active_user),
+async def next_phase(
+    play: deps.Play = Depends(deps.GameMove()),
         ) -> None:
     """Change phase to next
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).chek_phase_conditions_before_next() \
+    def move(game_logic: logic.GameLogic) -> logic.GameLogic:
+        return game_logic.chek_phase_conditions_before_next() \
             .set_next_phase() \
             .set_phase_conditions_after_next()
-    crud_game_current.game.save_game_logic(game_logic)
+
+    await play(move)
 
 
 @router.patch(
-    "/phase/briefing/analyst_look",
+    "/{game_id}/phase/briefing/analyst_look",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Look top three cards of group deck with analyst ability',
     response_description="Ok. Data is changed",
         )
-def analyst_get(
-    user: User = Depends(security_user.get_current_active_user),
+async def analyst_get(
+    play: deps.Play = Depends(deps.GameMove(STEPS, PLAYERS, GROUPS)),
         ) -> None:
     """Look top three cards of group deck and change current game data
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).play_analyst_for_look_the_top()
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(logic.GameLogic.play_analyst_for_look_the_top)
 
 
 @router.patch(
-    "/phase/briefing/analyst_arrange",
+    "/{game_id}/phase/briefing/analyst_arrange",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Arrange top three cards of group deck with analyst ability',
     response_description="Ok. Data is changed",
         )
-def analyst_arrange(
+async def analyst_arrange(
     top: list[Groups],
-    user: User = Depends(security_user.get_current_active_user),
+    play: deps.Play = Depends(deps.GameMove(STEPS, PLAYERS, GROUPS)),
         ) -> None:
     """Arrange top three cards of group deck and change current game data
     """
@@ -121,53 +156,47 @@ def analyst_arrange(
             detail="You must give exactly tree cards id "
                    f"in list to rearrange top deck. You given {len(top)}."
                 )
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).play_analyst_for_arrange_the_top(top)
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(
+        lambda game_logic: game_logic.play_analyst_for_arrange_the_top(top)
+            )
 
 
 @router.patch(
-    "/phase/planning/agent_x",
+    "/{game_id}/phase/planning/agent_x",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Set agent X for current turn',
     response_description="Ok. Agent X is set",
         )
-def agent_x(
+async def agent_x(
     q: Agents = Query(title="Agent X id"),
-    user: User = Depends(security_user.get_current_active_user),
+    play: deps.Play = Depends(deps.GameMove(STEPS, PLAYERS)),
         ) -> None:
     """Set agent X
     Args:
         q (Agents): agent for current turn
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).set_agent_x(q)
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(lambda game_logic: game_logic.set_agent_x(q))
 
 
 @router.patch(
-    "/influence_struggle/recruit",
+    "/{game_id}/influence_struggle/recruit",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Recruit a group in a influence-struggle subgame',
     response_description="Ok. Group is recruited",
         )
-def recruit(user: User = Depends(security_user.get_current_active_user),
-    ) -> None:
+async def recruit(
+    play: deps.Play = Depends(deps.GameMove(STEPS, PLAYERS, GROUPS)),
+        ) -> None:
     """The player draw a group card from top of group deck.
     This group is recruited by this player.
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).recruit_group()
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(logic.GameLogic.recruit_group)
 
 
 @router.patch(
-    "/influence_struggle/activate",
+    "/{game_id}/influence_struggle/activate",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Activate a group in a influence-struggle subgame',
@@ -176,8 +205,8 @@ def recruit(user: User = Depends(security_user.get_current_active_user),
 def activate(
     source: Groups,
     target: Optional[Groups],
-    user: User = Depends(security_user.get_current_active_user),
-    ) -> None:
+    play: deps.Play = Depends(deps.GameMove(STEPS, PLAYERS)),
+        ) -> None:
     """Activate abilitie of choosen group card.
 
     Args:
@@ -194,36 +223,80 @@ def activate(
 
 
 @router.patch(
-    "/influence_struggle/pass",
+    "/{game_id}/influence_struggle/pass",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Pass in a influence-struggle subgame',
     response_description="Ok. Abilitie is activated",
         )
-def passing(
-    user: User = Depends(security_user.get_current_active_user),
-    ) -> None:
+async def passing(
+    play: deps.Play = Depends(deps.GameMove(STEPS, PLAYERS, GROUPS)),
+        ) -> None:
     """Pass in a influence-struggle subgame.
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).pass_influence()
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(logic.GameLogic.pass_influence)
 
 
 @router.patch(
-    "/influence_struggle/nuclear_escalation",
+    "/{game_id}/influence_struggle/nuclear_escalation",
     status_code=status.HTTP_200_OK,
     responses=settings.NEXT_ERRORS,
     summary='Play nuclear escalation abilitie',
     response_description="Ok. Abilitie is used",
         )
-def nuclear_escalation(
-    user: User = Depends(security_user.get_current_active_user),
-    ) -> None:
+async def nuclear_escalation(
+    play: deps.Play = Depends(deps.GameMove()),
+        ) -> None:
     """Activate nuclear escalation abilitie.
     """
-    game_logic = logic.GameLogic(
-        crud_game_current.game.get_last_game(user.login)
-            ).nuclear_escalation()
-    crud_game_current.game.save_game_logic(game_logic)
+    await play(logic.GameLogic.nuclear_escalation)
+
+
+@router.patch(
+    "/{game_id}/opponent/bot",
+    status_code=status.HTTP_200_OK,
+    responses=settings.NEXT_ERRORS,
+    summary='Opponent bot makes a move',
+    response_description="Ok. Opponent action is applied",
+        )
+async def opponent_bot(
+    play: deps.Play = Depends(deps.GameMove()),
+        ) -> None:
+    """Opponent bot searches for best action and plays it.
+    Think time is limited by bot settings.
+    """
+    def move(game_logic: logic.GameLogic) -> None:
+        if bot.bot.play(game_logic, Sides.OPPONENT) is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Opponent has no available actions."
+                    )
+
+    await play(move)
+
+
+@router.patch(
+    "/{game_id}/opponent/policy",
+    status_code=status.HTTP_200_OK,
+    responses=settings.NEXT_ERRORS,
+    summary='Opponent policy makes a move',
+    response_description="Ok. Opponent action is applied",
+        )
+async def opponent_policy(
+    play: deps.Play = Depends(deps.GameMove()),
+        ) -> None:
+    """Opponent plays most probable action of policy. Decisions of
+    concurrent requests are evaluated together in one batch.
+    """
+    async def move(game_logic: logic.GameLogic) -> None:
+        action = await inference.policy.choose_action(game_logic, Sides.OPPONENT)
+        if action is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Opponent has no available actions."
+                    )
+        await profiler.run_in_threadpool(
+            bot.bot.apply_action, game_logic, action, Sides.OPPONENT
+                )
+
+    await play(move)
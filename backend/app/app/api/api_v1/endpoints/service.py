@@ -0,0 +1,105 @@
+import asyncio
+from typing import Optional
+from fastapi import status, Depends, APIRouter, Query, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.schemas.scheme_user import User
+from app.core import security_user
+from app.core.metrics import registry
+from app.core.profiler import profiler
+from app.crud import crud_game_archive
+from app.config import settings
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    summary='Prometheus metrics',
+    response_description="OK. As response you recieve metrics "
+                         "in prometheus text format."
+        )
+def get_metrics() -> PlainTextResponse:
+    """Get metrics of current worker process.
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type='text/plain; version=0.0.4; charset=utf-8',
+            )
+
+
+@router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    responses=settings.ADMIN_ERRORS,
+    summary='Profile requests of current worker',
+    response_description="OK. As response you recieve collapsed stacks, "
+                         "compatible with flamegraph tools."
+        )
+async def profile(
+    seconds: float = Query(
+        default=10.0,
+        gt=0,
+        le=settings.profiler_max_seconds,
+        title="Profiling duration in seconds",
+            ),
+    rate: float = Query(
+        default=1.0,
+        gt=0,
+        le=1,
+        title="Fraction of profiled requests",
+            ),
+    route: Optional[str] = Query(
+        default=None,
+        title="Profile only routes with this path prefix",
+            ),
+    interval: float = Query(
+        default=5.0,
+        ge=1,
+        le=1000,
+        title="Sampling interval in milliseconds",
+            ),
+    user: User = Depends(security_user.get_current_admin_user),
+        ) -> PlainTextResponse:
+    """Sample stacks of requests, handled by current worker for
+    given duration. Result is in collapsed stacks format:
+
+    - **route;frame;frame count** on each line
+    """
+    if not settings.profiler_enabled:
+        raise HTTPException(
+            status_code=409,
+            detail="Profiler is disabled."
+                )
+    try:
+        profiler.start(rate=rate, route=route, interval=interval / 1000)
+    except RuntimeError:
+        raise HTTPException(
+            status_code=409,
+            detail="Profiler is running yet."
+                )
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        result = profiler.stop()
+
+    return PlainTextResponse(result)
+
+
+@router.post(
+    "/archive",
+    status_code=status.HTTP_200_OK,
+    responses=settings.ADMIN_ERRORS,
+    summary='Archive finished and expired games',
+    response_description="OK. As response you recieve count of archived games."
+        )
+def archive_games(
+    user: User = Depends(security_user.get_current_admin_user),
+        ) -> dict[str, int]:
+    """Move all finished and expired games from current games
+    to archive.
+    """
+    return {'archived': crud_game_archive.archive.archive_all()}
@@ -0,0 +1,55 @@
+from functools import partial
+from typing import Any, Awaitable, Callable
+from fastapi import Depends, HTTPException, Path
+from app.schemas.scheme_user import User
+from app.models.model_game_current import CurrentGameData
+from app.crud import crud_game_current
+from app.core import security_user, actors
+from app.core.actors import Move
+
+
+def get_game(
+    game_id: str = Path(title="Game id"),
+    user: User = Depends(security_user.get_current_active_user),
+        ) -> CurrentGameData:
+    """Get game of current user by id from path
+    """
+    game = crud_game_current.game.get_game(game_id, user.login)
+
+    if game is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Cant find game with this id in db. For start "
+                   "new game use /game/create endpoint",
+                )
+
+    return game
+
+
+# play: move -> result of move, that is saved
+Play = Callable[[Move], Awaitable[Any]]
+
+
+class GameMove:
+    """Dependency, that plays moves in game of current user by id from
+    path. Without game actors game is loaded with only parts of game,
+    that are used by action, and is saved only by these parts.
+    """
+
+    def __init__(self, *fields: str) -> None:
+        """
+        Args:
+            fields (str): parts of game document, that action reads
+                          and writes, i.e. crud_game_current.STEPS.
+                          Default to whole game
+        """
+        self.fields = fields or None
+
+    def __call__(
+        self,
+        game_id: str = Path(title="Game id"),
+        user: User = Depends(security_user.get_current_active_user),
+            ) -> Play:
+        return partial(
+            actors.actors.play, game_id, user.login, fields=self.fields
+                )
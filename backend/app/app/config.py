@@ -1,11 +1,18 @@
 import toml
-from pydantic import BaseSettings
-from typing import Optional, Type
+from pydantic import (
+    BaseSettings, PositiveInt, NonNegativeInt, PositiveFloat, NonNegativeFloat,
+    validator, root_validator
+        )
+from typing import Optional, Type, Union, Any
 from app.schemas import scheme_errors
 
 
 poetry_data = toml.load('pyproject.toml')['tool']['poetry']
 ErrorType = dict[int, dict[str, Type[scheme_errors.HttpErrorMessage]]]
+MONGODB_COMPRESSORS = ('zstd', 'snappy', 'zlib')
+MONGODB_READ_PREFERENCES = (
+    'primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest',
+        )
 
 
 class Settings(BaseSettings):
@@ -16,8 +23,47 @@ class Settings(BaseSettings):
     mongodb_url: str
     db_name: str = 'prod-db'
     test_mongodb_url: Optional[str] = None
+
+    # db connection pool settings
+    mongodb_max_pool_size: PositiveInt = 100
+    mongodb_min_pool_size: NonNegativeInt = 0
+    mongodb_wait_queue_timeout_ms: Optional[PositiveInt] = None
+    mongodb_server_selection_timeout_ms: PositiveInt = 30000
+    mongodb_compressors: list[str] = []
+    mongodb_write_concern: Optional[Union[NonNegativeInt, str]] = None
+    mongodb_read_preference: str = 'primary'
     access_token_expires_minites: Optional[int] = None
 
+    # monitoring
+    timing_enabled: bool = False
+    profiler_enabled: bool = False
+    profiler_max_seconds: float = 60.0
+
+    # games archive
+    game_expire_seconds: PositiveInt = 259200
+    archive_enabled: bool = False
+    archive_interval_seconds: PositiveInt = 600
+    archive_batch_size: PositiveInt = 100
+
+    # opponent bot
+    bot_think_seconds: PositiveFloat = 1.0
+    bot_workers: PositiveInt = 1
+
+    # opponent policy inference
+    policy_path: Optional[str] = None
+    inference_max_batch_size: PositiveInt = 64
+    inference_max_wait_ms: NonNegativeFloat = 5.0
+
+    # per-game actors, that own live games and coalesce writes
+    game_actors_enabled: bool = False
+    game_actor_flush_ms: NonNegativeFloat = 5.0
+    game_actor_idle_seconds: PositiveFloat = 60.0
+
+    # front router, that sends requests of same game to same worker
+    router_workers: list[str] = []
+    router_vnodes: PositiveInt = 64
+    router_timeout_seconds: PositiveFloat = 30.0
+
     # JWT
     secret_key: str
     algorithm: str
@@ -39,6 +85,10 @@ class Settings(BaseSettings):
             "name": "game",
             "description": "Game processing api",
         },
+        {
+            "name": "service",
+            "description": "Service and monitoring api",
+        },
     ]
 
     # open-api errors
@@ -52,6 +102,11 @@ class Settings(BaseSettings):
         401: {'model': scheme_errors.HttpError401},
         404: {'model': scheme_errors.HttpError404},
             }
+    ADMIN_ERRORS: ErrorType = {
+        401: {'model': scheme_errors.HttpError401},
+        403: {'model': scheme_errors.HttpError403},
+        409: {'model': scheme_errors.HttpError409},
+            }
     NEXT_ERRORS: ErrorType = {
         401: {'model': scheme_errors.HttpError401},
         404: {'model': scheme_errors.HttpError404},
@@ -72,5 +127,60 @@ class Settings(BaseSettings):
     user2_password: Optional[str] = None
     user2_hashed_password: Optional[str] = None
 
+    @validator('mongodb_compressors')
+    def compressors_must_be_supported(cls, v: list[str]) -> list[str]:
+        for compressor in v:
+            if compressor not in MONGODB_COMPRESSORS:
+                raise ValueError(
+                    f'Unsupported compressor {compressor}. '
+                    f'Use one of {MONGODB_COMPRESSORS}'
+                        )
+        return v
+
+    @validator('mongodb_write_concern')
+    def write_concern_must_be_number_or_majority(
+        cls,
+        v: Optional[Union[int, str]],
+            ) -> Optional[Union[int, str]]:
+        if isinstance(v, str) and v != 'majority':
+            raise ValueError("Write concern must be number of nodes or 'majority'")
+        return v
+
+    @validator('mongodb_read_preference')
+    def read_preference_must_be_supported(cls, v: str) -> str:
+        if v not in MONGODB_READ_PREFERENCES:
+            raise ValueError(
+                f'Unsupported read preference {v}. '
+                f'Use one of {MONGODB_READ_PREFERENCES}'
+                    )
+        return v
+
+    @root_validator(skip_on_failure=True)
+    def min_pool_size_must_be_less_than_max(
+        cls,
+        values: dict[str, Any],
+            ) -> dict[str, Any]:
+        if values['mongodb_min_pool_size'] > values['mongodb_max_pool_size']:
+            raise ValueError('Min pool size is greater than max pool size')
+        return values
+
+    @property
+    def mongodb_connection_kwargs(self) -> dict[str, Any]:
+        """Get mongodb client connection pool options
+        """
+        kwargs: dict[str, Any] = {
+            'maxPoolSize': self.mongodb_max_pool_size,
+            'minPoolSize': self.mongodb_min_pool_size,
+            'serverSelectionTimeoutMS': self.mongodb_server_selection_timeout_ms,
+            'readPreference': self.mongodb_read_preference,
+                }
+        if self.mongodb_wait_queue_timeout_ms is not None:
+            kwargs['waitQueueTimeoutMS'] = self.mongodb_wait_queue_timeout_ms
+        if self.mongodb_compressors:
+            kwargs['compressors'] = ','.join(self.mongodb_compressors)
+        if self.mongodb_write_concern is not None:
+            kwargs['w'] = self.mongodb_write_concern
+        return kwargs
+
 
 settings = Settings()
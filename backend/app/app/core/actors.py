@@ -0,0 +1,289 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, Sequence, Union
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.crud import crud_game_current
+from app.core.logic import GameLogic
+from app.core.metrics import registry
+from app.core.profiler import profiler, profiled_route
+from app.config import settings
+
+
+# move: game logic -> result. Move changes game logic in place
+Move = Callable[[GameLogic], Union[Any, Awaitable[Any]]]
+
+GAME_ACTORS = registry.gauge(
+    'coldwar_game_actors',
+    'Per-game actors, that own live games',
+        )
+GAME_ACTOR_FLUSH_MOVES = registry.histogram(
+    'coldwar_game_actor_flush_moves',
+    'Moves saved to db by one write of game actor',
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+        )
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail="Cant find game with this id in db. For start "
+               "new game use /game/create endpoint",
+            )
+
+
+async def _apply(move: Move, game_logic: GameLogic) -> Any:
+    if asyncio.iscoroutinefunction(move):
+        return await move(game_logic)
+    return await profiler.run_in_threadpool(move, game_logic)
+
+
+class GameActor:
+    """Owner of live game of player. Moves from mailbox are applied
+    one by one in order of arrival. Changed game is saved not later than
+    flush window after first unsaved move, so moves, that came in window,
+    are saved with one write. Move is done, when it is saved.
+    """
+
+    def __init__(
+        self,
+        game_id: str,
+        login: str,
+        flush_ms: float,
+        idle_seconds: float,
+        on_stop: Callable[['GameActor'], None],
+            ) -> None:
+        self.game_id = game_id
+        self.login = login
+        self.flush_ms = flush_ms
+        self.idle_seconds = idle_seconds
+        self.game_logic: Optional[GameLogic] = None
+        self.mailbox: asyncio.Queue = asyncio.Queue()
+        self.stopped = False
+        self._on_stop = on_stop
+        self._unsaved: list[tuple[asyncio.Future, Any]] = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        GAME_ACTORS.inc()
+
+    def send(self, move: Move) -> 'asyncio.Future[Any]':
+        """Put move to mailbox
+
+        Args:
+            move (Move): move
+
+        Returns:
+            asyncio.Future[Any]: future of move result, that is done
+                                 after game is saved
+        """
+        future = asyncio.get_running_loop().create_future()
+        # actor task doesn't share context of request, so profiled route
+        # is passed with move
+        self.mailbox.put_nowait((move, future, profiled_route.get()))
+        return future
+
+    def _load(self) -> GameLogic:
+        game = crud_game_current.game.get_game(self.game_id, self.login)
+        if game is None:
+            raise _not_found()
+        return GameLogic(game)
+
+    async def _get_game_logic(self) -> GameLogic:
+        if self.game_logic is not None:
+            return self.game_logic
+        game_logic = await profiler.run_in_threadpool(self._load)
+        self.game_logic = game_logic
+        return game_logic
+
+    async def _play(
+        self,
+        move: Move,
+        future: asyncio.Future,
+        route: Optional[str],
+            ) -> None:
+        token = profiled_route.set(route)
+        try:
+            await self._play_move(move, future)
+        finally:
+            profiled_route.reset(token)
+
+    async def _play_move(self, move: Move, future: asyncio.Future) -> None:
+        try:
+            game_logic = await self._get_game_logic()
+            state_hash = game_logic.state_hash
+            result = await _apply(move, game_logic)
+        except Exception as exc:
+            # move can change game before it is rejected. If state hash is
+            # changed, game is changed partially, so live game and unsaved
+            # moves are dropped
+            if not isinstance(exc, HTTPException) or (
+                self.game_logic is not None
+                and self.game_logic.state_hash != state_hash
+                    ):
+                self._drop(exc)
+            if not future.done():
+                future.set_exception(exc)
+            return
+        self._unsaved.append((future, result))
+
+    async def _flush(self) -> None:
+        game_logic = self.game_logic
+        unsaved, self._unsaved = self._unsaved, []
+        if game_logic is None or not unsaved:
+            return
+        try:
+            await run_in_threadpool(
+                crud_game_current.game.save_game_logic, game_logic, True
+                    )
+        except Exception as exc:
+            self._unsaved = unsaved
+            self._drop(exc)
+            return
+        GAME_ACTOR_FLUSH_MOVES.observe(len(unsaved))
+        for future, result in unsaved:
+            if not future.done():
+                future.set_result(result)
+
+    def _drop(self, exc: BaseException) -> None:
+        """Drop live game and fail unsaved moves. Game is loaded again
+        by next move.
+        """
+        self.game_logic = None
+        unsaved, self._unsaved = self._unsaved, []
+        for future, _ in unsaved:
+            if not future.done():
+                future.set_exception(exc)
+
+    def _stop(self) -> None:
+        self.stopped = True
+        self._on_stop(self)
+        GAME_ACTORS.dec()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline: Optional[float] = None
+        play: Optional[asyncio.Task] = None
+        try:
+            while True:
+                if deadline is not None and loop.time() >= deadline:
+                    await self._flush()
+                    deadline = None
+                if not self.mailbox.empty():
+                    move, future, route = self.mailbox.get_nowait()
+                else:
+                    timeout = self.idle_seconds if deadline is None \
+                        else deadline - loop.time()
+                    try:
+                        move, future, route = await asyncio.wait_for(
+                            self.mailbox.get(), timeout
+                                )
+                    except asyncio.TimeoutError:
+                        if deadline is None and self.mailbox.empty():
+                            return
+                        continue
+                # move is shielded, so cancel of actor doesn't leave move
+                # running in thread, while game is saved
+                play = loop.create_task(self._play(move, future, route))
+                await asyncio.shield(play)
+                if self._unsaved and deadline is None:
+                    deadline = loop.time() + self.flush_ms / 1000
+        except asyncio.CancelledError:
+            if play is not None and not play.done():
+                await play
+            await self._flush()
+            raise
+        finally:
+            self._stop()
+            while not self.mailbox.empty():
+                _, future, _ = self.mailbox.get_nowait()
+                future.cancel()
+
+
+class GameActors:
+    """Per-game actors of worker. Actor is started by first move to game
+    and is stopped, when game is idle.
+    """
+
+    def __init__(self, flush_ms: float = 5.0, idle_seconds: float = 60.0) -> None:
+        self.flush_ms = flush_ms
+        self.idle_seconds = idle_seconds
+        self._actors: dict[tuple[str, str], GameActor] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, game_id: str, login: str) -> GameActor:
+        """Get running actor of game or start new one
+
+        Args:
+            game_id (str): game id
+            login (str): player login
+
+        Returns:
+            GameActor
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._actors = {}
+        key = (game_id, login)
+        actor = self._actors.get(key)
+        if actor is None or actor.stopped:
+            actor = self._actors[key] = GameActor(
+                game_id, login, self.flush_ms, self.idle_seconds, self._discard
+                    )
+        return actor
+
+    def _discard(self, actor: GameActor) -> None:
+        key = (actor.game_id, actor.login)
+        if self._actors.get(key) is actor:
+            del self._actors[key]
+
+    async def play(
+        self,
+        game_id: str,
+        login: str,
+        move: Move,
+        fields: Optional[Sequence[str]] = None,
+            ) -> Any:
+        """Play move in game of player. If actors are enabled, move is sent
+        to actor of game, else game is loaded, changed and saved by request.
+
+        Args:
+            game_id (str): game id
+            login (str): player login
+            move (Move): move
+            fields (Sequence[str], optional): parts of game, that move reads
+                                              and writes. Used only without
+                                              actors. Default to whole game
+
+        Returns:
+            Any: result of move
+        """
+        if settings.game_actors_enabled:
+            return await self.get(game_id, login).send(move)
+
+        game = await profiler.run_in_threadpool(
+            crud_game_current.game.get_game, game_id, login, fields
+                )
+        if game is None:
+            raise _not_found()
+        game_logic = await profiler.run_in_threadpool(GameLogic, game, fields)
+        result = await _apply(move, game_logic)
+        await profiler.run_in_threadpool(
+            crud_game_current.game.save_game_logic, game_logic
+                )
+        return result
+
+    async def stop(self) -> None:
+        """Stop all actors. Moves in progress are finished and unsaved
+        moves are saved before stop.
+        """
+        actors = list(self._actors.values())
+        for actor in actors:
+            actor._task.cancel()
+        await asyncio.gather(
+            *(actor._task for actor in actors), return_exceptions=True
+                )
+
+
+actors = GameActors(
+    settings.game_actor_flush_ms,
+    settings.game_actor_idle_seconds,
+        )
@@ -0,0 +1,764 @@
+import numpy as np
+from itertools import permutations
+from typing import Any, Optional, Sequence, Union
+from app.schemas.scheme_game_current import (
+    CurrentGameDataProcessor, PlayerProcessor, OpponentProcessor
+        )
+from app.constructs import (
+    Phases, Agents, Groups, Objectives, Factions, MilitaryGroups,
+    AwaitingAbilities
+        )
+
+
+PHASES = Phases.get_values()
+AGENTS = Agents.get_values()
+GROUPS = Groups.get_values()
+OBJECTIVES = Objectives.get_values()
+FACTIONS = Factions.get_values()
+
+# indexes by value, used to decode stored games
+_PHASES = {phase: num for num, phase in enumerate(PHASES)}
+_FACTIONS = {faction: num for num, faction in enumerate(FACTIONS)}
+_AGENTS = {agent: num for num, agent in enumerate(AGENTS)}
+_GROUPS = {group: num for num, group in enumerate(GROUPS)}
+_OBJECTIVES = {objective: num for num, objective in enumerate(OBJECTIVES)}
+
+BRIEFING = PHASES.index(Phases.BRIEFING.value)
+PLANNING = PHASES.index(Phases.PLANNING.value)
+INFLUENCE = PHASES.index(Phases.INFLUENCE.value)
+CEASEFIRE = PHASES.index(Phases.CEASEFIRE.value)
+DEBRIFIENG = PHASES.index(Phases.DEBRIFIENG.value)
+DETENTE = PHASES.index(Phases.DETENTE.value)
+
+# card zones
+ZONE_OUT = 0
+ZONE_DECK = 1
+ZONE_PILE = 2
+ZONE_PLAYER = 3
+ZONE_OPPONENT = 4
+ZONE_MISSION = 5
+
+# agent flags
+IN_HEADQUARTER = 1
+TERMINATED = 2
+ON_LEAVE = 4
+AGENT_X = 8
+REVEALED = 16
+
+# awaiting abilities flags
+AWAITING_DOUBLE = 1
+AWAITING_ANALYST = 2
+
+DEPUTY = AGENTS.index(Agents.DEPUTY.value)
+NUCLEARESCALATION = OBJECTIVES.index(Objectives.NUCLEARESCALATION.value)
+MILITARY = np.array([group in MilitaryGroups.get_values() for group in GROUPS])
+
+# fixed action space of one side: (action, argument)
+ARRANGES = list(permutations(range(3)))
+ACTIONS = (
+    ('next_phase', None),
+    ('next_turn', None),
+    ('analyst_look', None),
+    *(('analyst_arrange', order) for order in range(len(ARRANGES))),
+    *(('agent_x', agent) for agent in range(len(AGENTS))),
+    ('recruit', None),
+    ('pass', None),
+    ('nuclear_escalation', None),
+        )
+
+
+class BatchGame:
+    """Batch of games, represented as NumPy arrays.
+
+    Applies the same rules as GameLogic to all games of batch at once.
+    Every action gets a mask of games and returns a mask of games,
+    where action is applied. Games, where action is not available
+    (GameLogic raises 409), are not changed.
+
+    Sides are indexed as 0 - player, 1 - opponent. Cards are indexed
+    in order of constructs enumerations. Decks are stored as zone code
+    and position of every card, top of deck is card with max position.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.turn = np.ones(size, np.int16)
+        self.phase = np.full(size, BRIEFING, np.int8)
+        self.is_game_ends = np.zeros(size, bool)
+        self.faction = np.full((size, 2), -1, np.int8)
+        self.score = np.zeros((size, 2), np.int16)
+        self.has_balance = np.zeros((size, 2), bool)
+        self.influence_pass = np.zeros((size, 2), bool)
+        self.awaiting = np.zeros((size, 2), np.uint8)
+        self.agents = np.full((size, 2, len(AGENTS)), IN_HEADQUARTER, np.uint8)
+        self.group_zone = np.full((size, len(GROUPS)), ZONE_OUT, np.int8)
+        self.group_pos = np.full((size, len(GROUPS)), -1, np.int8)
+        self.group_revealed = np.zeros((size, len(GROUPS), 2), bool)
+        self.objective_zone = np.full((size, len(OBJECTIVES)), ZONE_OUT, np.int8)
+        self.objective_pos = np.full((size, len(OBJECTIVES)), -1, np.int8)
+
+    FIELDS = (
+        'turn', 'phase', 'is_game_ends', 'faction', 'score', 'has_balance',
+        'influence_pass', 'awaiting', 'agents', 'group_zone', 'group_pos',
+        'group_revealed', 'objective_zone', 'objective_pos',
+            )
+
+    @classmethod
+    def from_processors(
+        cls,
+        procs: Sequence[CurrentGameDataProcessor],
+            ) -> 'BatchGame':
+        """Create batch from game processors
+
+        Args:
+            procs (Sequence[CurrentGameDataProcessor]): game processors
+
+        Returns:
+            BatchGame
+        """
+        batch = cls(len(procs))
+        for num, proc in enumerate(procs):
+            batch._encode(num, proc)
+        return batch
+
+    def _encode(self, num: int, proc: CurrentGameDataProcessor) -> None:
+        self.turn[num] = proc.steps.game_turn
+        self.phase[num] = PHASES.index(proc.steps.last_id)
+        self.is_game_ends[num] = proc.steps.is_game_ends
+
+        self.agents[num] = 0
+        users: tuple[Union[PlayerProcessor, OpponentProcessor], ...] = (
+            proc.players.player, proc.players.opponent
+                )
+        for side, user in enumerate(users):
+            self.faction[num, side] = -1 if user.faction is None \
+                else FACTIONS.index(user.faction)
+            self.score[num, side] = user.score
+            self.has_balance[num, side] = user.has_balance
+            self.influence_pass[num, side] = user.influence_pass
+            abilities = user.awaiting_abilities
+            self.awaiting[num, side] = \
+                AWAITING_DOUBLE * (AwaitingAbilities.DOUBLE in abilities) \
+                | AWAITING_ANALYST * (AwaitingAbilities.ANALYST in abilities)
+            for agent in user.agents.current:
+                self.agents[num, side, AGENTS.index(agent.id)] = \
+                    IN_HEADQUARTER * agent.is_in_headquarter \
+                    | TERMINATED * agent.is_terminated \
+                    | ON_LEAVE * agent.is_on_leave \
+                    | AGENT_X * agent.is_agent_x \
+                    | REVEALED * agent.is_revealed
+
+        groups = proc.decks.groups
+        for pos, card in enumerate(groups.current):
+            ind = GROUPS.index(card.id)
+            self.group_zone[num, ind] = ZONE_DECK
+            self.group_pos[num, ind] = pos
+            self.group_revealed[num, ind] = (
+                card.is_revealed_to_player, card.is_revealed_to_opponent
+                    )
+        for group in groups.pile:
+            group = getattr(group, 'id', group)
+            self.group_zone[num, GROUPS.index(group)] = ZONE_PILE
+        for zone, owned in (
+            (ZONE_PLAYER, groups.owned_by_player),
+            (ZONE_OPPONENT, groups.owned_by_opponent),
+                ):
+            for card in owned:
+                ind = GROUPS.index(card.id)
+                self.group_zone[num, ind] = zone
+                self.group_revealed[num, ind] = (
+                    card.is_revealed_to_player, card.is_revealed_to_opponent
+                        )
+
+        objectives = proc.decks.objectives
+        for pos, card in enumerate(objectives.current):
+            ind = OBJECTIVES.index(card.id)
+            self.objective_zone[num, ind] = ZONE_DECK
+            self.objective_pos[num, ind] = pos
+        if objectives.last is not None:
+            ind = OBJECTIVES.index(objectives.last.id)
+            if self.objective_zone[num, ind] == ZONE_OUT:
+                self.objective_zone[num, ind] = ZONE_MISSION
+        for zone, ids in (
+            (ZONE_PILE, objectives.pile),
+            (ZONE_PLAYER, objectives.owned_by_player),
+            (ZONE_OPPONENT, objectives.owned_by_opponent),
+                ):
+            for objective in ids:
+                self.objective_zone[num, OBJECTIVES.index(objective)] = zone
+
+    @classmethod
+    def from_documents(cls, docs: Sequence[dict[str, Any]]) -> 'BatchGame':
+        """Create batch from raw stored games (as from pymongo) without
+        game processors. Values are collected to flat lists and written
+        to arrays by one assignment per field.
+
+        Args:
+            docs (Sequence[dict[str, Any]]): stored CurrentGameData documents
+
+        Returns:
+            BatchGame
+        """
+        batch = cls(len(docs))
+        batch.agents[:] = 0
+        scalars: dict[str, list[Any]] = {
+            'turn': [], 'phase': [], 'is_game_ends': [],
+            'faction': [], 'score': [], 'has_balance': [],
+            'influence_pass': [], 'awaiting': [],
+                }
+        agents: list[tuple[int, int, int, int]] = []
+        groups: list[tuple[int, int, int, int, bool, bool]] = []
+        objectives: list[tuple[int, int, int, int]] = []
+
+        for num, doc in enumerate(docs):
+            steps = doc.get('steps', {})
+            scalars['turn'].append(steps.get('game_turn', 1))
+            scalars['phase'].append(
+                _PHASES[steps.get('turn_phase') or Phases.BRIEFING.value]
+                    )
+            scalars['is_game_ends'].append(steps.get('is_game_ends', False))
+
+            players = doc['players']
+            for side, user in enumerate((players['player'], players['opponent'])):
+                faction = user.get('faction')
+                scalars['faction'].append(-1 if faction is None else _FACTIONS[faction])
+                scalars['score'].append(user.get('score', 0))
+                scalars['has_balance'].append(user.get('has_balance', False))
+                scalars['influence_pass'].append(user.get('influence_pass', False))
+                abilities = user.get('awaiting_abilities', [])
+                scalars['awaiting'].append(
+                    AWAITING_DOUBLE * (AwaitingAbilities.DOUBLE.value in abilities)
+                    | AWAITING_ANALYST * (AwaitingAbilities.ANALYST.value in abilities)
+                        )
+                for agent in user.get('agents', {}).get('current', []):
+                    agents.append((
+                        num, side, _AGENTS[agent['name']],
+                        IN_HEADQUARTER * agent.get('is_in_headquarter', True)
+                        | TERMINATED * agent.get('is_terminated', False)
+                        | ON_LEAVE * agent.get('is_on_leave', False)
+                        | AGENT_X * agent.get('is_agent_x', False)
+                        | REVEALED * agent.get('is_revealed', False)
+                            ))
+
+            decks = doc.get('decks', {})
+            deck = decks.get('groups', {})
+            for pos, card in enumerate(deck.get('current', [])):
+                groups.append((
+                    num, _GROUPS[card['name']], ZONE_DECK, pos,
+                    card.get('is_revealed_to_player', False),
+                    card.get('is_revealed_to_opponent', False),
+                        ))
+            for card in deck.get('pile', []):
+                name = card['name'] if isinstance(card, dict) else card
+                groups.append((num, _GROUPS[name], ZONE_PILE, -1, False, False))
+            for zone, key in (
+                (ZONE_PLAYER, 'owned_by_player'),
+                (ZONE_OPPONENT, 'owned_by_opponent'),
+                    ):
+                for card in deck.get(key, []):
+                    groups.append((
+                        num, _GROUPS[card['name']], zone, -1,
+                        card.get('is_revealed_to_player', False),
+                        card.get('is_revealed_to_opponent', False),
+                            ))
+
+            deck = decks.get('objectives', {})
+            for pos, card in enumerate(deck.get('current', [])):
+                objectives.append((num, _OBJECTIVES[card['name']], ZONE_DECK, pos))
+            last = deck.get('last')
+            if last is not None:
+                objectives.append((num, _OBJECTIVES[last['name']], ZONE_MISSION, -1))
+            for zone, key in (
+                (ZONE_PILE, 'pile'),
+                (ZONE_PLAYER, 'owned_by_player'),
+                (ZONE_OPPONENT, 'owned_by_opponent'),
+                    ):
+                for name in deck.get(key, []):
+                    objectives.append((num, _OBJECTIVES[name], zone, -1))
+
+        for field, values in scalars.items():
+            array = getattr(batch, field)
+            array[:] = np.array(values, array.dtype).reshape(array.shape)
+
+        if agents:
+            nums, sides, inds, flags = np.array(agents).T
+            batch.agents[nums, sides, inds] = flags
+        if groups:
+            nums, inds, zones, poses, players, opponents = \
+                np.array(groups, np.int64).T
+            batch.group_zone[nums, inds] = zones
+            batch.group_pos[nums, inds] = poses
+            batch.group_revealed[nums, inds, 0] = players
+            batch.group_revealed[nums, inds, 1] = opponents
+        if objectives:
+            # mission card, that is in other zone, is not a mission
+            nums, inds, zones, poses = np.array(objectives).T
+            first = zones != ZONE_MISSION
+            for part in (~first, first):
+                batch.objective_zone[nums[part], inds[part]] = zones[part]
+                batch.objective_pos[nums[part], inds[part]] = poses[part]
+
+        return batch
+
+    def take(self, index: Sequence[int]) -> 'BatchGame':
+        """Get new batch with copy of given games
+
+        Args:
+            index (Sequence[int]): games indexes
+
+        Returns:
+            BatchGame
+        """
+        batch = BatchGame(len(index))
+        for field in self.FIELDS:
+            setattr(batch, field, getattr(self, field)[index].copy())
+        return batch
+
+    def _mask(self, mask: Optional[np.ndarray]) -> np.ndarray:
+        if mask is None:
+            return np.ones(self.size, bool)
+        return np.asarray(mask, bool)
+
+    def _pop(
+        self,
+        zone: np.ndarray,
+        pos: np.ndarray,
+        rows: np.ndarray,
+        target: int,
+            ) -> np.ndarray:
+        """Move top cards of decks of given games to target zones
+
+        Returns:
+            np.ndarray: indexes of moved cards
+        """
+        cards = pos[rows].argmax(axis=1)
+        zone[rows, cards] = target
+        pos[rows, cards] = -1
+        return cards
+
+    def deal_and_shuffle_decks(
+        self,
+        mask: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None,
+            ) -> np.ndarray:
+        """Deal and shuffle objective and group decks
+
+        Args:
+            mask (np.ndarray, optional): games mask. Default to all games
+            rng (np.random.Generator, optional): random generator
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        ok = self._mask(mask)
+        rows = np.flatnonzero(ok)
+        for zone, pos in (
+            (self.group_zone, self.group_pos),
+            (self.objective_zone, self.objective_pos),
+                ):
+            zone[rows] = ZONE_DECK
+            pos[rows] = rng.random((len(rows), zone.shape[1])) \
+                .argsort(axis=1).astype(np.int8)
+        self.group_revealed[rows] = False
+        return ok
+
+    def set_faction(
+        self,
+        faction: int,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Set player and opponent faction
+
+        Args:
+            faction (int): index of player faction
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        ok = self._mask(mask) & (self.faction[:, 0] == -1)
+        self.faction[ok, 0] = faction
+        self.faction[ok, 1] = 1 - faction
+        return ok
+
+    def set_next_turn(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Set next turn
+
+        Args:
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        ok = self._mask(mask) & ~self.is_game_ends & (self.phase == DETENTE)
+        self.turn[ok] += 1
+        self.phase[ok] = BRIEFING
+        return ok
+
+    def set_mission_card(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Set mission card on a turn
+
+        Args:
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        ok = self._mask(mask) & (self.objective_zone == ZONE_DECK).any(axis=1)
+        self.objective_zone[ok[:, None] & (self.objective_zone == ZONE_MISSION)] = \
+            ZONE_OUT
+        rows = np.flatnonzero(ok)
+        self._pop(self.objective_zone, self.objective_pos, rows, ZONE_MISSION)
+        return ok
+
+    def set_balance(
+        self,
+        mask: Optional[np.ndarray] = None,
+        coin: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None,
+            ) -> np.ndarray:
+        """Set balance to the turn
+
+        Args:
+            mask (np.ndarray, optional): games mask. Default to all games
+            coin (np.ndarray, optional): coin rolls (1 or 2) of games.
+                                         Default to random rolls
+            rng (np.random.Generator, optional): random generator
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        if coin is None:
+            rng = np.random.default_rng() if rng is None else rng
+            coin = rng.integers(1, 3, self.size)
+        mask = self._mask(mask)
+        first = self.turn == 1
+        lower = self.score[:, 0] < self.score[:, 1]
+        higher = self.score[:, 0] > self.score[:, 1]
+        ok = mask & (first | lower | higher)
+        val = np.where(first, coin == 1, lower)
+        self.has_balance[ok, 0] = val[ok]
+        self.has_balance[ok, 1] = ~val[ok]
+        return mask
+
+    def get_phase_blocked(self) -> np.ndarray:
+        """Get games, where phase can't be pushed to next
+
+        Returns:
+            np.ndarray: mask of blocked games
+        """
+        phase = self.phase
+        has_agent_x = (self.agents & AGENT_X).any(axis=2)
+        briefing = (self.faction == -1).any(axis=1) \
+            | ~(self.objective_zone == ZONE_MISSION).any(axis=1) \
+            | (self.has_balance[:, 0] == self.has_balance[:, 1]) \
+            | (self.awaiting & AWAITING_ANALYST).any(axis=1).astype(bool)
+        return self.is_game_ends \
+            | ((phase == BRIEFING) & briefing) \
+            | ((phase == PLANNING) & ~has_agent_x.all(axis=1)) \
+            | ((phase == INFLUENCE) & ~self.influence_pass.all(axis=1)) \
+            | (phase == DETENTE)
+
+    def set_next_phase(
+        self,
+        mask: Optional[np.ndarray] = None,
+        coin: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None,
+            ) -> np.ndarray:
+        """Check phase conditions, push phase to next and set
+        conditions of new phase
+
+        Args:
+            mask (np.ndarray, optional): games mask. Default to all games
+            coin (np.ndarray, optional): coin rolls for balance in briefing
+            rng (np.random.Generator, optional): random generator
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        ok = self._mask(mask) & ~self.get_phase_blocked()
+        self.phase[ok] += 1
+
+        briefing = ok & (self.phase == BRIEFING)
+        if briefing.any():
+            self._enter_briefing(briefing, coin, rng)
+
+        agents = self.agents
+        flags = agents[ok]
+        phase = self.phase[ok][:, None, None]
+
+        # influence: return all agents from on_leave to headquarter
+        on_leave = (phase == INFLUENCE) & (flags & ON_LEAVE).astype(bool)
+        flags[on_leave] &= ~np.uint8(ON_LEAVE | IN_HEADQUARTER | REVEALED)
+
+        # debriefing: open all agents in play
+        debriefing = (phase == DEBRIFIENG) & (flags & AGENT_X).astype(bool)
+        flags[debriefing] |= REVEALED
+
+        # detente: put agents to on_leave from play
+        detente = np.broadcast_to(phase == DETENTE, flags.shape)
+        deputy = np.zeros(flags.shape, bool)
+        deputy[:, :, DEPUTY] = True
+        flags[detente] &= ~np.uint8(AGENT_X)
+        flags[detente & deputy] = (flags[detente & deputy] | IN_HEADQUARTER) \
+            & ~np.uint8(REVEALED)
+        flags[detente & ~deputy] |= ON_LEAVE | REVEALED
+
+        agents[ok] = flags
+
+        # ceasefire: clear influence struggle pass
+        self.influence_pass[ok & (self.phase == CEASEFIRE)] = False
+
+        return ok
+
+    def _enter_briefing(
+        self,
+        mask: np.ndarray,
+        coin: Optional[np.ndarray],
+        rng: Optional[np.random.Generator],
+            ) -> None:
+        self.set_mission_card(mask)
+        self.set_balance(mask, coin, rng)
+        self.group_zone[mask] = ZONE_DECK
+        self.group_pos[mask] = np.arange(len(GROUPS), dtype=np.int8)
+        self.group_revealed[mask] = False
+
+    def _analyst_available(self, side: int, mask: Optional[np.ndarray]) -> np.ndarray:
+        return self._mask(mask) & (self.phase == BRIEFING) \
+            & (self.awaiting[:, side] & AWAITING_ANALYST).astype(bool)
+
+    def _top_three(self) -> np.ndarray:
+        """Get mask of top three cards of group decks
+        """
+        length = (self.group_zone == ZONE_DECK).sum(axis=1)
+        return (self.group_pos >= 0) & (self.group_pos >= (length - 3)[:, None])
+
+    def play_analyst_for_look_the_top(
+        self,
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Play analyst abylity for look the top cards
+
+        Args:
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        top = self._top_three()
+        revealed = self.group_revealed[:, :, side]
+        ok = self._analyst_available(side, mask) & (top & ~revealed).any(axis=1)
+        revealed[ok[:, None] & top] = True
+        return ok
+
+    def play_analyst_for_arrange_the_top(
+        self,
+        order: np.ndarray,
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Play analyst abylity for rearrange the top cards
+
+        Args:
+            order (np.ndarray): group indexes of arranged cards
+                                for every game, shape (size, 3)
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        order = np.broadcast_to(np.asarray(order), (self.size, 3))
+        length = (self.group_zone == ZONE_DECK).sum(axis=1)
+        top = np.sort(self.group_pos.argsort(axis=1)[:, -3:], axis=1)
+        ok = self._analyst_available(side, mask) & (length > 3) \
+            & (np.sort(order, axis=1) == top).all(axis=1)
+        rows = np.flatnonzero(ok)
+        self.group_pos[rows[:, None], order[rows]] = \
+            (length[rows, None] - 3 + np.arange(3)).astype(np.int8)
+        self.awaiting[ok, side] &= ~np.uint8(AWAITING_ANALYST)
+        return ok
+
+    def set_agent_x(
+        self,
+        agent: int,
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Set agent card
+
+        Args:
+            agent (int): index of agent
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        flags = self.agents[:, side, agent]
+        ok = self._mask(mask) & (self.phase == PLANNING) \
+            & (flags & IN_HEADQUARTER).astype(bool)
+        flags[ok] = (flags[ok] | AGENT_X) & ~np.uint8(IN_HEADQUARTER)
+        double = ok & (self.awaiting[:, side] & AWAITING_DOUBLE).astype(bool)
+        flags[double] |= REVEALED
+        self.awaiting[double, side] &= ~np.uint8(AWAITING_DOUBLE)
+        return ok
+
+    def _influence_available(self, mask: Optional[np.ndarray]) -> np.ndarray:
+        return self._mask(mask) & (self.phase == INFLUENCE) \
+            & ~self.influence_pass.all(axis=1)
+
+    def recruit_group(
+        self,
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Recruit group
+
+        Args:
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        ok = self._influence_available(mask) \
+            & (self.group_zone == ZONE_DECK).any(axis=1)
+        rows = np.flatnonzero(ok)
+        cards = self._pop(
+            self.group_zone, self.group_pos, rows, ZONE_PLAYER + side
+                )
+        self.group_revealed[rows, cards] = True
+        return ok
+
+    def pass_influence(
+        self,
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Pass in influence phase
+
+        Args:
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        ok = self._influence_available(mask) \
+            & (self.group_zone == ZONE_PLAYER + side).any(axis=1)
+        self.influence_pass[ok, side] = True
+        return ok
+
+    def nuclear_escalation(
+        self,
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """Discard all military groups of both sides
+
+        Args:
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        objective = self.objective_zone[:, NUCLEARESCALATION]
+        ok = self._influence_available(mask) & (objective == ZONE_PLAYER + side)
+        owned = (self.group_zone == ZONE_PLAYER) | (self.group_zone == ZONE_OPPONENT)
+        discard = ok[:, None] & owned & MILITARY
+        self.group_zone[discard] = ZONE_PILE
+        self.group_revealed[discard] = False
+        objective[ok] = ZONE_PILE
+        return ok
+
+    def _top_order(self) -> np.ndarray:
+        """Get group indexes of top three cards, ordered from bottom to top
+        """
+        return self.group_pos.argsort(axis=1)[:, -3:]
+
+    def get_legal_actions(self, side: int = 0) -> np.ndarray:
+        """Get mask of legal actions of side for every game
+
+        Args:
+            side (int): side index, default to player
+
+        Returns:
+            np.ndarray: bool mask with shape (size, len(ACTIONS))
+        """
+        legal = np.zeros((self.size, len(ACTIONS)), bool)
+        analyst = self._analyst_available(side, None)
+        influence = self._influence_available(None)
+        length = (self.group_zone == ZONE_DECK).sum(axis=1)
+        top = self._top_three()
+        revealed = self.group_revealed[:, :, side]
+        agents = (self.agents[:, side] & IN_HEADQUARTER).astype(bool)
+
+        for num, (action, arg) in enumerate(ACTIONS):
+            if action == 'next_phase':
+                legal[:, num] = ~self.get_phase_blocked()
+            elif action == 'next_turn':
+                legal[:, num] = ~self.is_game_ends & (self.phase == DETENTE)
+            elif action == 'analyst_look':
+                legal[:, num] = analyst & (top & ~revealed).any(axis=1)
+            elif action == 'analyst_arrange':
+                legal[:, num] = analyst & (length > 3)
+            elif action == 'agent_x':
+                legal[:, num] = (self.phase == PLANNING) & agents[:, arg]
+            elif action == 'recruit':
+                legal[:, num] = influence & (length > 0)
+            elif action == 'pass':
+                legal[:, num] = influence \
+                    & (self.group_zone == ZONE_PLAYER + side).any(axis=1)
+            elif action == 'nuclear_escalation':
+                legal[:, num] = influence \
+                    & (self.objective_zone[:, NUCLEARESCALATION] == ZONE_PLAYER + side)
+        return legal
+
+    def apply_actions(
+        self,
+        actions: Union[int, np.ndarray],
+        side: int = 0,
+        mask: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None,
+            ) -> np.ndarray:
+        """Apply action of side to every game
+
+        Args:
+            actions (Union[int, np.ndarray]): index of action in ACTIONS
+                                              for every game or for all games
+            side (int): side index, default to player
+            mask (np.ndarray, optional): games mask. Default to all games
+            rng (np.random.Generator, optional): random generator
+
+        Returns:
+            np.ndarray: mask of changed games
+        """
+        actions = np.broadcast_to(np.asarray(actions), (self.size, ))
+        mask = self._mask(mask)
+        ok = np.zeros(self.size, bool)
+        for num in np.unique(actions[mask]):
+            action, arg = ACTIONS[num]
+            selected = mask & (actions == num)
+            if action == 'next_phase':
+                ok |= self.set_next_phase(selected, rng=rng)
+            elif action == 'next_turn':
+                ok |= self.set_next_turn(selected)
+            elif action == 'analyst_look':
+                ok |= self.play_analyst_for_look_the_top(side, selected)
+            elif action == 'analyst_arrange':
+                order = self._top_order()[:, ARRANGES[arg]]
+                ok |= self.play_analyst_for_arrange_the_top(order, side, selected)
+            elif action == 'agent_x':
+                ok |= self.set_agent_x(arg, side, selected)
+            elif action == 'recruit':
+                ok |= self.recruit_group(side, selected)
+            elif action == 'pass':
+                ok |= self.pass_influence(side, selected)
+            elif action == 'nuclear_escalation':
+                ok |= self.nuclear_escalation(side, selected)
+        return ok
@@ -0,0 +1,430 @@
+import math
+import threading
+import numpy as np
+from time import perf_counter, time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Optional, cast
+from app.core.batch import (
+    BatchGame, ACTIONS, ARRANGES, AGENTS, OBJECTIVES, PLANNING, ZONE_DECK,
+    ZONE_PLAYER, ZONE_MISSION, IN_HEADQUARTER, AGENT_X, REVEALED
+        )
+from app.core.zobrist import hash_games
+from app.core.cfr import AgentXSolver, solver
+from app.core.logic import GameLogic
+from app.constructs import Sides, Agents
+from app.config import settings
+
+
+SIDES = Sides.get_values()
+AGENT_X_ACTIONS = [num for num, (name, _) in enumerate(ACTIONS) if name == 'agent_x']
+EXPLORATION = 1.4
+ROLLOUT_DEPTH = 40
+
+# time to collect results of worker processes after think time
+COLLECT_SECONDS = 0.1
+
+
+def determinize(games: BatchGame, side: int, rng: np.random.Generator) -> BatchGame:
+    """Sample full game state from information of side. Cards of
+    decks, unknown to side, are shuffled and hidden agent X of other
+    side is replaced by random agent, that can be choosen by other side.
+
+    Args:
+        games (BatchGame): batch with one game
+        side (int): side index
+        rng (np.random.Generator): random generator
+
+    Returns:
+        BatchGame: sampled game
+    """
+    games = games.take([0])
+
+    hidden = (games.group_zone[0] == ZONE_DECK) & ~games.group_revealed[0, :, side]
+    cards = np.flatnonzero(hidden)
+    games.group_pos[0, cards] = rng.permutation(games.group_pos[0, cards])
+
+    cards = np.flatnonzero(games.objective_zone[0] == ZONE_DECK)
+    games.objective_pos[0, cards] = rng.permutation(games.objective_pos[0, cards])
+
+    other = games.agents[0, 1 - side]
+    unknown = (other & REVEALED) == 0
+    agent_x = np.flatnonzero(((other & AGENT_X) != 0) & unknown)
+    if agent_x.size:
+        candidates = np.flatnonzero(
+            ((other & (AGENT_X | IN_HEADQUARTER)) != 0) & unknown
+                )
+        choice = rng.choice(candidates)
+        other[agent_x[0]] = (other[agent_x[0]] & ~np.uint8(AGENT_X)) | IN_HEADQUARTER
+        other[choice] = (other[choice] | AGENT_X) & ~np.uint8(IN_HEADQUARTER)
+
+    return games
+
+
+def evaluate_games(games: BatchGame, side: int) -> np.ndarray:
+    """Evaluate all games of batch for side by score and controlled groups
+
+    Args:
+        games (BatchGame): batch of games
+        side (int): side index
+
+    Returns:
+        np.ndarray: reward from 0 to 1 of every game
+    """
+    owned = [(games.group_zone == ZONE_PLAYER + num).sum(axis=1) for num in range(2)]
+    score = games.score.astype(int)
+    advantage = 2 * (score[:, side] - score[:, 1 - side]) \
+        + owned[side] - owned[1 - side]
+    return 1 / (1 + np.exp(-advantage / 2))
+
+
+def evaluate(games: BatchGame, side: int) -> float:
+    """Evaluate game for side by score and controlled groups
+
+    Args:
+        games (BatchGame): batch with one game
+        side (int): side index
+
+    Returns:
+        float: reward from 0 to 1
+    """
+    return float(evaluate_games(games, side)[0])
+
+
+def _legal(games: BatchGame, to_move: int) -> tuple[np.ndarray, int]:
+    """Get legal actions of side to move. Side without actions
+    passes the move to other side.
+    """
+    for _ in range(2):
+        legal = np.flatnonzero(games.get_legal_actions(to_move)[0])
+        if legal.size:
+            return legal, to_move
+        to_move = 1 - to_move
+    return legal, to_move
+
+
+def _rollout(
+    games: BatchGame,
+    side: int,
+    to_move: int,
+    rng: np.random.Generator,
+        ) -> float:
+    for _ in range(ROLLOUT_DEPTH):
+        legal, to_move = _legal(games, to_move)
+        if not legal.size:
+            break
+        games.apply_actions(rng.choice(legal), to_move, rng=rng)
+        to_move = 1 - to_move
+    return evaluate(games, side)
+
+
+def _select(stats: np.ndarray, legal: np.ndarray, rng: np.random.Generator) -> int:
+    visits, rewards = stats[0, legal], stats[1, legal]
+    if (visits == 0).any():
+        return int(rng.choice(legal[visits == 0]))
+    ucb = rewards / visits + EXPLORATION * np.sqrt(math.log(visits.sum()) / visits)
+    return int(legal[ucb.argmax()])
+
+
+def agent_x_strategy(
+    games: BatchGame,
+    side: int,
+    agent_x_solver: AgentXSolver,
+        ) -> Optional[np.ndarray]:
+    """Look up mixed strategy of agent X choice from information of side
+
+    Args:
+        games (BatchGame): batch with one game
+        side (int): side index
+        agent_x_solver (AgentXSolver): solver with strategies table
+
+    Returns:
+        np.ndarray, optional: probability of every agent or None,
+                              if side can't choose agent X
+    """
+    own = games.agents[0, side]
+    if games.phase[0] != PLANNING or (own & AGENT_X).any() \
+            or not (own & IN_HEADQUARTER).any():
+        return None
+
+    other = games.agents[0, 1 - side]
+    revealed = np.flatnonzero(((other & AGENT_X) != 0) & ((other & REVEALED) != 0))
+    if revealed.size:
+        other_agents = revealed
+    else:
+        other_agents = np.flatnonzero((other & (AGENT_X | IN_HEADQUARTER)) != 0)
+    own_agents = np.flatnonzero(own & IN_HEADQUARTER)
+
+    mission = np.flatnonzero(games.objective_zone[0] == ZONE_MISSION)
+    if side == 0:
+        player_agents, opponent_agents = own_agents, other_agents
+    else:
+        player_agents, opponent_agents = other_agents, own_agents
+    return agent_x_solver.get_strategy(
+        player_agents.tolist(),
+        opponent_agents.tolist(),
+        mission=OBJECTIVES[mission[0]] if mission.size else None,
+        has_balance=bool(games.has_balance[0, 0]),
+        side=Sides(SIDES[side]),
+            )
+
+
+def search(
+    games: BatchGame,
+    side: int,
+    seconds: float,
+    seed: Optional[int] = None,
+    iterations: Optional[int] = None,
+        ) -> np.ndarray:
+    """Run determinized Monte Carlo tree search from information set
+    of side. Nodes are stored in transposition table of search
+    by state hash, so equal states from different determinizations
+    and iterations share statistics.
+
+    Args:
+        games (BatchGame): batch with one game
+        side (int): side index
+        seconds (float): wall-clock budget
+        seed (int, optional): random seed. Default to None
+        iterations (int, optional): max count of iterations. Default to None
+
+    Returns:
+        np.ndarray: visits of every root action
+    """
+    rng = np.random.default_rng(seed)
+    deadline = perf_counter() + seconds
+    root = np.zeros((2, len(ACTIONS)))
+    root_legal = np.flatnonzero(games.get_legal_actions(side)[0])
+    count = 0
+
+    # (state hash, side to move) -> visits and sum of rewards
+    # of side to move for every action
+    table: dict[tuple[int, int], np.ndarray] = {}
+
+    while perf_counter() < deadline and (iterations is None or count < iterations):
+        count += 1
+        current = determinize(games, side, rng)
+        action = _select(root, root_legal, rng)
+        current.apply_actions(action, side, rng=rng)
+        path = [(root, action, side)]
+        to_move = 1 - side
+
+        for _ in range(ROLLOUT_DEPTH):
+            legal, to_move = _legal(current, to_move)
+            if not legal.size:
+                break
+            key = (int(hash_games(current)[0]), to_move)
+            stats = table.get(key)
+            if stats is None:
+                table[key] = stats = np.zeros((2, len(ACTIONS)))
+                action = int(rng.choice(legal))
+                current.apply_actions(action, to_move, rng=rng)
+                path.append((stats, action, to_move))
+                to_move = 1 - to_move
+                break
+            action = _select(stats, legal, rng)
+            current.apply_actions(action, to_move, rng=rng)
+            path.append((stats, action, to_move))
+            to_move = 1 - to_move
+
+        reward = _rollout(current, side, to_move, rng)
+        for stats, action, mover in path:
+            stats[0, action] += 1
+            stats[1, action] += reward if mover == side else 1 - reward
+
+    return root[0]
+
+
+def search_until(
+    deadline: float,
+    games: BatchGame,
+    side: int,
+    seed: Optional[int] = None,
+    iterations: Optional[int] = None,
+        ) -> np.ndarray:
+    """Run search in worker process until wall-clock deadline, so
+    time, that task waits for free worker, counts in think time
+
+    Args:
+        deadline (float): deadline as time.time() timestamp
+        games (BatchGame): batch with one game
+        side (int): side index
+        seed (int, optional): random seed. Default to None
+        iterations (int, optional): max count of iterations. Default to None
+
+    Returns:
+        np.ndarray: visits of every root action
+    """
+    seconds = deadline - time()
+    if seconds <= 0:
+        return np.zeros(len(ACTIONS))
+    return search(games, side, seconds, seed, iterations)
+
+
+def _greedy(games: BatchGame, side: int, legal: np.ndarray) -> int:
+    """Choose legal action with best evaluation after one move
+    """
+    rng = np.random.default_rng()
+    rewards = []
+    for action in legal:
+        current = games.take([0])
+        current.apply_actions(int(action), side, rng=rng)
+        rewards.append(evaluate(current, side))
+    return int(legal[int(np.argmax(rewards))])
+
+
+class MCTSBot:
+    """Search based player. Runs Monte Carlo tree search over batch
+    game engine with wall-clock budget. With more then one worker,
+    independent searches run in worker processes and root statistics
+    are summed (root parallelism). With solver, agent X is sampled from
+    precomputed equilibrium strategy instead of search. Results of
+    workers, that miss think time, are dropped, if no worker meets it,
+    the best action after one move is choosen.
+    """
+
+    def __init__(
+        self,
+        seconds: float = 1.0,
+        workers: int = 1,
+        agent_x_solver: Optional[AgentXSolver] = None,
+            ) -> None:
+        self.seconds = seconds
+        self.workers = workers
+        self.agent_x_solver = agent_x_solver
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        """Get pool of worker processes, started on first use
+
+        Returns:
+            ProcessPoolExecutor
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Stop worker processes and cancel pending searches
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def choose_action(
+        self,
+        game_logic: GameLogic,
+        side: Sides = Sides.OPPONENT,
+        seconds: Optional[float] = None,
+        iterations: Optional[int] = None,
+            ) -> Optional[int]:
+        """Choose action for side
+
+        Args:
+            game_logic (GameLogic): game
+            side (Sides): player or opponent, default to 'opponent'
+            seconds (float, optional): think time. Default to bot think time
+            iterations (int, optional): max count of iterations of every
+                                        search. Default to None
+
+        Returns:
+            int, optional: index of action in ACTIONS or None,
+                           if no actions available
+        """
+        seconds = self.seconds if seconds is None else seconds
+        num = SIDES.index(side)
+        games = BatchGame.from_processors([game_logic.proc])
+        legal = np.flatnonzero(games.get_legal_actions(num)[0])
+        if legal.size <= 1:
+            return int(legal[0]) if legal.size else None
+
+        if self.agent_x_solver is not None:
+            strategy = agent_x_strategy(games, num, self.agent_x_solver)
+            if strategy is not None:
+                agent = np.random.default_rng().choice(len(AGENTS), p=strategy)
+                return AGENT_X_ACTIONS[agent]
+
+        if self.workers > 1:
+            pool = self.get_pool()
+            deadline = time() + seconds
+            futures = [
+                pool.submit(search_until, deadline, games, num, seed, iterations)
+                for seed in np.random.SeedSequence()
+                .generate_state(self.workers).tolist()
+                    ]
+            done, not_done = wait(futures, timeout=seconds + COLLECT_SECONDS)
+            for future in not_done:
+                future.cancel()
+            visits = np.zeros(len(ACTIONS))
+            for future in done:
+                if future.exception() is None:
+                    visits += future.result()
+        else:
+            visits = search(games, num, seconds, iterations=iterations)
+
+        if not visits[legal].any():
+            return _greedy(games, num, legal)
+        return int(legal[visits[legal].argmax()])
+
+    def apply_action(
+        self,
+        game_logic: GameLogic,
+        action: int,
+        side: Sides = Sides.OPPONENT,
+            ) -> GameLogic:
+        """Apply action of side to game
+
+        Args:
+            game_logic (GameLogic): game
+            action (int): index of action in ACTIONS
+            side (Sides): player or opponent, default to 'opponent'
+
+        Returns:
+            GameLogic
+        """
+        name, arg = ACTIONS[action]
+        if name == 'next_phase':
+            return game_logic.chek_phase_conditions_before_next() \
+                .set_next_phase() \
+                .set_phase_conditions_after_next()
+        if name == 'next_turn':
+            return game_logic.set_next_turn()
+        if name == 'analyst_look':
+            return game_logic.play_analyst_for_look_the_top(side)
+        if name == 'analyst_arrange':
+            top = [card.id for card in list(game_logic.proc.decks.groups.current)[-3:]]
+            return game_logic.play_analyst_for_arrange_the_top(
+                [top[num] for num in ARRANGES[cast(int, arg)]], side
+                    )
+        if name == 'agent_x':
+            return game_logic.set_agent_x(Agents(AGENTS[cast(int, arg)]), side)
+        if name == 'recruit':
+            return game_logic.recruit_group(side)
+        if name == 'pass':
+            return game_logic.pass_influence(side)
+        return game_logic.nuclear_escalation(side)
+
+    def play(
+        self,
+        game_logic: GameLogic,
+        side: Sides = Sides.OPPONENT,
+            ) -> Optional[int]:
+        """Choose and apply action for side
+
+        Args:
+            game_logic (GameLogic): game
+            side (Sides): player or opponent, default to 'opponent'
+
+        Returns:
+            int, optional: index of applied action or None,
+                           if no actions available
+        """
+        action = self.choose_action(game_logic, side)
+        if action is not None:
+            self.apply_action(game_logic, action, side)
+        return action
+
+
+bot = MCTSBot(settings.bot_think_seconds, settings.bot_workers, solver)
@@ -0,0 +1,362 @@
+import os
+import argparse
+import threading
+import numpy as np
+from typing import Any, Optional, Sequence
+from app.db.init_db import get_yaml
+from app.constructs import Agents, Objectives, Sides
+
+
+AGENTS = Agents.get_values()
+SIDES = Sides.get_values()
+CARDS = 'app/db/data/converted.yaml'
+TABLE = 'app/db/data/agent_x.npz'
+ITERATIONS = 1000
+
+# chance to win influence struggle for side with balance
+BALANCE_EDGE = 0.6
+
+# value of agendas in victory points
+DOUBLE_VALUE = 3.0
+ANALYST_VALUE = 2.0
+TERMINATE_VALUE = 4.0
+
+SPY = AGENTS.index(Agents.SPY.value)
+DEPUTY = AGENTS.index(Agents.DEPUTY.value)
+DOUBLE = AGENTS.index(Agents.DOUBLE.value)
+ANALYST = AGENTS.index(Agents.ANALYST.value)
+ASSASSIN = AGENTS.index(Agents.ASSASSIN.value)
+DIRECTOR = AGENTS.index(Agents.DIRECTOR.value)
+
+# all subsets of agents as bool masks: MASKS[bits, agent]
+MASKS = ((np.arange(2 ** len(AGENTS))[:, None] >> np.arange(len(AGENTS))) & 1) \
+    .astype(bool)
+
+
+def resolve(
+    winner: int,
+    loser: int,
+    initiative: Sequence[int],
+    victory_points: float,
+    bottom_points: float,
+        ) -> float:
+    """Get result of debriefing for side, that wins influence struggle.
+
+    Simplified model of agendas: agendas resolve from lower initiative,
+    winner claims the mission objective unless an agenda moves it,
+    other agendas are valued in victory points.
+
+    Args:
+        winner (int): agent index of winner
+        loser (int): agent index of loser
+        initiative (Sequence[int]): initiative of every agent
+        victory_points (float): victory points of mission
+        bottom_points (float): expected victory points of bottom objective
+
+    Returns:
+        float: zero-sum payoff of winner
+    """
+    owner = 1.0
+    bonus = [0.0, 0.0]
+    cancelled = [False, False]
+    order = sorted(
+        [(0, winner), (1, loser)], key=lambda item: initiative[item[1]]
+            )
+
+    for num, agent in order:
+        if cancelled[num]:
+            continue
+        if agent == SPY:
+            owner = -1.0
+        elif agent == DOUBLE:
+            bonus[num] += DOUBLE_VALUE
+        elif agent == ANALYST:
+            bonus[num] += ANALYST_VALUE
+        elif agent == ASSASSIN and num == 0 and loser != DEPUTY:
+            cancelled[1] = True
+            bonus[0] += TERMINATE_VALUE
+            if owner == 1.0:
+                owner = 0.0
+        elif agent == DIRECTOR and num == 0:
+            bonus[0] += bottom_points
+
+    return owner * victory_points + bonus[0] - bonus[1]
+
+
+def payoff_matrix(
+    initiative: Sequence[int],
+    victory_points: float,
+    bottom_points: float,
+    has_balance: bool,
+        ) -> np.ndarray:
+    """Get expected payoff of player for every pair of agents X
+
+    Args:
+        initiative (Sequence[int]): initiative of every agent
+        victory_points (float): victory points of mission
+        bottom_points (float): expected victory points of bottom objective
+        has_balance (bool): player has balance
+
+    Returns:
+        np.ndarray: payoff with shape (player agent, opponent agent)
+    """
+    win = BALANCE_EDGE if has_balance else 1 - BALANCE_EDGE
+    result = np.zeros((len(AGENTS), len(AGENTS)))
+    for player in range(len(AGENTS)):
+        for opponent in range(len(AGENTS)):
+            result[player, opponent] = \
+                win * resolve(
+                    player, opponent, initiative, victory_points, bottom_points
+                        ) \
+                - (1 - win) * resolve(
+                    opponent, player, initiative, victory_points, bottom_points
+                        )
+    return result
+
+
+def _regret_matching(regrets: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    positive = np.where(masks, np.maximum(regrets, 0), 0)
+    total = positive.sum(axis=1, keepdims=True)
+    uniform = masks / np.maximum(masks.sum(axis=1, keepdims=True), 1)
+    return np.where(total > 0, positive / np.where(total > 0, total, 1), uniform)
+
+
+def solve(
+    payoff: np.ndarray,
+    player_masks: np.ndarray,
+    opponent_masks: np.ndarray,
+    iterations: int = ITERATIONS,
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Solve batch of zero-sum matrix games by CFR+ (regret matching+
+    with linear averaging of strategies). Games share payoff matrix and
+    differ by available actions of every side.
+
+    Args:
+        payoff (np.ndarray): payoff of player with shape (actions, actions)
+        player_masks (np.ndarray): available actions of player (games, actions)
+        opponent_masks (np.ndarray): available actions of opponent (games, actions)
+        iterations (int): count of iterations
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: average strategies of player and
+                                       opponent with shape (games, actions)
+    """
+    regrets = [np.zeros(player_masks.shape), np.zeros(opponent_masks.shape)]
+    averages = [np.zeros(player_masks.shape), np.zeros(opponent_masks.shape)]
+    masks = [player_masks, opponent_masks]
+
+    for step in range(1, iterations + 1):
+        player = _regret_matching(regrets[0], masks[0])
+        opponent = _regret_matching(regrets[1], masks[1])
+        values = [opponent @ payoff.T, -(player @ payoff)]
+
+        for num, strategy in enumerate((player, opponent)):
+            expected = (strategy * values[num]).sum(axis=1, keepdims=True)
+            regrets[num] = np.maximum(
+                regrets[num] + (values[num] - expected) * masks[num], 0
+                    )
+            averages[num] += step * strategy
+
+    return (
+        _regret_matching(averages[0], masks[0]),
+        _regret_matching(averages[1], masks[1]),
+            )
+
+
+class AgentXSolver:
+    """Lookup table of near-equilibrium mixed strategies for choice of
+    agent X in planning phase.
+
+    Choice of agent X is simultaneous and hidden, so it is solved as
+    zero-sum matrix game. Strategies of all pairs of available agents
+    are solved at once for every victory points of mission and balance.
+    Tables of all missions are solved offline and loaded from file
+    at startup, so lookup at play time is an index into array.
+    """
+
+    def __init__(
+        self,
+        initiative: Sequence[int],
+        victory_points: dict[str, int],
+        iterations: int = ITERATIONS,
+            ) -> None:
+        self.initiative = list(initiative)
+        self.victory_points = victory_points
+        self.bottom_points = float(np.mean(list(victory_points.values())))
+        self.iterations = iterations
+        self._table: dict[tuple[float, bool], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_cards(cls, cards: dict[str, Any], **kwargs: Any) -> 'AgentXSolver':
+        """Make solver from static cards data
+
+        Args:
+            cards (dict[str, Any]): cards in format of converted.yaml
+
+        Returns:
+            AgentXSolver
+        """
+        initiative = {card['name']: card['initiative'] for card in cards['agent_cards']}
+        return cls(
+            [initiative[agent] for agent in AGENTS],
+            {card['name']: card['victory_points'] for card in cards['objective_cards']},
+            **kwargs,
+                )
+
+    def keys(self) -> list[tuple[float, bool]]:
+        """Get keys of all tables: victory points of every mission
+        and of unknown mission, with and without balance
+
+        Returns:
+            list[tuple[float, bool]]: victory points and balance
+        """
+        points = sorted(set(self.victory_points.values()) | {self.bottom_points})
+        return [
+            (float(victory_points), has_balance)
+            for victory_points in points
+            for has_balance in (False, True)
+                ]
+
+    def _solve(self, victory_points: float, has_balance: bool) -> np.ndarray:
+        payoff = payoff_matrix(
+            self.initiative, victory_points, self.bottom_points, has_balance
+                )
+        size = len(MASKS)
+        player = np.repeat(MASKS, size, axis=0)
+        opponent = np.tile(MASKS, (size, 1))
+        strategies = solve(payoff, player, opponent, self.iterations)
+        return np.stack(strategies).reshape(2, size, size, -1)
+
+    def get_table(self, victory_points: float, has_balance: bool) -> np.ndarray:
+        """Get strategies for all available agents of both sides.
+        Table, that isn't solved yet, is solved once under lock.
+
+        Args:
+            victory_points (float): victory points of mission
+            has_balance (bool): player has balance
+
+        Returns:
+            np.ndarray: strategies with shape
+                        (side, player bits, opponent bits, agent)
+        """
+        key = (victory_points, has_balance)
+        table = self._table.get(key)
+        if table is None:
+            with self._lock:
+                table = self._table.get(key)
+                if table is None:
+                    table = self._solve(victory_points, has_balance)
+                    self._table[key] = table
+        return table
+
+    def solve_all(self) -> None:
+        """Solve tables of all keys
+        """
+        for victory_points, has_balance in self.keys():
+            self.get_table(victory_points, has_balance)
+
+    def _params(self) -> np.ndarray:
+        return np.array(
+            [*self.initiative, *sorted(self.victory_points.values()), self.iterations],
+            float,
+                )
+
+    def save(self, path: str) -> None:
+        """Solve tables of all keys and save them to file
+
+        Args:
+            path (str): path to .npz file
+        """
+        self.solve_all()
+        keys = self.keys()
+        np.savez_compressed(
+            path,
+            params=self._params(),
+            victory_points=np.array([key[0] for key in keys]),
+            has_balance=np.array([key[1] for key in keys]),
+            tables=np.stack([self._table[key] for key in keys]).astype(np.float32),
+                )
+
+    def load(self, path: str) -> bool:
+        """Load tables from file, saved with the same cards and iterations
+
+        Args:
+            path (str): path to .npz file
+
+        Returns:
+            bool: True if tables are loaded
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            params = self._params()
+            if data['params'].shape != params.shape \
+                    or not np.allclose(data['params'], params):
+                return False
+            tables = {
+                (float(victory_points), bool(has_balance)): table.astype(float)
+                for victory_points, has_balance, table in zip(
+                    data['victory_points'], data['has_balance'], data['tables']
+                        )
+                    }
+        with self._lock:
+            self._table.update(tables)
+        return True
+
+    def prepare(self, path: str = TABLE) -> None:
+        """Load tables from file or solve them, if file is missing or
+        outdated, so no table is solved at play time
+
+        Args:
+            path (str): path to .npz file
+        """
+        if not self.load(path):
+            self.solve_all()
+
+    def get_strategy(
+        self,
+        player_agents: Sequence[int],
+        opponent_agents: Sequence[int],
+        mission: Optional[Objectives] = None,
+        has_balance: bool = False,
+        side: Sides = Sides.PLAYER,
+            ) -> np.ndarray:
+        """Get mixed strategy of agent X choice
+
+        Args:
+            player_agents (Sequence[int]): indexes of available agents of player
+            opponent_agents (Sequence[int]): indexes of available agents
+                                             of opponent
+            mission (Objectives, optional): mission objective. Default to
+                                            unknown mission
+            has_balance (bool): player has balance, default to False
+            side (Sides): player or opponent, default to 'player'
+
+        Returns:
+            np.ndarray: probability of every agent
+        """
+        if mission is None:
+            victory_points = self.bottom_points
+        else:
+            victory_points = self.victory_points[Objectives(mission).value]
+        table = self.get_table(victory_points, has_balance)
+        return table[
+            SIDES.index(side),
+            sum(1 << agent for agent in set(player_agents)),
+            sum(1 << agent for agent in set(opponent_agents)),
+                ]
+
+
+solver = AgentXSolver.from_cards(get_yaml(CARDS))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve agent X strategies')
+    parser.add_argument('--path', default=TABLE, help='path to .npz file')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    args = parser.parse_args()
+
+    AgentXSolver.from_cards(get_yaml(CARDS), iterations=args.iterations) \
+        .save(args.path)
+    print(f'Saved agent X strategies to {args.path}')
@@ -0,0 +1,275 @@
+import json
+import argparse
+import numpy as np
+from pathlib import Path
+from mongoengine import connect
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+from app.core.batch import BatchGame, ACTIONS
+from app.core.features import FEATURES_SIZE, encode_games, feature_names
+from app.crud.crud_game_archive import archive
+from app.config import settings
+
+
+SCHEMA_VERSION = 1
+SHARD_SIZE = 16384
+ENCODE_BATCH_SIZE = 1024
+INDEX = 'index.json'
+
+# columns of dataset: name -> (dtype, shape of row)
+COLUMNS = {
+    'features': ('float32', (FEATURES_SIZE, )),
+    'legal_actions': ('bool', (2, len(ACTIONS))),
+    'game_id': ('S24', ()),
+        }
+
+
+def encode_rows(docs: Sequence[dict[str, Any]]) -> dict[str, np.ndarray]:
+    """Encode stored games to dataset columns
+
+    Args:
+        docs (Sequence[dict[str, Any]]): raw CurrentGameData documents
+
+    Returns:
+        dict[str, np.ndarray]: arrays of every column
+    """
+    games = BatchGame.from_documents(docs)
+    return {
+        'features': encode_games(games),
+        'legal_actions': np.stack(
+            [games.get_legal_actions(side) for side in range(2)], axis=1
+                ),
+        'game_id': np.array([str(doc['_id']) for doc in docs], 'S24'),
+            }
+
+
+class DatasetWriter:
+    """Writer of sharded dataset. Dataset is a directory with index.json
+    and one .npy file per column and shard. Rows are buffered up to shard
+    size, then every column of shard is saved to own file.
+    """
+
+    def __init__(self, path: Union[str, Path], shard_size: int = SHARD_SIZE) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.shard_size = shard_size
+        self.rows = 0
+        self.shards: list[dict[str, Any]] = []
+        self._buffer = {
+            name: np.empty((shard_size, *shape), dtype)
+            for name, (dtype, shape) in COLUMNS.items()
+                }
+        self._size = 0
+
+    def write(self, columns: dict[str, np.ndarray]) -> None:
+        """Append rows
+
+        Args:
+            columns (dict[str, np.ndarray]): arrays of every column
+        """
+        count = len(columns['features'])
+        start = 0
+        while start < count:
+            size = min(count - start, self.shard_size - self._size)
+            for name, buffer in self._buffer.items():
+                buffer[self._size:self._size + size] = columns[name][start:start + size]
+            self._size += size
+            start += size
+            if self._size == self.shard_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._size:
+            return
+        num = len(self.shards)
+        files = {}
+        for name, buffer in self._buffer.items():
+            files[name] = f'{name}-{num:05d}.npy'
+            np.save(self.path / files[name], buffer[:self._size])
+        self.shards.append({'rows': self._size, 'files': files})
+        self.rows += self._size
+        self._size = 0
+
+    def close(self) -> dict[str, Any]:
+        """Save last shard and index
+
+        Returns:
+            dict[str, Any]: index of dataset
+        """
+        self._flush()
+        index = {
+            'version': SCHEMA_VERSION,
+            'rows': self.rows,
+            'columns': {
+                name: {'dtype': dtype, 'shape': list(shape)}
+                for name, (dtype, shape) in COLUMNS.items()
+                    },
+            'actions': [list(action) for action in ACTIONS],
+            'feature_names': feature_names(),
+            'shards': self.shards,
+                }
+        with open(self.path / INDEX, 'w') as stream:
+            json.dump(index, stream)
+        return index
+
+
+def export_games(
+    docs: Iterable[dict[str, Any]],
+    path: Union[str, Path],
+    shard_size: int = SHARD_SIZE,
+    batch_size: int = ENCODE_BATCH_SIZE,
+        ) -> int:
+    """Stream games to dataset. Games are encoded by batches, so memory
+    use doesn't depend on count of games.
+
+    Args:
+        docs (Iterable[dict[str, Any]]): raw CurrentGameData documents
+        path (Union[str, Path]): dataset directory
+        shard_size (int): rows in shard
+        batch_size (int): games encoded at once
+
+    Returns:
+        int: count of exported rows
+    """
+    writer = DatasetWriter(path, shard_size)
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            writer.write(encode_rows(batch))
+            batch = []
+    if batch:
+        writer.write(encode_rows(batch))
+    return writer.close()['rows']
+
+
+def export_archive(
+    path: Union[str, Path],
+    login: Optional[str] = None,
+    is_game_ends: Optional[bool] = None,
+    shard_size: int = SHARD_SIZE,
+    batch_size: int = ENCODE_BATCH_SIZE,
+        ) -> int:
+    """Export archived games to dataset. Run from backend/app directory:
+
+        python -m app.core.dataset OUTPUT_DIR [--login LOGIN] [--finished]
+
+    Args:
+        path (Union[str, Path]): dataset directory
+        login (str, optional): player login. Default to all players
+        is_game_ends (bool, optional): export only finished (True) or
+                                       only expired (False) games.
+                                       Default to all games
+        shard_size (int): rows in shard
+        batch_size (int): games encoded at once and cursor batch size
+
+    Returns:
+        int: count of exported rows
+    """
+    return export_games(
+        archive.iter_games(login, batch_size, is_game_ends),
+        path,
+        shard_size,
+        batch_size,
+            )
+
+
+class Dataset:
+    """Reader of sharded dataset. Shards are opened as read only memory
+    maps on first access, so dataset is not loaded to memory and
+    database is not used.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with open(self.path / INDEX, 'r') as stream:
+            self.index = json.load(stream)
+        if self.index['version'] != SCHEMA_VERSION:
+            raise ValueError(
+                f"Dataset version {self.index['version']} is not supported."
+                    )
+        self.offsets = np.cumsum(
+            [0] + [shard['rows'] for shard in self.index['shards']]
+                )
+        self._maps: dict[tuple[str, int], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.index['rows']
+
+    def shard(self, name: str, num: int) -> np.ndarray:
+        """Get memory map of column of shard
+
+        Args:
+            name (str): column name
+            num (int): shard number
+
+        Returns:
+            np.ndarray: read only memory map
+        """
+        key = (name, num)
+        if key not in self._maps:
+            self._maps[key] = np.load(
+                self.path / self.index['shards'][num]['files'][name], mmap_mode='r'
+                    )
+        return self._maps[key]
+
+    def get(self, name: str, rows: Union[Sequence[int], np.ndarray]) -> np.ndarray:
+        """Get rows of column. Only needed pages of shards are read.
+
+        Args:
+            name (str): column name
+            rows (Union[Sequence[int], np.ndarray]): row indexes
+
+        Returns:
+            np.ndarray: rows in given order
+        """
+        indexes = np.asarray(rows, np.int64)
+        column = self.index['columns'][name]
+        result = np.empty((len(indexes), *column['shape']), column['dtype'])
+        shards = np.searchsorted(self.offsets, indexes, side='right') - 1
+        for num in np.unique(shards):
+            selected = shards == num
+            result[selected] = \
+                self.shard(name, num)[indexes[selected] - self.offsets[num]]
+        return result
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[Sequence[str]] = None,
+            ) -> Iterator[dict[str, np.ndarray]]:
+        """Iterate over dataset in order by batches of rows
+
+        Args:
+            batch_size (int): rows in batch
+            columns (Sequence[str], optional): column names. Default to all
+
+        Yields:
+            dict[str, np.ndarray]: arrays of every column
+        """
+        columns = list(self.index['columns']) if columns is None else columns
+        for start in range(0, len(self), batch_size):
+            rows = np.arange(start, min(start + batch_size, len(self)))
+            yield {name: self.get(name, rows) for name in columns}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export archived games to dataset')
+    parser.add_argument('path', help='dataset directory')
+    parser.add_argument('--login', default=None, help='player login')
+    parser.add_argument('--finished', action='store_true', help='only finished games')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    connect(
+        host=settings.mongodb_url,
+        name=settings.db_name,
+        alias='default',
+        **settings.mongodb_connection_kwargs,
+            )
+    rows = export_archive(
+        args.path,
+        args.login,
+        True if args.finished else None,
+        args.shard_size,
+            )
+    print(f'Exported {rows} rows to {args.path}')
@@ -0,0 +1,523 @@
+import random
+import numpy as np
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional
+from app.core.batch import (
+    BatchGame, ACTIONS, AGENTS, GROUPS, OBJECTIVES, PHASES, FACTIONS, ZONE_OUT,
+    ZONE_DECK, ZONE_PILE, ZONE_PLAYER, ZONE_MISSION, IN_HEADQUARTER, TERMINATED,
+    ON_LEAVE, AGENT_X, REVEALED, AWAITING_DOUBLE, AWAITING_ANALYST
+        )
+from app.core.bot import bot, evaluate_games
+from app.core.logic import GameLogic
+from app.models.model_game_current import CurrentGameData
+from app.constructs import Agents, Factions, Sides
+
+
+SIDES = Sides.get_values()
+MAX_STEPS = 200
+OPPONENT_MOVES = 4
+
+# sizes of parts of observation
+OBSERVATION_PARTS = {
+    'phase': len(PHASES),
+    'steps': 2,
+    'faction': len(FACTIONS),
+    'users': 10,
+    'own_agents': 5 * len(AGENTS),
+    'other_agents': 4 * len(AGENTS) + 1,
+    'groups': 7 * len(GROUPS),
+    'objectives': 6 * len(OBJECTIVES),
+        }
+OBSERVATION_SIZE = sum(OBSERVATION_PARTS.values())
+
+Opponent = Callable[[GameLogic, Sides], Optional[int]]
+
+
+def _flags(values: np.ndarray, flags: tuple[int, ...]) -> np.ndarray:
+    return np.stack([(values & flag) != 0 for flag in flags], axis=-1) \
+        .reshape(len(values), -1)
+
+
+def encode_observation(games: BatchGame, side: int = 0) -> np.ndarray:
+    """Encode information set of side for all games of batch. Hidden
+    agent X of other side and cards of decks, unknown to side,
+    are not encoded.
+
+    Args:
+        games (BatchGame): batch of games
+        side (int): side index, default to player
+
+    Returns:
+        np.ndarray: float32 observations with shape (size, OBSERVATION_SIZE)
+    """
+    other = 1 - side
+    own_zone, other_zone = ZONE_PLAYER + side, ZONE_PLAYER + other
+
+    phase = games.phase[:, None] == np.arange(len(PHASES))
+    steps = np.stack([games.turn, games.is_game_ends], axis=1)
+    faction = games.faction[:, side, None] == np.arange(len(FACTIONS))
+    users = np.concatenate([
+        games.score[:, [side, other]],
+        games.has_balance[:, [side, other]],
+        games.influence_pass[:, [side, other]],
+        _flags(games.awaiting[:, [side, other]].ravel(), (
+            AWAITING_DOUBLE, AWAITING_ANALYST
+                )).reshape(games.size, -1),
+            ], axis=1)
+
+    own_agents = _flags(games.agents[:, side].ravel(), (
+        IN_HEADQUARTER, TERMINATED, ON_LEAVE, AGENT_X, REVEALED
+            )).reshape(games.size, -1)
+    flags = games.agents[:, other]
+    hidden = ((flags & AGENT_X) != 0) & ((flags & REVEALED) == 0)
+    other_agents = np.concatenate([
+        ((flags & IN_HEADQUARTER) != 0) | hidden,
+        (flags & TERMINATED) != 0,
+        (flags & ON_LEAVE) != 0,
+        ((flags & AGENT_X) != 0) & ~hidden,
+        hidden.any(axis=1, keepdims=True),
+            ], axis=1)
+
+    zone = games.group_zone
+    known = games.group_revealed[:, :, side]
+    in_deck = zone == ZONE_DECK
+    length = np.maximum(in_deck.sum(axis=1, keepdims=True), 1)
+    groups = np.concatenate([
+        in_deck & known,
+        in_deck & ~known,
+        zone == ZONE_PILE,
+        zone == own_zone,
+        zone == other_zone,
+        zone == ZONE_OUT,
+        np.where(in_deck & known, (games.group_pos + 1) / length, 0),
+            ], axis=1)
+
+    zone = games.objective_zone
+    objectives = np.concatenate([
+        zone == ZONE_DECK,
+        zone == ZONE_PILE,
+        zone == own_zone,
+        zone == other_zone,
+        zone == ZONE_MISSION,
+        zone == ZONE_OUT,
+            ], axis=1)
+
+    return np.concatenate([
+        phase, steps, faction, users, own_agents, other_agents, groups, objectives
+            ], axis=1).astype(np.float32)
+
+
+def new_games(size: int, rng: np.random.Generator) -> BatchGame:
+    """Make batch of started games: decks are shuffled, factions, missions
+    and balance are set
+
+    Args:
+        size (int): count of games
+        rng (np.random.Generator): random generator
+
+    Returns:
+        BatchGame
+    """
+    games = BatchGame(size)
+    games.deal_and_shuffle_decks(rng=rng)
+    cia = rng.integers(0, 2, size).astype(bool)
+    games.set_faction(0, cia)
+    games.set_faction(1, ~cia)
+    games.set_mission_card()
+    games.set_balance(rng=rng)
+    return games
+
+
+def random_actions(legal: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Sample uniform random legal action of every game
+
+    Args:
+        legal (np.ndarray): legal actions mask with shape (size, actions)
+        rng (np.random.Generator): random generator
+
+    Returns:
+        np.ndarray: index of action of every game, -1 if no legal actions
+    """
+    keys = np.where(legal, rng.random(legal.shape), -1)
+    return np.where(legal.any(axis=1), keys.argmax(axis=1), -1)
+
+
+def random_opponent(game_logic: GameLogic, side: Sides) -> Optional[int]:
+    """Choose uniform random legal action of side
+    """
+    legal = BatchGame.from_processors([game_logic.proc]) \
+        .get_legal_actions(SIDES.index(side))[0]
+    legal = np.flatnonzero(legal)
+    return random.choice(legal.tolist()) if legal.size else None
+
+
+class Env:
+    """Reinforcement learning environment of one game with gym-style
+    interface. Agent plays one side, other side is played by opponent
+    policy. Reward is a change of evaluation of game for side of agent.
+
+    Observation is fixed-size information set of agent side and action
+    is index in ACTIONS.
+    """
+
+    def __init__(
+        self,
+        side: Sides = Sides.PLAYER,
+        opponent: Opponent = random_opponent,
+        max_steps: int = MAX_STEPS,
+            ) -> None:
+        self.side = Sides(side)
+        self.other = Sides.OPPONENT if self.side == Sides.PLAYER else Sides.PLAYER
+        self.opponent = opponent
+        self.max_steps = max_steps
+        self.game_logic: Optional[GameLogic] = None
+        self._steps = 0
+        self._value = 0.0
+
+    def _get_game_logic(self) -> GameLogic:
+        if self.game_logic is None:
+            raise RuntimeError('Game is not started, call reset first.')
+        return self.game_logic
+
+    def _batch(self) -> BatchGame:
+        return BatchGame.from_processors([self._get_game_logic().proc])
+
+    def _observe(self) -> np.ndarray:
+        return encode_observation(self._batch(), SIDES.index(self.side))[0]
+
+    def _evaluate(self) -> float:
+        return float(evaluate_games(self._batch(), SIDES.index(self.side))[0])
+
+    def reset(
+        self,
+        seed: Optional[int] = None,
+            ) -> tuple[np.ndarray, dict[str, Any]]:
+        """Start new game
+
+        Args:
+            seed (int, optional): seed of random module. Default to None
+
+        Returns:
+            tuple[np.ndarray, dict[str, Any]]: observation and info
+        """
+        if seed is not None:
+            random.seed(seed)
+        agents = {'current': [{'name': agent} for agent in Agents.get_values()]}
+        game = CurrentGameData(
+            players={
+                'player': {'login': 'player', 'agents': agents},
+                'opponent': {'login': 'opponent', 'agents': agents},
+                    }
+                )
+        game_logic = GameLogic(game).deal_and_shuffle_decks() \
+            .set_faction(Factions(random.choice(Factions.get_values()))) \
+            .set_mission_card() \
+            .set_balance()
+        self.game_logic = game_logic
+        self._steps = 0
+        self._play_opponent(game_logic)
+        self._value = self._evaluate()
+        return self._observe(), {}
+
+    def legal_action_mask(self) -> np.ndarray:
+        """Get legal actions of agent
+
+        Returns:
+            np.ndarray: bool mask with shape (len(ACTIONS), )
+        """
+        return self._batch().get_legal_actions(SIDES.index(self.side))[0]
+
+    def _play_opponent(self, game_logic: GameLogic) -> None:
+        """Play opponent until agent has legal actions
+        """
+        for _ in range(OPPONENT_MOVES):
+            if self.legal_action_mask().any():
+                return
+            action = self.opponent(game_logic, self.other)
+            if action is None:
+                return
+            bot.apply_action(game_logic, action, self.other)
+
+    def step(
+        self,
+        action: int,
+            ) -> tuple[np.ndarray, float, bool, bool, dict[str, Any]]:
+        """Apply action of agent and move of opponent
+
+        Args:
+            action (int): index of action in ACTIONS
+
+        Raises:
+            ValueError: if action is not legal
+
+        Returns:
+            tuple[np.ndarray, float, bool, bool, dict[str, Any]]:
+                observation, reward, terminated, truncated and info
+        """
+        game_logic = self._get_game_logic()
+        if not self.legal_action_mask()[action]:
+            raise ValueError(f"Action {ACTIONS[action]} is not legal.")
+
+        bot.apply_action(game_logic, action, self.side)
+        self._steps += 1
+        reply = self.opponent(game_logic, self.other)
+        if reply is not None:
+            bot.apply_action(game_logic, reply, self.other)
+        self._play_opponent(game_logic)
+
+        value = self._evaluate()
+        reward, self._value = value - self._value, value
+        terminated = game_logic.proc.steps.is_game_ends \
+            or not self.legal_action_mask().any()
+        truncated = not terminated and self._steps >= self.max_steps
+        return self._observe(), reward, terminated, truncated, {}
+
+
+class BatchEnv:
+    """Reinforcement learning environment of batch of games over batch
+    game engine. Same interface as Env, but every method works with
+    all games at once, opponent plays uniform random legal actions and
+    finished games are reset automatically.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        side: int = 0,
+        max_steps: int = MAX_STEPS,
+        seed: Optional[int] = None,
+            ) -> None:
+        self.size = size
+        self.side = side
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.games = BatchGame(size)
+        self._steps = np.zeros(size, np.int32)
+        self._value = np.zeros(size)
+
+    def _reset_games(self, mask: np.ndarray) -> None:
+        rows = np.flatnonzero(mask)
+        if not rows.size:
+            return
+        games = new_games(len(rows), self.rng)
+        for field in BatchGame.FIELDS:
+            getattr(self.games, field)[rows] = getattr(games, field)
+        self._steps[rows] = 0
+        self._play_opponent(mask)
+        self._value[rows] = evaluate_games(self.games, self.side)[rows]
+
+    def reset(self) -> np.ndarray:
+        """Start new games
+
+        Returns:
+            np.ndarray: observations with shape (size, OBSERVATION_SIZE)
+        """
+        self._reset_games(np.ones(self.size, bool))
+        return encode_observation(self.games, self.side)
+
+    def legal_action_mask(self) -> np.ndarray:
+        """Get legal actions of agent
+
+        Returns:
+            np.ndarray: bool mask with shape (size, len(ACTIONS))
+        """
+        return self.games.get_legal_actions(self.side)
+
+    def _play_opponent(self, mask: np.ndarray) -> None:
+        """Play opponent in games, where agent has no legal actions
+        """
+        for _ in range(OPPONENT_MOVES):
+            waiting = mask & ~self.legal_action_mask().any(axis=1)
+            if not waiting.any():
+                return
+            actions = random_actions(
+                self.games.get_legal_actions(1 - self.side), self.rng
+                    )
+            self.games.apply_actions(
+                actions, 1 - self.side, waiting & (actions >= 0), self.rng
+                    )
+
+    def step(
+        self,
+        actions: np.ndarray,
+            ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Apply actions of agent and moves of opponent. Illegal actions
+        are ignored.
+
+        Args:
+            actions (np.ndarray): index of action in ACTIONS for every game
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                observations, rewards, terminated and truncated. Observations
+                of finished games are observations of new games
+        """
+        everything = np.ones(self.size, bool)
+        self.games.apply_actions(actions, self.side, rng=self.rng)
+        self._steps += 1
+        other = random_actions(self.games.get_legal_actions(1 - self.side), self.rng)
+        self.games.apply_actions(other, 1 - self.side, other >= 0, self.rng)
+        self._play_opponent(everything)
+
+        value = evaluate_games(self.games, self.side)
+        rewards, self._value = value - self._value, value
+        terminated = self.games.is_game_ends \
+            | ~self.legal_action_mask().any(axis=1)
+        truncated = ~terminated & (self._steps >= self.max_steps)
+        self._reset_games(terminated | truncated)
+        return encode_observation(self.games, self.side), rewards, \
+            terminated, truncated
+
+
+# shared buffers of VectorEnv: name -> (dtype, size of row)
+BUFFERS = {
+    'observations': (np.float32, OBSERVATION_SIZE),
+    'masks': (np.bool_, len(ACTIONS)),
+    'actions': (np.int64, 1),
+    'rewards': (np.float64, 1),
+    'terminated': (np.bool_, 1),
+    'truncated': (np.bool_, 1),
+        }
+
+
+def _buffers(
+    memory: dict[str, SharedMemory],
+    size: int,
+    rows: slice = slice(None),
+        ) -> dict[str, np.ndarray]:
+    result: dict[str, np.ndarray] = {}
+    for name, (dtype, width) in BUFFERS.items():
+        shape = (size, width) if width > 1 else (size, )
+        result[name] = np.ndarray(shape, dtype, memory[name].buf)[rows]
+    return result
+
+
+def _worker(
+    connection: Connection,
+    names: dict[str, str],
+    size: int,
+    rows: slice,
+    kwargs: dict[str, Any],
+        ) -> None:
+    """Step slice of games of VectorEnv and write results to shared memory
+    """
+    memory = {name: SharedMemory(shared) for name, shared in names.items()}
+    buffers = _buffers(memory, size, rows)
+    env = BatchEnv(rows.stop - rows.start, **kwargs)
+    try:
+        while True:
+            command = connection.recv()
+            if command == 'reset':
+                buffers['observations'][:] = env.reset()
+            elif command == 'step':
+                observations, rewards, terminated, truncated = \
+                    env.step(buffers['actions'])
+                buffers['observations'][:] = observations
+                buffers['rewards'][:] = rewards
+                buffers['terminated'][:] = terminated
+                buffers['truncated'][:] = truncated
+            else:
+                break
+            buffers['masks'][:] = env.legal_action_mask()
+            connection.send(True)
+    finally:
+        del buffers
+        for shared in memory.values():
+            shared.close()
+
+
+class VectorEnv:
+    """Batch environment, that steps slices of games in worker processes.
+    Actions, observations, masks and rewards are exchanged through shared
+    memory buffers, pipes are used only for commands.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        workers: int = 2,
+        side: int = 0,
+        max_steps: int = MAX_STEPS,
+        seed: Optional[int] = None,
+            ) -> None:
+        self.size = size
+        self._memory = {
+            name: SharedMemory(
+                create=True, size=np.dtype(dtype).itemsize * width * size
+                    )
+            for name, (dtype, width) in BUFFERS.items()
+                }
+        self._buffers = _buffers(self._memory, size)
+        names = {name: shared.name for name, shared in self._memory.items()}
+        seeds = np.random.SeedSequence(seed).generate_state(workers)
+        bounds = np.linspace(0, size, workers + 1).astype(int)
+
+        self._connections: list[Connection] = []
+        self._processes: list[mp.Process] = []
+        for num in range(workers):
+            parent, child = mp.Pipe()
+            kwargs = {'side': side, 'max_steps': max_steps, 'seed': int(seeds[num])}
+            process = mp.Process(
+                target=_worker,
+                args=(child, names, size, slice(bounds[num], bounds[num + 1]), kwargs),
+                daemon=True,
+                    )
+            process.start()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def _command(self, command: str) -> None:
+        for connection in self._connections:
+            connection.send(command)
+        for connection in self._connections:
+            connection.recv()
+
+    def reset(self) -> np.ndarray:
+        """Start new games
+
+        Returns:
+            np.ndarray: observations with shape (size, OBSERVATION_SIZE)
+        """
+        self._command('reset')
+        return self._buffers['observations']
+
+    def legal_action_mask(self) -> np.ndarray:
+        """Get legal actions of agent
+
+        Returns:
+            np.ndarray: bool mask with shape (size, len(ACTIONS))
+        """
+        return self._buffers['masks']
+
+    def step(
+        self,
+        actions: np.ndarray,
+            ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Apply actions of agent in all games
+
+        Args:
+            actions (np.ndarray): index of action in ACTIONS for every game
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                observations, rewards, terminated and truncated. Arrays
+                are views of shared buffers and are overwritten by next step
+        """
+        self._buffers['actions'][:] = actions
+        self._command('step')
+        return self._buffers['observations'], self._buffers['rewards'], \
+            self._buffers['terminated'], self._buffers['truncated']
+
+    def close(self) -> None:
+        """Stop workers and free shared memory
+        """
+        for connection in self._connections:
+            connection.send('close')
+        for process in self._processes:
+            process.join()
+        self._buffers = {}
+        for shared in self._memory.values():
+            shared.close()
+            shared.unlink()
@@ -0,0 +1,146 @@
+import numpy as np
+from typing import Any, Iterable, Union
+from app.core.batch import (
+    BatchGame, AGENTS, GROUPS, OBJECTIVES, PHASES, FACTIONS, ZONE_MISSION,
+    IN_HEADQUARTER, TERMINATED, ON_LEAVE, AGENT_X, REVEALED, AWAITING_DOUBLE,
+    AWAITING_ANALYST
+        )
+from app.models.model_game_current import CurrentGameData
+from app.schemas.scheme_game_current import CurrentGameDataProcessor
+
+
+ZONES = ZONE_MISSION + 1
+AGENT_FLAGS = (IN_HEADQUARTER, TERMINATED, ON_LEAVE, AGENT_X, REVEALED)
+AWAITING_FLAGS = (AWAITING_DOUBLE, AWAITING_ANALYST)
+
+# names and sizes of parts of feature vector, in order of vector
+FEATURES = {
+    'phase': len(PHASES),
+    'turn': 1,
+    'is_game_ends': 1,
+    'faction': 2 * len(FACTIONS),
+    'score': 2,
+    'has_balance': 2,
+    'influence_pass': 2,
+    'awaiting': 2 * len(AWAITING_FLAGS),
+    'agents': 2 * len(AGENTS) * len(AGENT_FLAGS),
+    'group_zone': len(GROUPS) * ZONES,
+    'group_pos': len(GROUPS),
+    'group_revealed': 2 * len(GROUPS),
+    'objective_zone': len(OBJECTIVES) * ZONES,
+    'objective_pos': len(OBJECTIVES),
+        }
+FEATURES_SIZE = sum(FEATURES.values())
+
+
+def _one_hot(values: np.ndarray, count: int) -> np.ndarray:
+    return values[..., None] == np.arange(count)
+
+
+def _bits(values: np.ndarray, flags: tuple[int, ...]) -> np.ndarray:
+    return np.stack([(values & flag) != 0 for flag in flags], axis=-1)
+
+
+def encode_games(games: BatchGame) -> np.ndarray:
+    """Encode full state of all games of batch to fixed-length vectors.
+    Card zones, factions and phase are one-hot, flags are 0 or 1,
+    deck positions are normalized by deck length.
+
+    Args:
+        games (BatchGame): batch of games
+
+    Returns:
+        np.ndarray: float32 features with shape (size, FEATURES_SIZE)
+    """
+    size = games.size
+    group_length = np.maximum((games.group_pos >= 0).sum(axis=1, keepdims=True), 1)
+    objective_length = np.maximum(
+        (games.objective_pos >= 0).sum(axis=1, keepdims=True), 1
+            )
+    parts = {
+        'phase': _one_hot(games.phase, len(PHASES)),
+        'turn': games.turn,
+        'is_game_ends': games.is_game_ends,
+        'faction': _one_hot(games.faction, len(FACTIONS)),
+        'score': games.score,
+        'has_balance': games.has_balance,
+        'influence_pass': games.influence_pass,
+        'awaiting': _bits(games.awaiting, AWAITING_FLAGS),
+        'agents': _bits(games.agents, AGENT_FLAGS),
+        'group_zone': _one_hot(games.group_zone, ZONES),
+        'group_pos': (games.group_pos + 1) / group_length,
+        'group_revealed': games.group_revealed,
+        'objective_zone': _one_hot(games.objective_zone, ZONES),
+        'objective_pos': (games.objective_pos + 1) / objective_length,
+            }
+
+    result = np.empty((size, FEATURES_SIZE), np.float32)
+    start = 0
+    for name, width in FEATURES.items():
+        result[:, start:start + width] = parts[name].reshape(size, width)
+        start += width
+    return result
+
+
+def encode_processor(proc: CurrentGameDataProcessor) -> np.ndarray:
+    """Encode full state of game processor
+
+    Args:
+        proc (CurrentGameDataProcessor): game processor
+
+    Returns:
+        np.ndarray: float32 features with shape (FEATURES_SIZE, )
+    """
+    return encode_games(BatchGame.from_processors([proc]))[0]
+
+
+def encode_documents(
+    docs: Iterable[Union[CurrentGameData, dict[str, Any]]],
+        ) -> np.ndarray:
+    """Encode full state of stored games. Raw documents (for example from
+    queryset.as_pymongo()) are encoded without creation of documents or
+    game processors.
+
+    Args:
+        docs (Iterable[Union[CurrentGameData, dict[str, Any]]]): stored games
+
+    Returns:
+        np.ndarray: float32 features with shape (count of games, FEATURES_SIZE)
+    """
+    docs = [
+        doc.to_mongo().to_dict() if isinstance(doc, CurrentGameData) else doc
+        for doc in docs
+            ]
+    return encode_games(BatchGame.from_documents(docs))
+
+
+def feature_names() -> list[str]:
+    """Get name of every feature of vector
+
+    Returns:
+        list[str]: names in order of vector
+    """
+    names = {
+        'phase': PHASES,
+        'turn': [''],
+        'is_game_ends': [''],
+        'faction': [f'{side}.{faction}' for side in range(2) for faction in FACTIONS],
+        'score': range(2),
+        'has_balance': range(2),
+        'influence_pass': range(2),
+        'awaiting': [f'{side}.{flag}' for side in range(2) for flag in AWAITING_FLAGS],
+        'agents': [
+            f'{side}.{agent}.{flag}'
+            for side in range(2) for agent in AGENTS for flag in AGENT_FLAGS
+                ],
+        'group_zone': [f'{group}.{zone}' for group in GROUPS for zone in range(ZONES)],
+        'group_pos': GROUPS,
+        'group_revealed': [f'{group}.{side}' for group in GROUPS for side in range(2)],
+        'objective_zone': [
+            f'{objective}.{zone}' for objective in OBJECTIVES for zone in range(ZONES)
+                ],
+        'objective_pos': OBJECTIVES,
+            }
+    return [
+        f'{name}.{item}'.rstrip('.') for name in FEATURES for item in names[name]
+            ]
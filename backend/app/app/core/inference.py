@@ -0,0 +1,189 @@
+import asyncio
+import numpy as np
+from typing import Callable, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.batch import BatchGame, ACTIONS
+from app.core.env import OBSERVATION_SIZE, encode_observation
+from app.core.logic import GameLogic
+from app.core.metrics import registry
+from app.constructs import Sides
+from app.config import settings
+
+
+SIDES = Sides.get_values()
+
+# policy: (observations, legal actions masks) -> probabilities of actions
+Policy = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+INFERENCE_BATCH_SIZE = registry.histogram(
+    'coldwar_inference_batch_size',
+    'Bot decisions evaluated in one policy call',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+        )
+INFERENCE_WAIT_SECONDS = registry.histogram(
+    'coldwar_inference_wait_seconds',
+    'Time from bot decision request to policy result',
+        )
+
+
+class LinearPolicy:
+    """Linear softmax policy over observations of batch environment.
+    Without weights all legal actions are equally probable.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[np.ndarray] = None,
+        bias: Optional[np.ndarray] = None,
+            ) -> None:
+        self.weights = np.zeros((OBSERVATION_SIZE, len(ACTIONS)), np.float32) \
+            if weights is None else weights
+        self.bias = np.zeros(len(ACTIONS), np.float32) if bias is None else bias
+
+    @classmethod
+    def from_file(cls, path: str) -> 'LinearPolicy':
+        """Load policy from .npz file with weights and bias arrays
+
+        Args:
+            path (str): path to file
+
+        Returns:
+            LinearPolicy
+        """
+        with np.load(path) as data:
+            return cls(data['weights'], data['bias'])
+
+    def __call__(self, observations: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        """Get probabilities of legal actions
+
+        Args:
+            observations (np.ndarray): observations with shape
+                                       (size, OBSERVATION_SIZE)
+            legal (np.ndarray): legal actions mask with shape (size, actions)
+
+        Returns:
+            np.ndarray: probabilities with shape (size, actions)
+        """
+        logits = np.where(legal, observations @ self.weights + self.bias, -np.inf)
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.where(legal, np.exp(logits), 0)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class BatchedPolicy:
+    """Micro-batching policy service. Decisions of concurrent requests
+    are queued, up to max batch size decisions or decisions that came in
+    max wait are evaluated in one vectorized call and results are
+    returned to waiting requests.
+    """
+
+    def __init__(
+        self,
+        policy: Policy,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+            ) -> None:
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _start(self) -> asyncio.Queue:
+        """Start batching task in running event loop
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        if self._loop is not loop or queue is None \
+                or self._task is None or self._task.done():
+            self._loop = loop
+            queue = self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(queue))
+        return queue
+
+    async def _collect(self, queue: asyncio.Queue) -> list[tuple]:
+        loop = asyncio.get_running_loop()
+        items = [await queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+        while len(items) < self.max_batch_size:
+            if not queue.empty():
+                items.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect(queue)
+            INFERENCE_BATCH_SIZE.observe(len(items))
+            try:
+                result = await run_in_threadpool(
+                    self.policy,
+                    np.stack([item[0] for item in items]),
+                    np.stack([item[1] for item in items]),
+                        )
+            except Exception as exc:
+                for _, _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            now = loop.time()
+            for num, (_, _, future, start) in enumerate(items):
+                INFERENCE_WAIT_SECONDS.observe(now - start)
+                if not future.done():
+                    future.set_result(result[num])
+
+    async def predict(self, observation: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        """Get action probabilities of one decision
+
+        Args:
+            observation (np.ndarray): observation with shape (OBSERVATION_SIZE, )
+            legal (np.ndarray): legal actions mask with shape (actions, )
+
+        Returns:
+            np.ndarray: probabilities with shape (actions, )
+        """
+        queue = self._start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        await queue.put((observation, legal, future, loop.time()))
+        return await future
+
+    async def choose_action(
+        self,
+        game_logic: GameLogic,
+        side: Sides = Sides.OPPONENT,
+            ) -> Optional[int]:
+        """Choose most probable action of side
+
+        Args:
+            game_logic (GameLogic): game
+            side (Sides): player or opponent, default to 'opponent'
+
+        Returns:
+            int, optional: index of action in ACTIONS or None,
+                           if no actions available
+        """
+        num = SIDES.index(side)
+        games = BatchGame.from_processors([game_logic.proc])
+        legal = games.get_legal_actions(num)[0]
+        if not legal.any():
+            return None
+        probabilities = await self.predict(encode_observation(games, num)[0], legal)
+        return int(probabilities.argmax())
+
+
+policy = BatchedPolicy(
+    LinearPolicy.from_file(settings.policy_path) if settings.policy_path
+    else LinearPolicy(),
+    settings.inference_max_batch_size,
+    settings.inference_max_wait_ms,
+        )
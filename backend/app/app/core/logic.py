@@ -1,7 +1,8 @@
-from typing import Union, Optional
+from functools import wraps
+from typing import Any, Callable, TypeVar, Union, Optional, Sequence, cast
 from fastapi import HTTPException
-from app.crud.crud_game_current import CurrentGameData
-from app.schemas.scheme_game_current_api import CurrentGameDataApi
+from app.models.model_game_current import CurrentGameData
+from app.schemas.scheme_game_current_api import CurrentGameDataApi, LegalActions
 from app.schemas.scheme_game_current import (
     CurrentGameDataProcessor, AgentInPlayProcessor, GroupInPlayProcessor,
     ObjectiveInPlayProcessor, PlayerProcessor, OpponentProcessor
@@ -9,9 +10,30 @@ from app.schemas.scheme_game_current import (
 from app.constructs import (
     Factions, Agents, Groups, Objectives, Phases, Sides, MilitaryGroups
         )
+from app.core.timing import timed, stage
+from app.core import phases
+from app.core.batch import BatchGame
+from app.core.zobrist import hash_games
 from bgameb import Step, errors
 
 
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def mutation(func: F) -> F:
+    """Decorate method of GameLogic, that changes game, to invalidate
+    cached state hash after call, even if call raises after partial change
+    """
+    @wraps(func)
+    def wrapper(self: 'GameLogic', *args: Any, **kwargs: Any) -> Any:
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._proc_hash = None
+
+    return cast(F, wrapper)
+
+
 class GameLogic:
     """Create the game object to manipulation of game tools
     """
@@ -19,10 +41,26 @@ class GameLogic:
     def __init__(
         self,
         game: CurrentGameData,
+        fields: Optional[Sequence[str]] = None,
             ) -> None:
+        """
+        Args:
+            game (CurrentGameData): game document
+            fields (Sequence[str], optional): parts of document, that are
+                                              loaded and saved. Default to
+                                              whole document
+        """
         self.game = game
-        self.proc = self._fill_process()
-
+        # without stored hash hash of not loaded parts is unknown, so
+        # game must be loaded and saved as whole document
+        self.fields = fields if game.state_hash is not None else None
+        self._proc = self._fill_process()
+        self._proc_hash: Optional[int] = None
+        self._hash_rest = 0
+        if self.fields is not None:
+            self._hash_rest = int(game.state_hash, 16) ^ self.state_hash
+
+    @timed('fill_process')
     def _fill_process(self) -> CurrentGameDataProcessor:
         """Get game processor with db game data
         """
@@ -57,26 +95,70 @@ class GameLogic:
 
         return proc
 
+    @property
+    def proc(self) -> CurrentGameDataProcessor:
+        """Game processor. Caller can change processor, so access to it
+        invalidates cached state hash.
+
+        Returns:
+            CurrentGameDataProcessor: game processor
+        """
+        self._proc_hash = None
+        return self._proc
+
+    @proc.setter
+    def proc(self, proc: CurrentGameDataProcessor) -> None:
+        self._proc_hash = None
+        self._proc = proc
+
+    @property
+    def state_hash(self) -> int:
+        """64-bit Zobrist hash of current game state. Hash is cached until
+        game is changed, so repeated reads are free: methods of GameLogic,
+        that change game, and access to proc invalidate it. For partially
+        loaded game hash of not loaded parts is got from stored hash,
+        because Zobrist hash is a xor of keys of all features.
+
+        Returns:
+            int: hash value
+        """
+        if self._proc_hash is None:
+            games = BatchGame.from_processors([self._proc])
+            self._proc_hash = int(hash_games(games)[0])
+        return self._proc_hash ^ self._hash_rest
+
     def get_api_scheme(self) -> CurrentGameDataApi:
         """Get ready to use api scheme
 
         Returns:
             CurrentGameDataApi: api scheme
         """
-        data = self.proc.dict(by_alias=True)
-        return CurrentGameDataApi(**data)
-
+        with stage('serialize'):
+            data = self._proc.dict(by_alias=True)
+            # discarded groups are kept in pile as cards, api shows ids
+            groups = data['decks']['groups']
+            groups['pile'] = [
+                group['name'] if isinstance(group, dict) else group
+                for group in groups['pile']
+                    ]
+            data['actions'] = self.get_legal_actions()
+            data['state_version'] = self.game.state_hash \
+                or f'{self.state_hash:016x}'
+            return CurrentGameDataApi(**data)
+
+    @mutation
     def deal_and_shuffle_decks(self) -> 'GameLogic':
         """Deal and shuffle objective and group decks
 
         Returns:
             GameLogic
         """
-        self.proc.decks.groups.deal().shuffle()
-        self.proc.decks.objectives.deal().shuffle()
+        self._proc.decks.groups.deal().shuffle()
+        self._proc.decks.objectives.deal().shuffle()
 
         return self
 
+    @mutation
     def set_faction(self, faction: Factions) -> 'GameLogic':
         """Set player and opponent faction
 
@@ -86,34 +168,35 @@ class GameLogic:
         Returns:
             GameLogic
         """
-        if isinstance(self.proc.players.player.faction, str):
+        if isinstance(self._proc.players.player.faction, str):
             raise HTTPException(
                 status_code=409,
                 detail="You cant change faction because is chosen yet"
                     )
 
-        self.proc.players.player.faction = faction.value
-        self.proc.players.opponent.faction = Factions.KGB \
+        self._proc.players.player.faction = faction.value
+        self._proc.players.opponent.faction = Factions.KGB \
             if faction == Factions.CIA else Factions.CIA
 
         return self
 
+    @mutation
     def set_next_turn(self) -> 'GameLogic':
         """Set next turn
 
         Returns:
             GameLogic
         """
-        if self.proc.steps.is_game_ends is True:
+        if self._proc.steps.is_game_ends is True:
             raise HTTPException(
                 status_code=409,
                 detail="Something can't be changed, because game is end"
                     )
 
-        if self.proc.steps.last_id == Phases.DETENTE.value:
+        if self._proc.steps.last_id == Phases.DETENTE.value:
 
-            self.proc.steps.game_turn += 1
-            self.proc.steps.deal().pop()
+            self._proc.steps.game_turn += 1
+            self._proc.steps.deal().pop()
 
         else:
             raise HTTPException(
@@ -123,17 +206,19 @@ class GameLogic:
 
         return self
 
+    @mutation
     def set_next_phase(self) -> 'GameLogic':
         """Set next phase
 
         Returns:
             GameLogic
         """
-        if self.proc.steps.last_id != Phases.DETENTE.value:
-            self.proc.steps.pop()
+        if self._proc.steps.last_id != Phases.DETENTE.value:
+            self._proc.steps.pop()
 
         return self
 
+    @mutation
     def set_mission_card(self) -> 'GameLogic':
         """Set mission card on a turn
 
@@ -141,7 +226,7 @@ class GameLogic:
             GameLogic
         """
         try:
-            self.proc.decks.objectives.pop()
+            self._proc.decks.objectives.pop()
         except IndexError:
             raise HTTPException(
                 status_code=409,
@@ -150,17 +235,18 @@ class GameLogic:
 
         return self
 
+    @mutation
     def set_balance(self) -> 'GameLogic':
         """Set balance to the turn. Balance is used in influence struggle.
 
         Returns:
             GameLogic
         """
-        if self.proc.steps.game_turn == 1:
-            val = True if self.proc.coin.roll()[0] == 1 else False
-        elif self.proc.players.player.score < self.proc.players.opponent.score:
+        if self._proc.steps.game_turn == 1:
+            val = True if self._proc.coin.roll()[0] == 1 else False
+        elif self._proc.players.player.score < self._proc.players.opponent.score:
             val = True
-        elif self.proc.players.player.score > self.proc.players.opponent.score:
+        elif self._proc.players.player.score > self._proc.players.opponent.score:
             val = False
         else:
             # TODO: change condition:
@@ -168,16 +254,16 @@ class GameLogic:
             # if both loose -> return self
             return self
 
-        self.proc.players.player.has_balance = val
-        self.proc.players.opponent.has_balance = not val
+        self._proc.players.player.has_balance = val
+        self._proc.players.opponent.has_balance = not val
 
         return self
 
     def _get_side_proc(self, side: Sides) -> Union[PlayerProcessor, OpponentProcessor]:
         if side == Sides.PLAYER:
-            return self.proc.players.player
+            return self._proc.players.player
         else:
-            return self.proc.players.opponent
+            return self._proc.players.opponent
 
     def _check_analyct_condition(self, side: Sides = Sides.PLAYER) -> None:
         """Check conditions for play analyst ability
@@ -185,7 +271,7 @@ class GameLogic:
         Args:
             side (Sides): player or opponent, default to 'player'
         """
-        if self.proc.steps.last_id != Phases.BRIEFING:
+        if self._proc.steps.last_id != Phases.BRIEFING:
             raise HTTPException(
                 status_code=409,
                 detail="Analyst ability can be played only in 'briefing' phase."
@@ -196,6 +282,7 @@ class GameLogic:
                 detail="No access to play ability of Analyst agent card."
                     )
 
+    @mutation
     def play_analyst_for_look_the_top(self, side: Sides = Sides.PLAYER) -> 'GameLogic':
         """Play analyst abylity for look the top cards
 
@@ -210,12 +297,12 @@ class GameLogic:
         if side == Sides.PLAYER:
             rev =  all([
                 card.is_revealed_to_player for card
-                in self.proc.decks.groups.current
+                in self._proc.decks.groups.current
                     ][-3:])
         else:
             rev =  all([
                 card.is_revealed_to_opponent for card
-                in self.proc.decks.groups.current
+                in self._proc.decks.groups.current
                     ][-3:])
         if rev:
             raise HTTPException(
@@ -225,13 +312,14 @@ class GameLogic:
 
         if side == Sides.PLAYER:
             for pos in range(-3, 0):
-                self.proc.decks.groups.current[pos].is_revealed_to_player = True
+                self._proc.decks.groups.current[pos].is_revealed_to_player = True
         else:
             for pos in range(-3, 0):
-                self.proc.decks.groups.current[pos].is_revealed_to_opponent = True
+                self._proc.decks.groups.current[pos].is_revealed_to_opponent = True
 
         return self
 
+    @mutation
     def play_analyst_for_arrange_the_top(
         self,
         top: list[Groups],
@@ -249,7 +337,7 @@ class GameLogic:
         self._check_analyct_condition(side)
 
         try:
-            self.proc.decks.groups.reorderfrom(top, len(self.proc.decks.groups.current)-3)
+            self._proc.decks.groups.reorderfrom(top, len(self._proc.decks.groups.current)-3)
             self._get_side_proc(side).awaiting_abilities.remove(Agents.ANALYST.value)
 
         except errors.ArrangeIndexError:
@@ -260,6 +348,7 @@ class GameLogic:
 
         return self
 
+    @mutation
     def set_agent_x(
         self,
         agent: Agents,
@@ -274,7 +363,7 @@ class GameLogic:
         Returns:
             GameLogic
         """
-        if self.proc.steps.last_id != Phases.PLANNING:
+        if self._proc.steps.last_id != Phases.PLANNING:
             raise HTTPException(
                 status_code=409,
                 detail="Agent can be set only in 'planning' phase."
@@ -300,19 +389,20 @@ class GameLogic:
     def _check_influence_condition(self) -> None:
         """Check influence struggle conditions
         """
-        if self.proc.steps.last_id != Phases.INFLUENCE:
+        if self._proc.steps.last_id != Phases.INFLUENCE:
             raise HTTPException(
                 status_code=409,
                 detail="Group can be recruited only in 'influence struggle' phase."
                     )
 
-        if self.proc.players.player.influence_pass is True and \
-                self.proc.players.opponent.influence_pass is True:
+        if self._proc.players.player.influence_pass is True and \
+                self._proc.players.opponent.influence_pass is True:
             raise HTTPException(
                 status_code=409,
                 detail="Both sides are pass. You cant do anithing."
                     )
 
+    @mutation
     def recruit_group(self, side: Sides = Sides.PLAYER) -> 'GameLogic':
         """Recruit group
 
@@ -325,17 +415,18 @@ class GameLogic:
         self._check_influence_condition()
 
         if side == Sides.PLAYER:
-            owned = self.proc.decks.groups.owned_by_player
+            owned = self._proc.decks.groups.owned_by_player
         else:
-            owned = self.proc.decks.groups.owned_by_opponent
+            owned = self._proc.decks.groups.owned_by_opponent
 
-        draw = self.proc.decks.groups.pop()
+        draw = self._proc.decks.groups.pop()
         draw.is_revealed_to_player = True
         draw.is_revealed_to_opponent = True
         owned.append(draw)
 
         return self
 
+    @mutation
     def activate_group(
         self,
         source: Groups,
@@ -357,6 +448,7 @@ class GameLogic:
         return self
 
 
+    @mutation
     def pass_influence(self, side: Sides = Sides.PLAYER) -> 'GameLogic':
         """Pass in influence phase
 
@@ -369,9 +461,9 @@ class GameLogic:
         self._check_influence_condition()
 
         if side == Sides.PLAYER:
-            owned = self.proc.decks.groups.owned_by_player
+            owned = self._proc.decks.groups.owned_by_player
         else:
-            owned = self.proc.decks.groups.owned_by_opponent
+            owned = self._proc.decks.groups.owned_by_opponent
 
         if len(owned) == 0:
             raise HTTPException(
@@ -401,10 +493,11 @@ class GameLogic:
             if group.id.value not in MilitaryGroups.get_values():
                 result.append(group)
             else:
-                self.proc.decks.groups.pile.append(group)
+                self._proc.decks.groups.pile.append(group)
 
         return result
 
+    @mutation
     def nuclear_escalation(self, side: Sides = Sides.PLAYER) -> 'GameLogic':
         """Pass in influence phase
 
@@ -417,21 +510,21 @@ class GameLogic:
         self._check_influence_condition()
 
         if side == Sides.PLAYER:
-            owned_ob = self.proc.decks.objectives.owned_by_player
+            owned_ob = self._proc.decks.objectives.owned_by_player
         else:
-            owned_ob = self.proc.decks.objectives.owned_by_opponent
+            owned_ob = self._proc.decks.objectives.owned_by_opponent
 
         for ind, objective in enumerate(owned_ob):
             if objective is Objectives.NUCLEARESCALATION:
 
-                self.proc.decks.groups.owned_by_player = self._discard_all_military_groups(
-                    self.proc.decks.groups.owned_by_player
+                self._proc.decks.groups.owned_by_player = self._discard_all_military_groups(
+                    self._proc.decks.groups.owned_by_player
                         )
-                self.proc.decks.groups.owned_by_opponent = self._discard_all_military_groups(
-                    self.proc.decks.groups.owned_by_opponent
+                self._proc.decks.groups.owned_by_opponent = self._discard_all_military_groups(
+                    self._proc.decks.groups.owned_by_opponent
                         )
 
-                self.proc.decks.objectives.pile.append(objective)
+                self._proc.decks.objectives.pile.append(objective)
                 del owned_ob[ind]
 
                 return self
@@ -441,178 +534,96 @@ class GameLogic:
             detail="Nuclear escalation not available for this player."
                 )
 
-    def chek_phase_conditions_before_next(self) -> 'GameLogic':
-        """Check game conition before push to next phase
-        and raise exception if any check fails
+    def get_legal_actions(self, side: Sides = Sides.PLAYER) -> LegalActions:
+        """Get all actions, that side can do in current game state.
+        Conditions are the same as in action methods, but checked
+        in one pass without exceptions.
+
+        Args:
+            side (Sides): player or opponent, default to 'player'
 
         Returns:
-            GameLogic
+            LegalActions: available actions
         """
-        # game is over
-        if self.proc.steps.is_game_ends:
-            raise HTTPException(
-                status_code=409,
-                detail="Something can't be changed, because game is end"
-                    )
-
-        # phase = self.G.c.steps.turn_phase
-        phase = self.proc.steps.last_id
-
-        # briefing
-        if phase == Phases.BRIEFING:
-
-            # game is not started
-            if self.proc.players.player.faction is None \
-                    or self.proc.players.opponent.faction is None:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Faction not choosen. Use game/reset/faction to set faction."
-                        )
-
-            # objective card not defined
-            if self.proc.decks.objectives.last is None:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Mission card undefined. Cant push to next phase."
-                        )
-
-            # players has't balance
-            if self.proc.players.player.has_balance is self.proc.players.opponent.has_balance:
-                raise HTTPException(
-                    status_code=409,
-                    detail="No one side has balance. Cant push to next phase."
-                        )
-
-            # analyst not used
-            if Agents.ANALYST in self.proc.players.player.awaiting_abilities:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Analyst ability must be used by player."
-                        )
-
-            if Agents.ANALYST in self.proc.players.opponent.awaiting_abilities:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Analyst ability must be used by opponent."
-                        )
-
-        # planning
-        elif phase == Phases.PLANNING:
-
-            # agent not choosen
-            if self.proc.players.player.agents.agent_x is None:
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"Agent for player not choosen."
-                        )
+        steps = self._proc.steps
+        user = self._get_side_proc(side)
+        phase = steps.last_id
+        is_active = steps.is_game_ends is not True
+        blockers = self.get_phase_blockers()
 
-            if self.proc.players.opponent.agents.agent_x is None:
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"Agent for opponent not choosen."
-                        )
+        analyst = is_active and phase == Phases.BRIEFING \
+            and Agents.ANALYST in user.awaiting_abilities
+        if side == Sides.PLAYER:
+            revealed = [
+                card.is_revealed_to_player for card
+                in self._proc.decks.groups.current
+                    ][-3:]
+            owned = self._proc.decks.groups.owned_by_player
+            owned_ob = self._proc.decks.objectives.owned_by_player
+        else:
+            revealed = [
+                card.is_revealed_to_opponent for card
+                in self._proc.decks.groups.current
+                    ][-3:]
+            owned = self._proc.decks.groups.owned_by_opponent
+            owned_ob = self._proc.decks.objectives.owned_by_opponent
+
+        influence = is_active and phase == Phases.INFLUENCE and not (
+            self._proc.players.player.influence_pass is True
+            and self._proc.players.opponent.influence_pass is True
+                )
 
-        # influence_struggle
-        elif phase == Phases.INFLUENCE:
+        return LegalActions(
+            preset=user.faction is None,
+            next_turn=is_active and phase == Phases.DETENTE.value,
+            next_phase=not blockers,
+            phase_blockers=blockers,
+            analyst_look=analyst and not all(revealed),
+            analyst_arrange=analyst and len(self._proc.decks.groups.current) > 3,
+            agent_x=[
+                agent.id for agent in user.agents.current
+                if agent.is_in_headquarter is True
+                    ] if is_active and phase == Phases.PLANNING else [],
+            recruit=influence and len(self._proc.decks.groups.current) > 0,
+            pass_influence=influence and len(owned) > 0,
+            nuclear_escalation=influence and Objectives.NUCLEARESCALATION in owned_ob,
+                )
 
-            # Both players must pass in group subgame
-            if self.proc.players.player.influence_pass is not True or \
-                self.proc.players.opponent.influence_pass is not True:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Both side must pass in group subgame before next phase."
-                        )
+    def get_phase_blockers(self) -> list[str]:
+        """Get all reasons, why phase can't be pushed to next
 
-        # ceasefire
-        elif phase == Phases.CEASEFIRE:
-            pass
+        Returns:
+            list[str]: details of failed phase guards
+        """
+        return list(phases.iter_blockers(self._proc))
 
-        # debriefing
-        elif phase == Phases.DEBRIFIENG:
-            pass
+    @timed('rules')
+    def chek_phase_conditions_before_next(self) -> 'GameLogic':
+        """Check game conition before push to next phase
+        and raise exception if any check fails
 
-        # detente
-        elif phase == Phases.DETENTE:
+        Returns:
+            GameLogic
+        """
+        detail = next(phases.iter_blockers(self._proc), None)
+        if detail is not None:
             raise HTTPException(
                 status_code=409,
-                detail="This phase is last in a turn. Change turn number "
-                        "before get next phase"
+                detail=detail
                     )
 
         return self
 
+    @mutation
+    @timed('rules')
     def set_phase_conditions_after_next(self) -> 'GameLogic':
         """Set som phase conditions after push phase
 
         Returns:
             GameLogic
         """
-        phase = self.proc.steps.last_id
-
-        # set briefing states after next
-        if phase == Phases.BRIEFING:
-
-            self.set_mission_card()
-            self.set_balance()
-            self.proc.decks.groups.deal()
-            self.proc.decks.groups.pile.clear()
-            self.proc.decks.groups.owned_by_opponent.clear()
-            self.proc.decks.groups.owned_by_player.clear()
-
-        # planning
-        elif phase == Phases.PLANNING:
-            pass
-
-
-        # influence_struggle
-        elif phase == Phases.INFLUENCE:
-
-            # return all agents from on_leave to headquarter
-            for deck in [
-                self.proc.players.player.agents.current,
-                self.proc.players.opponent.agents.current
-                    ]:
-                for agent in deck:
-                    if agent.is_on_leave == True:
-                        agent.is_on_leave = False
-                        agent.is_in_headquarter = False
-                        agent.is_revealed = False
-
-        # ceasefire
-        elif phase == Phases.CEASEFIRE:
-
-            # clear influence struggle pass
-            self.proc.players.player.influence_pass = False
-            self.proc.players.opponent.influence_pass = False
-
-        # debriefing
-        elif phase == Phases.DEBRIFIENG:
-
-            # open all agents in play
-            for deck in [
-                self.proc.players.player.agents.current,
-                self.proc.players.opponent.agents.current
-                    ]:
-                for agent in deck:
-                    if agent.is_agent_x == True:
-                        agent.is_revealed = True
-
-        # detente
-        elif phase == Phases.DETENTE:
-
-            # put agents to on_leave from play
-            for deck in [
-                self.proc.players.player.agents.current,
-                self.proc.players.opponent.agents.current
-                    ]:
-                for agent in deck:
-                    if agent.is_agent_x == True:
-                        agent.is_agent_x = False
-                    if agent.id == Agents.DEPUTY:
-                        agent.is_in_headquarter = True
-                        agent.is_revealed = False
-                    else:
-                        agent.is_on_leave = True
-                        agent.is_revealed = True
+        rule = phases.PHASE_RULES.get(self._proc.steps.last_id)
+        if rule is not None and rule.effect is not None:
+            rule.effect(self)
 
         return self
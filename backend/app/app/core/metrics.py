@@ -0,0 +1,255 @@
+import math
+from threading import Lock
+from typing import Iterable, Union
+
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+        )
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: Union[int, float]) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [
+        f'{name}="{value}"' for name, value in zip(names, values)
+            ]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class BaseMetric:
+    """Base metric, rendered in prometheus text exposition format
+    """
+    kind: str = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+            ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+
+    def _check_labels(self, labelvalues: LabelValues) -> None:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, "
+                f"given {labelvalues}"
+                    )
+
+    def collect(self) -> list[str]:
+        """Get metric samples lines
+
+        Returns:
+            list[str]: exposition lines
+        """
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Render metric with help and type headers
+
+        Returns:
+            str: exposition text
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+                ]
+        lines.extend(self.collect())
+        return '\n'.join(lines)
+
+
+class Counter(BaseMetric):
+    """Monotonic counter
+    """
+    kind = 'counter'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+            ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: str) -> None:
+        """Increment counter
+
+        Args:
+            amount (float): increment, must be non-negative. Default to 1.0
+            labelvalues (str): values of metric labels
+        """
+        if amount < 0:
+            raise ValueError('Counter can be only incremented')
+        self._check_labels(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels)} '
+            f'{_format_value(value)}'
+            for labels, value in items
+                ]
+
+
+class Gauge(Counter):
+    """Gauge, that can go up and down
+    """
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1.0, *labelvalues: str) -> None:
+        self._check_labels(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *labelvalues: str) -> None:
+        self.inc(-amount, *labelvalues)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._check_labels(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(BaseMetric):
+    """Histogram with cumulative buckets
+    """
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+            ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf, )
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Observe value
+
+        Args:
+            value (float): observed value, for timings in seconds
+            labelvalues (str): values of metric labels
+        """
+        self._check_labels(labelvalues)
+        with self._lock:
+            counts = self._counts.get(labelvalues)
+            if counts is None:
+                counts = self._counts[labelvalues] = [0] * len(self.buckets)
+                self._sums[labelvalues] = 0.0
+            for num, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[num] += 1
+                    break
+            self._sums[labelvalues] += value
+
+    def get_count(self, *labelvalues: str) -> int:
+        return sum(self._counts.get(labelvalues, []))
+
+    def collect(self) -> list[str]:
+        lines = []
+        with self._lock:
+            items = [
+                (labels, list(counts), self._sums[labels])
+                for labels, counts in self._counts.items()
+                    ]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                names = self.labelnames + ('le', )
+                values = labels + (_format_value(bound), )
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(names, values)} '
+                    f'{cumulative}'
+                        )
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_str} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_str} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Registry of process metrics
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, BaseMetric] = {}
+
+    def register(self, metric: BaseMetric) -> BaseMetric:
+        """Register metric
+
+        Args:
+            metric (BaseMetric): metric object
+
+        Returns:
+            BaseMetric: registered metric
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is registered yet")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+            ) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+            ) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+            ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in prometheus text exposition format
+
+        Returns:
+            str: exposition text
+        """
+        return '\n'.join(
+            metric.render() for metric in self._metrics.values()
+                ) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,173 @@
+from itertools import chain
+from typing import Callable, Iterator, NamedTuple, Optional, TYPE_CHECKING
+from app.schemas.scheme_game_current import CurrentGameDataProcessor
+from app.constructs import Phases, Agents
+
+
+if TYPE_CHECKING:
+    from app.core.logic import GameLogic
+
+
+class Guard(NamedTuple):
+    """Condition, that must be true to push phase to next
+    """
+    check: Callable[[CurrentGameDataProcessor], bool]
+    detail: str
+
+
+class PhaseRule(NamedTuple):
+    """Phase transition rule
+    """
+    phase: Phases
+    next: Optional[Phases]
+    guards: tuple[Guard, ...]
+    effect: Optional[Callable[['GameLogic'], None]]
+
+
+GAME_GUARDS = (
+    Guard(
+        lambda proc: proc.steps.is_game_ends is not True,
+        "Something can't be changed, because game is end"
+            ),
+        )
+
+BRIEFING_GUARDS = (
+    Guard(
+        lambda proc: proc.players.player.faction is not None
+        and proc.players.opponent.faction is not None,
+        "Faction not choosen. Use game/reset/faction to set faction."
+            ),
+    Guard(
+        lambda proc: proc.decks.objectives.last is not None,
+        "Mission card undefined. Cant push to next phase."
+            ),
+    Guard(
+        lambda proc: proc.players.player.has_balance
+        is not proc.players.opponent.has_balance,
+        "No one side has balance. Cant push to next phase."
+            ),
+    Guard(
+        lambda proc: Agents.ANALYST not in proc.players.player.awaiting_abilities,
+        "Analyst ability must be used by player."
+            ),
+    Guard(
+        lambda proc: Agents.ANALYST not in proc.players.opponent.awaiting_abilities,
+        "Analyst ability must be used by opponent."
+            ),
+        )
+
+PLANNING_GUARDS = (
+    Guard(
+        lambda proc: proc.players.player.agents.agent_x is not None,
+        "Agent for player not choosen."
+            ),
+    Guard(
+        lambda proc: proc.players.opponent.agents.agent_x is not None,
+        "Agent for opponent not choosen."
+            ),
+        )
+
+INFLUENCE_GUARDS = (
+    Guard(
+        lambda proc: proc.players.player.influence_pass is True
+        and proc.players.opponent.influence_pass is True,
+        "Both side must pass in group subgame before next phase."
+            ),
+        )
+
+DETENTE_GUARDS = (
+    Guard(
+        lambda proc: False,
+        "This phase is last in a turn. Change turn number "
+        "before get next phase"
+            ),
+        )
+
+
+def _iter_agents(proc: CurrentGameDataProcessor) -> chain:
+    return chain(
+        proc.players.player.agents.current,
+        proc.players.opponent.agents.current,
+            )
+
+
+def enter_briefing(logic: 'GameLogic') -> None:
+    """Deal mission card, set balance and return groups to deck
+    """
+    logic.set_mission_card()
+    logic.set_balance()
+    groups = logic.proc.decks.groups
+    groups.deal()
+    groups.pile.clear()
+    groups.owned_by_opponent.clear()
+    groups.owned_by_player.clear()
+
+
+def enter_influence(logic: 'GameLogic') -> None:
+    """Return all agents from leave to headquarter
+    """
+    for agent in _iter_agents(logic.proc):
+        if agent.is_on_leave is True:
+            agent.is_on_leave = False
+            agent.is_in_headquarter = False
+            agent.is_revealed = False
+
+
+def enter_ceasefire(logic: 'GameLogic') -> None:
+    """Clear influence struggle pass
+    """
+    logic.proc.players.player.influence_pass = False
+    logic.proc.players.opponent.influence_pass = False
+
+
+def enter_debriefing(logic: 'GameLogic') -> None:
+    """Open all agents in play
+    """
+    for agent in _iter_agents(logic.proc):
+        if agent.is_agent_x is True:
+            agent.is_revealed = True
+
+
+def enter_detente(logic: 'GameLogic') -> None:
+    """Put agents from play to leave
+    """
+    for agent in _iter_agents(logic.proc):
+        if agent.is_agent_x is True:
+            agent.is_agent_x = False
+        if agent.id == Agents.DEPUTY:
+            agent.is_in_headquarter = True
+            agent.is_revealed = False
+        else:
+            agent.is_on_leave = True
+            agent.is_revealed = True
+
+
+PHASE_RULES: dict[str, PhaseRule] = {
+    rule.phase.value: rule for rule in (
+        PhaseRule(Phases.BRIEFING, Phases.PLANNING, BRIEFING_GUARDS, enter_briefing),
+        PhaseRule(Phases.PLANNING, Phases.INFLUENCE, PLANNING_GUARDS, None),
+        PhaseRule(
+            Phases.INFLUENCE, Phases.CEASEFIRE, INFLUENCE_GUARDS, enter_influence
+                ),
+        PhaseRule(Phases.CEASEFIRE, Phases.DEBRIFIENG, (), enter_ceasefire),
+        PhaseRule(Phases.DEBRIFIENG, Phases.DETENTE, (), enter_debriefing),
+        PhaseRule(Phases.DETENTE, None, DETENTE_GUARDS, enter_detente),
+            )
+        }
+
+
+def iter_blockers(proc: CurrentGameDataProcessor) -> Iterator[str]:
+    """Lazy check guards of current phase. Guards are checked in order
+    only while next blocker is requested.
+
+    Args:
+        proc (CurrentGameDataProcessor): game processor
+
+    Yields:
+        str: detail of failed guard
+    """
+    rule = PHASE_RULES.get(proc.steps.last_id)
+    guards = GAME_GUARDS if rule is None else GAME_GUARDS + rule.guards
+    for guard in guards:
+        if not guard.check(proc):
+            yield guard.detail
@@ -0,0 +1,233 @@
+import os
+import sys
+import asyncio
+import random
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from functools import partial, wraps
+from types import FrameType
+from typing import Any, Callable, Iterable, Optional, TypeVar
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+
+T = TypeVar('T')
+
+# route of profiled call of async endpoint. Work of call, that runs in
+# threadpool by profiler.run_in_threadpool(), is sampled under this route
+profiled_route: ContextVar[Optional[str]] = ContextVar(
+    'profiled_route', default=None
+        )
+
+
+def _frame_name(frame: FrameType) -> str:
+    """Get frame name for collapsed stack
+
+    Args:
+        frame (FrameType): stack frame
+
+    Returns:
+        str: function name with short path and first line
+    """
+    code = frame.f_code
+    path = os.sep.join(code.co_filename.rsplit(os.sep, 2)[-2:])
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Statistical profiler of endpoints, that runs inside worker process.
+
+    Endpoints are wrapped with instrument_routes(). While profiler is
+    running, a fraction of endpoint calls is marked as profiled and
+    a sampler thread periodically collects stacks of threads, that are
+    executing marked calls. Async endpoints run on event loop thread
+    with other requests, so only their work, that is run by
+    run_in_threadpool() of profiler, is sampled. Result is a collapsed
+    stacks text, rooted by route, that can be used with flamegraph.pl
+    or speedscope.
+    """
+
+    def __init__(self) -> None:
+        self.is_running = False
+        self.rate = 1.0
+        self.route: Optional[str] = None
+        self.interval = 0.005
+        self._targets: dict[int, str] = {}
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._wrapper_codes: set[Any] = {self._call_traced.__code__}
+
+    def start(
+        self,
+        rate: float = 1.0,
+        route: Optional[str] = None,
+        interval: float = 0.005,
+            ) -> None:
+        """Start profiling
+
+        Args:
+            rate (float): fraction of profiled endpoint calls. Default to 1.0
+            route (str, optional): profile only routes with given path prefix.
+                                   Default to None
+            interval (float): sampling interval in seconds. Default to 0.005
+        """
+        with self._lock:
+            if self.is_running:
+                raise RuntimeError('Profiler is running yet')
+            self.rate = rate
+            self.route = route
+            self.interval = interval
+            self._stacks = Counter()
+            self._stop.clear()
+            self.is_running = True
+            self._thread = threading.Thread(
+                target=self._sample, name='sampling-profiler', daemon=True
+                    )
+            self._thread.start()
+
+    def stop(self) -> str:
+        """Stop profiling
+
+        Returns:
+            str: collapsed stacks
+        """
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+            self.is_running = False
+            self._targets.clear()
+            return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Get collected samples as collapsed stacks
+
+        Returns:
+            str: lines of 'route;frame;frame count'
+        """
+        return ''.join(
+            f'{stack} {count}\n' for stack, count
+            in sorted(self._stacks.items())
+                )
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, route in list(self._targets.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._stacks[self._collapse(route, frame)] += 1
+
+    def _collapse(self, route: str, frame: FrameType) -> str:
+        names = []
+        current: Optional[FrameType] = frame
+        while current is not None and current.f_code not in self._wrapper_codes:
+            names.append(_frame_name(current))
+            current = current.f_back
+        names.append(route)
+        return ';'.join(reversed(names))
+
+    def _is_sampled(self, path: str) -> bool:
+        if not self.is_running:
+            return False
+        if self.route is not None and not path.startswith(self.route):
+            return False
+        return self.rate >= 1.0 or random.random() < self.rate
+
+    def _call_traced(
+        self,
+        route: str,
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+            ) -> Any:
+        ident = threading.get_ident()
+        self._targets[ident] = route
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._targets.pop(ident, None)
+
+    def wrap(
+        self,
+        func: Callable[..., Any],
+        route: str,
+        path: str,
+            ) -> Callable[..., Any]:
+        """Wrap endpoint function to make it profiled. Sync function is
+        sampled in its thread, async function marks its context by route.
+
+        Args:
+            func (Callable[..., Any]): endpoint function
+            route (str): route name, used as stack root
+            path (str): route path, used for scope
+
+        Returns:
+            Callable[..., Any]: wrapped function
+        """
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self._is_sampled(path):
+                    return await func(*args, **kwargs)
+
+                token = profiled_route.set(route)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    profiled_route.reset(token)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self._is_sampled(path):
+                return func(*args, **kwargs)
+            return self._call_traced(route, func, *args, **kwargs)
+
+        return wrapper
+
+    async def run_in_threadpool(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+            ) -> T:
+        """Run function in threadpool. If it is called by profiled call of
+        async endpoint, function is sampled under route of endpoint.
+
+        Args:
+            func (Callable[..., T]): function
+            args, kwargs: arguments of function
+
+        Returns:
+            T: result of function
+        """
+        call = partial(func, *args, **kwargs)
+        route = profiled_route.get()
+        if route is None or not self.is_running:
+            return await run_in_threadpool(call)
+        return await run_in_threadpool(partial(self._call_traced, route, call))
+
+    def instrument_routes(self, routes: Iterable[Any]) -> None:
+        """Wrap endpoints of api routes
+
+        Args:
+            routes (Iterable[Any]): application routes
+        """
+        for route in routes:
+            if not isinstance(route, APIRoute) or route.dependant.call is None:
+                continue
+            if getattr(route.dependant.call, '_is_profiled', False):
+                continue
+            name = f"{','.join(sorted(route.methods))} {route.path}"
+            wrapped = self.wrap(route.dependant.call, name, route.path)
+            setattr(wrapped, '_is_profiled', True)
+            route.dependant.call = wrapped
+
+
+profiler = SamplingProfiler()
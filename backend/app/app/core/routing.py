@@ -0,0 +1,253 @@
+import re
+import asyncio
+import logging
+from bisect import bisect
+from hashlib import blake2b
+from itertools import cycle
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+GAME_ID_PATH = re.compile(r'/game/(?:data/current/)?([0-9a-f]{24})(?:/|$)')
+
+
+def hash_key(key: str) -> int:
+    """Get stable 64-bit hash of key. Builtin hash is salted by process,
+    so it can't be used in router.
+
+    Args:
+        key (str): key
+
+    Returns:
+        int: hash value
+    """
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hash ring. Every node has many points on ring, key is
+    owned by node of first point after hash of key. When node is added,
+    only keys between its points and previous points move to new node.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 64) -> None:
+        """
+        Args:
+            nodes (Iterable[str]): nodes, i.e. worker urls
+            vnodes (int): points of every node on ring. Default to 64
+        """
+        self.vnodes = vnodes
+        self.nodes: list[str] = []
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def _rebuild(self) -> None:
+        ring = sorted(
+            (hash_key(f'{node}#{num}'), node)
+            for node in self.nodes
+            for num in range(self.vnodes)
+                )
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def add(self, node: str) -> None:
+        """Add node to ring
+
+        Args:
+            node (str): node
+        """
+        if node not in self.nodes:
+            self.nodes.append(node)
+            self._rebuild()
+
+    def remove(self, node: str) -> None:
+        """Remove node from ring. Keys of node move to next nodes.
+
+        Args:
+            node (str): node
+        """
+        if node in self.nodes:
+            self.nodes.remove(node)
+            self._rebuild()
+
+    def get(self, key: str) -> str:
+        """Get node of key
+
+        Args:
+            key (str): key, i.e. game id
+
+        Returns:
+            str: node
+        """
+        if not self._points:
+            raise LookupError('Hash ring has no nodes')
+        num = bisect(self._points, hash_key(key)) % len(self._points)
+        return self._owners[num]
+
+
+def get_route_key(path: str, authorization: Optional[str] = None) -> Optional[str]:
+    """Get key of request for routing. Requests of game are routed by
+    game id, other requests of user are routed by access token.
+
+    Args:
+        path (str): request path
+        authorization (str, optional): authorization header
+
+    Returns:
+        str, optional: route key or None, if request can go to any worker
+    """
+    match = GAME_ID_PATH.search(path)
+    if match is not None:
+        return match.group(1)
+    return authorization
+
+
+# headers of connection between client and router, that aren't forwarded
+HOP_HEADERS = {
+    b'connection', b'keep-alive', b'transfer-encoding', b'content-length',
+    b'upgrade', b'te', b'trailer', b'proxy-connection',
+        }
+
+
+def _decode_chunked(body: bytes) -> bytes:
+    result = bytearray()
+    while body:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line.split(b';')[0], 16)
+        if size == 0:
+            break
+        result += body[:size]
+        body = body[size + 2:]
+    return bytes(result)
+
+
+class Router:
+    """ASGI front process, that proxies requests to api workers. Requests
+    of same game always go to same worker by consistent hashing of game
+    id, so in-process game state, i.e. game actors, stays warm. Requests
+    without game id are routed by access token or in turn. Worker,
+    that doesn't respond in timeout, gets 504.
+    """
+
+    def __init__(
+        self,
+        workers: list[str],
+        vnodes: int = 64,
+        timeout: float = 30.0,
+            ) -> None:
+        """
+        Args:
+            workers (list[str]): worker urls, i.e. http://127.0.0.1:8001
+            vnodes (int): points of every worker on hash ring
+            timeout (float): seconds to connect to worker and get whole
+                             response. Default to 30
+        """
+        self.ring = HashRing(workers, vnodes)
+        self.timeout = timeout
+        self._turn = cycle(workers)
+
+    def get_worker(self, scope: Scope) -> str:
+        """Get worker of request
+
+        Args:
+            scope (Scope): http scope
+
+        Returns:
+            str: worker url
+        """
+        authorization = dict(scope['headers']).get(b'authorization')
+        key = get_route_key(
+            scope['path'],
+            None if authorization is None else authorization.decode('latin-1'),
+                )
+        return next(self._turn) if key is None else self.ring.get(key)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                await send({'type': message['type'] + '.complete'})
+                if message['type'] == 'lifespan.shutdown':
+                    return
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Unsupported scope {scope['type']}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+
+        worker = self.get_worker(scope)
+        try:
+            status, headers, content = await asyncio.wait_for(
+                self._forward(worker, scope, bytes(body)), self.timeout
+                    )
+        except asyncio.TimeoutError:
+            logger.error('Worker %s timed out', worker)
+            status, headers, content = 504, [], b'Gateway timeout'
+        except (OSError, ValueError, IndexError):
+            logger.exception('Worker %s is not available', worker)
+            status, headers, content = 502, [], b'Bad gateway'
+        if status >= 200 and status not in (204, 304):
+            headers.append((b'content-length', str(len(content)).encode()))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+                })
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _forward(
+        self,
+        worker: str,
+        scope: Scope,
+        body: bytes,
+            ) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        """Send request to worker with one connection per request. HTTP/1.0
+        is used, so response ends with connection close.
+        """
+        url = urlsplit(worker)
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        try:
+            target = scope.get('raw_path') or scope['path'].encode()
+            if scope.get('query_string'):
+                target += b'?' + scope['query_string']
+            lines = [scope['method'].encode() + b' ' + target + b' HTTP/1.0']
+            lines.extend(
+                name + b': ' + value for name, value in scope['headers']
+                if name not in HOP_HEADERS
+                    )
+            if scope.get('client'):
+                lines.append(b'x-forwarded-for: ' + scope['client'][0].encode())
+            lines.append(b'content-length: ' + str(len(body)).encode())
+            lines.append(b'connection: close')
+            writer.write(b'\r\n'.join(lines) + b'\r\n\r\n' + body)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+
+        head, _, content = response.partition(b'\r\n\r\n')
+        status_line, *header_lines = head.split(b'\r\n')
+        status = int(status_line.split(b' ', 2)[1])
+        headers = []
+        chunked = False
+        for line in header_lines:
+            name, _, value = line.partition(b':')
+            name = name.strip().lower()
+            value = value.strip()
+            if name == b'transfer-encoding' and value.lower() == b'chunked':
+                chunked = True
+            if name not in HOP_HEADERS:
+                headers.append((name, value))
+        return status, headers, _decode_chunked(content) if chunked else content
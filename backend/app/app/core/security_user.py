@@ -3,12 +3,14 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from app.schemas import scheme_user
 from app.crud import crud_user
+from app.core.timing import timed
 from app.config import settings
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_v1_str}/user/login")
 
 
+@timed('auth')
 def get_current_user(token: str = Depends(oauth2_scheme)) -> scheme_user.User:
     """Get current verified user
     """
@@ -46,3 +48,17 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
 
     return user
+
+
+def get_current_admin_user(
+    user: scheme_user.User = Depends(get_current_active_user)
+        ) -> scheme_user.User:
+    """Get current verified active admin user
+    """
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough privileges"
+                )
+
+    return user
@@ -0,0 +1,86 @@
+from threading import Event, Lock
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+from app.core.metrics import registry
+
+
+T = TypeVar('T')
+
+SINGLEFLIGHT_CALLS = registry.counter(
+    'coldwar_singleflight_calls_total',
+    'Calls of single-flight groups',
+    ('group', ),
+        )
+SINGLEFLIGHT_COALESCED = registry.counter(
+    'coldwar_singleflight_coalesced_total',
+    'Calls, that waited for result of call in flight instead of own call',
+    ('group', ),
+        )
+
+
+class _Call(Generic[T]):
+    """Call in flight
+    """
+
+    def __init__(self) -> None:
+        self.done = Event()
+        # result is set by caller, that runs function, before done
+        self.result: T
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """Coalescing of concurrent calls with same key. First caller runs
+    function, callers that come while it runs wait and get same result
+    or exception. Results are not cached after call is done.
+    """
+
+    def __init__(self, group: str) -> None:
+        """
+        Args:
+            group (str): name of group in metrics
+        """
+        self.group = group
+        self._lock = Lock()
+        self._calls: dict[Hashable, _Call[T]] = {}
+
+    def do(
+        self,
+        key: Hashable,
+        func: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+            ) -> T:
+        """Run function or wait for result of call in flight with same key
+
+        Args:
+            key (Hashable): key of call
+            func (Callable[..., T]): function
+            args, kwargs: arguments of function
+
+        Returns:
+            T: result of function
+        """
+        SINGLEFLIGHT_CALLS.inc(1, self.group)
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is None:
+                call: _Call[T] = _Call()
+                self._calls[key] = call
+
+        if flight is not None:
+            SINGLEFLIGHT_COALESCED.inc(1, self.group)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,58 @@
+import os
+import socket
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from app.crud import crud_game_archive
+from app.core.metrics import registry
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_GAMES = registry.counter(
+    'coldwar_archived_games_total',
+    'Finished and expired games moved to archive',
+        )
+_tasks: set[asyncio.Task] = set()
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}'
+
+
+async def archive_games_periodically() -> None:
+    """Move finished and expired games to archive in batches.
+
+    Job is started in each worker, but games are archived only by
+    worker, that holds archive lease. Lease is renewed every run and
+    lasts two intervals, so stopped worker is replaced by other one.
+    """
+    while True:
+        try:
+            is_owner = await run_in_threadpool(
+                crud_game_archive.archive.acquire_run,
+                WORKER_ID,
+                settings.archive_interval_seconds * 2,
+                    )
+            if is_owner:
+                count = await run_in_threadpool(
+                    crud_game_archive.archive.archive_all
+                        )
+                ARCHIVED_GAMES.inc(count)
+        except Exception:
+            logger.exception('Games archive run is failed')
+        await asyncio.sleep(settings.archive_interval_seconds)
+
+
+def start_background_tasks() -> None:
+    """Start enabled background tasks of worker
+    """
+    if settings.archive_enabled:
+        task = asyncio.create_task(archive_games_periodically())
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+def stop_background_tasks() -> None:
+    """Cancel background tasks of worker
+    """
+    for task in list(_tasks):
+        task.cancel()
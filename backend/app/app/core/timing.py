@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Iterator, Optional, TypeVar, cast
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import registry
+from app.config import settings
+
+
+F = TypeVar('F', bound=Callable[..., Any])
+Stages = list[tuple[str, float]]
+
+STAGE_SECONDS = registry.histogram(
+    'coldwar_request_stage_seconds',
+    'Time spent in a stage of request processing',
+    ('stage', ),
+        )
+_stages: ContextVar[Optional[Stages]] = ContextVar('stages', default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measure a stage of request processing.
+
+    Duration is observed in stage histogram and is added to
+    Server-Timing header of current response. Do nothing if
+    timing is disabled in settings.
+
+    Args:
+        name (str): stage name
+    """
+    if not settings.timing_enabled:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        duration = perf_counter() - start
+        STAGE_SECONDS.observe(duration, name)
+        stages = _stages.get()
+        if stages is not None:
+            stages.append((name, duration))
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorate function to measure it as a stage of request processing
+
+    Args:
+        name (str): stage name
+    """
+    def decorator(func: F) -> F:
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not settings.timing_enabled:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def format_server_timing(stages: Stages) -> str:
+    """Format stages to Server-Timing header value
+
+    Args:
+        stages (Stages): stage names and durations in seconds
+
+    Returns:
+        str: header value
+    """
+    return ', '.join(
+        f'{name};dur={duration * 1000:.3f}' for name, duration in stages
+            )
+
+
+class ServerTimingMiddleware:
+    """Collect request stages and send it in Server-Timing header
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not settings.timing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stages: Stages = []
+        token = _stages.set(stages)
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start' and stages:
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', format_server_timing(stages))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _stages.reset(token)
@@ -0,0 +1,83 @@
+import numpy as np
+from app.core.batch import BatchGame, PHASES, GROUPS, OBJECTIVES
+
+
+SEED = 20230220
+
+# count of values of every feature of batch game
+VALUES = {
+    'turn': 256,
+    'phase': len(PHASES),
+    'is_game_ends': 2,
+    'faction': 3,
+    'score': 101,
+    'has_balance': 2,
+    'influence_pass': 2,
+    'awaiting': 4,
+    'agents': 32,
+    'group_zone': 6,
+    'group_pos': len(GROUPS) + 1,
+    'group_revealed': 2,
+    'objective_zone': 6,
+    'objective_pos': len(OBJECTIVES) + 1,
+        }
+
+# shift of features, that use -1 as empty value
+OFFSETS = {
+    'faction': 1,
+    'group_pos': 1,
+    'objective_pos': 1,
+        }
+
+
+def _make_keys() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(SEED)
+    empty = BatchGame(1)
+    return {
+        field: rng.integers(
+            0, np.iinfo(np.uint64).max,
+            size=(getattr(empty, field)[0].size, VALUES[field]),
+            dtype=np.uint64,
+            endpoint=True,
+                )
+        for field in BatchGame.FIELDS
+            }
+
+
+KEYS = _make_keys()
+
+
+def _codes(games: BatchGame, field: str) -> np.ndarray:
+    """Get value codes of field features
+
+    Args:
+        games (BatchGame): batch of games
+        field (str): name of batch field
+
+    Returns:
+        np.ndarray: codes with shape (size, features)
+    """
+    codes = getattr(games, field).reshape(games.size, -1).astype(np.int64)
+    if field == 'turn':
+        return codes % VALUES['turn']
+    if field == 'score':
+        return codes.clip(0, VALUES['score'] - 1)
+    return codes + OFFSETS.get(field, 0)
+
+
+def hash_games(games: BatchGame) -> np.ndarray:
+    """Get Zobrist hashes of all games of batch
+
+    Args:
+        games (BatchGame): batch of games
+
+    Returns:
+        np.ndarray: uint64 hash of every game
+    """
+    result = np.zeros(games.size, np.uint64)
+    for field, keys in KEYS.items():
+        codes = _codes(games, field)
+        result ^= np.bitwise_xor.reduce(
+            keys[np.arange(codes.shape[1]), codes], axis=1
+                )
+    return result
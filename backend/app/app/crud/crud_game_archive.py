@@ -0,0 +1,204 @@
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Optional, Type
+from bson import BSON, ObjectId
+from mongoengine import Q
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from app.crud import crud_base
+from app.models.model_game_current import CurrentGameData
+from app.models.model_game_archive import ArchivedGame
+from app.schemas.scheme_game_current import CurrentGameDataProcessor
+from app.config import settings
+
+
+class CRUDArchive(
+    crud_base.CRUDBase[
+        ArchivedGame,
+        CurrentGameDataProcessor
+            ]
+        ):
+    """Crud for archive of finished and expired games
+    """
+
+    def __init__(
+        self,
+        model: Type[ArchivedGame],
+        current: Type[CurrentGameData],
+            ):
+        """
+        CRUD object for archive operation.
+
+        **Parameters**
+
+        * `model`: A MongoDB model class of archived game
+        * `current`: A MongoDB model class of current game
+        """
+        self.model = model
+        self.current = current
+
+    def _get_archive_ids(
+        self,
+        batch_size: int,
+        expire_seconds: int,
+            ) -> list[ObjectId]:
+        """Get ids of finished or expired current games. Game is expired,
+        if it isn't saved for expire seconds. Games without time of last
+        save expire by creation time.
+        """
+        expired = datetime.utcnow() - timedelta(seconds=expire_seconds)
+        games = self.current.objects(
+            Q(steps__is_game_ends=True)
+            | Q(updated_at__lt=expired)
+            | (Q(updated_at=None) & Q(id__lt=ObjectId.from_datetime(expired)))
+                ).order_by('id').only('id').limit(batch_size)
+        return [game.id for game in games]
+
+    def acquire_run(self, owner: str, lease_seconds: int) -> bool:
+        """Take or renew lease of archive runs. Only owner of not expired
+        lease runs archive, so job of many workers archives games in one
+        worker. If owner stops, lease is taken by other worker after
+        it expires.
+
+        Args:
+            owner (str): id of worker
+            lease_seconds (int): lease duration
+
+        Returns:
+            bool: True if owner holds lease
+        """
+        now = datetime.utcnow()
+        try:
+            self.model._get_db()['archive_lease'].find_one_and_update(
+                {
+                    '_id': 'archive',
+                    '$or': [{'owner': owner}, {'expires_at': {'$lt': now}}],
+                        },
+                {'$set': {
+                    'owner': owner,
+                    'expires_at': now + timedelta(seconds=lease_seconds),
+                        }},
+                upsert=True,
+                    )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @staticmethod
+    def _to_archive(game: dict[str, Any]) -> dict[str, Any]:
+        """Build archive document from raw current game document
+        """
+        steps = game.get('steps', {})
+        player = game.get('players', {}).get('player', {})
+        opponent = game.get('players', {}).get('opponent', {})
+        return {
+            '_id': game['_id'],
+            'login': player.get('login'),
+            'opponent_login': opponent.get('login'),
+            'game_turn': steps.get('game_turn', 1),
+            'is_game_ends': steps.get('is_game_ends', False),
+            'player_score': player.get('score', 0),
+            'opponent_score': opponent.get('score', 0),
+            'player_faction': player.get('faction'),
+            'created_at': game['_id'].generation_time.replace(tzinfo=None),
+            'archived_at': datetime.utcnow(),
+            'data': zlib.compress(BSON.encode(game)),
+                }
+
+    def archive_games(
+        self,
+        batch_size: Optional[int] = None,
+        expire_seconds: Optional[int] = None,
+            ) -> int:
+        """Move one batch of finished or expired games to archive.
+        Archive is upserted before games are deleted, so interrupted
+        run can be safely repeated. Game is deleted only if it isn't
+        changed since it was archived.
+
+        Args:
+            batch_size (int, optional): max games moved.
+                                        Default to settings value
+            expire_seconds (int, optional): age of expired game.
+                                            Default to settings value
+
+        Returns:
+            int: count of games moved to archive
+        """
+        ids = self._get_archive_ids(
+            batch_size or settings.archive_batch_size,
+            expire_seconds or settings.game_expire_seconds,
+                )
+        if not ids:
+            return 0
+
+        games = list(self.current._get_collection().find(
+            {'_id': {'$in': ids}}, {'api_view': False}
+                ))
+        if not games:
+            return 0
+        self.model._get_collection().bulk_write(
+            [
+                ReplaceOne({'_id': game['_id']}, self._to_archive(game), upsert=True)
+                for game in games
+                    ],
+            ordered=False,
+                )
+        # game, that is changed after it is read, isn't deleted and is
+        # archived again by next run
+        result = self.current._get_collection().bulk_write(
+            [
+                DeleteOne({'_id': game['_id'], 'state_hash': game.get('state_hash')})
+                for game in games
+                    ],
+            ordered=False,
+                )
+
+        return result.deleted_count
+
+    def archive_all(
+        self,
+        batch_size: Optional[int] = None,
+        expire_seconds: Optional[int] = None,
+            ) -> int:
+        """Archive all finished or expired games batch by batch
+
+        Returns:
+            int: count of archived games
+        """
+        total = 0
+        while True:
+            count = self.archive_games(batch_size, expire_seconds)
+            total += count
+            if count == 0:
+                return total
+
+    def iter_games(
+        self,
+        login: Optional[str] = None,
+        batch_size: int = 100,
+        is_game_ends: Optional[bool] = None,
+            ) -> Iterator[dict[str, Any]]:
+        """Iterate over archived games for analytics
+
+        Args:
+            login (str, optional): player login. Default to None
+            batch_size (int): cursor batch size. Default to 100
+            is_game_ends (bool, optional): only finished (True) or only
+                                           expired (False) games.
+                                           Default to None
+
+        Yields:
+            dict[str, Any]: decompressed game document
+        """
+        query: dict[str, Any] = {} if login is None else {'login': login}
+        if is_game_ends is not None:
+            query['is_game_ends'] = is_game_ends
+        cursor = self.model._get_collection() \
+            .find(query, {'data': True}) \
+            .sort('_id', 1) \
+            .batch_size(batch_size)
+        for doc in cursor:
+            yield BSON(zlib.decompress(doc['data'])).decode()
+
+
+archive = CRUDArchive(ArchivedGame, CurrentGameData)
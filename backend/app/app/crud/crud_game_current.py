@@ -1,20 +1,131 @@
-from typing import Optional
+import random
+from copy import deepcopy
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from bson import ObjectId
+from fastapi import HTTPException
+from mongoengine.queryset import QuerySet
 from app.crud import crud_base
 from app.models.model_game_current import CurrentGameData
 from app.schemas.scheme_game_current import CurrentGameDataProcessor
 from app.core.logic import GameLogic
+from app.core.batch import BatchGame
+from app.core.zobrist import hash_games
+from app.core.singleflight import SingleFlight
+from app.core.timing import timed, stage
 from app.config import settings
 
 
+# parts of game document, that can be loaded and saved separately.
+# Players are always loaded, because game processor requires them
+STEPS = 'steps'
+PLAYERS = 'players'
+GROUPS = 'decks.groups'
+OBJECTIVES = 'decks.objectives'
+
+# fields of processor, that are restored from static data on load
+STORED_EXCLUDE = {
+    'steps': {
+        'last_id', 'current_ids', 'current', 'last'
+            },
+    'players': {
+        side: {
+            'agents': {
+                'in_headquarter', 'terminated', 'agent_x',
+                'on_leave', 'last', 'last_id', 'current_ids',
+                    },
+                }
+        for side in ('player', 'opponent')
+            },
+    'decks': {
+        'groups': {
+            'deck', 'current_ids', 'last', 'last_id',
+                },
+        'objectives': {
+            'deck', 'current_ids', 'last_id', 'mission'
+                },
+            },
+        }
+
+
+def _include(fields: Sequence[str]) -> dict[str, Any]:
+    include: dict[str, Any] = {}
+    for path in fields:
+        *parents, key = path.split('.')
+        node = include
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = ...
+    return include
+
+
+def _get_path(data: dict[str, Any], path: str) -> Any:
+    for key in path.split('.'):
+        data = data[key]
+    return data
+
+
+# templates of new game by model, built once in memory
+_templates: dict[type[CurrentGameData], dict[str, Any]] = {}
+
+
+def _build_new_game_template(model: type[CurrentGameData]) -> dict[str, Any]:
+    data = {
+        'players': {
+            'player': {'login': ''},
+            'opponent': {'login': settings.user2_login},
+                }
+            }
+    game_logic = GameLogic(model(**data))
+    game_logic.proc.decks.objectives.deal()
+    game_logic.proc.flusch()
+    data = game_logic.proc.dict(by_alias=True, exclude=STORED_EXCLUDE)
+    return model(**data).to_mongo().to_dict()
+
+
 class CRUDGame(
     crud_base.CRUDBase[
         CurrentGameData,
         CurrentGameDataProcessor
             ]
         ):
-    """Crud for game current state document
+    """Crud for game current state document. Concurrent loads of same
+    game share one db fetch.
     """
 
+    def __init__(self, model: type[CurrentGameData]) -> None:
+        super().__init__(model)
+        self._loads: SingleFlight[Optional[dict[str, Any]]] = \
+            SingleFlight('game_load')
+        self._views: SingleFlight[Any] = SingleFlight('game_view')
+
+    def _load(
+        self,
+        key: tuple,
+        query: QuerySet,
+        fields: Optional[Sequence[str]] = None,
+            ) -> Optional[CurrentGameData]:
+        """Fetch first document of query or wait for fetch in flight with
+        same key. Document object is built for every caller, because
+        actions change it.
+        """
+        son = self._loads.do(key, self._fetch, query, fields)
+        return None if son is None else self.model._from_son(deepcopy(son))
+
+    def _fetch(
+        self,
+        query: QuerySet,
+        fields: Optional[Sequence[str]] = None,
+            ) -> Optional[dict[str, Any]]:
+        query = query.as_pymongo()
+        if fields is None:
+            return query.first()
+        son = query.only(PLAYERS, 'state_hash', *fields).first()
+        if son is not None and son.get('state_hash') is None:
+            return query.first()
+        return son
+
+    @timed('db_read')
     def get_last_game(self, login: str) -> Optional[CurrentGameData]:
         """Get current game data from db
 
@@ -24,62 +135,234 @@ class CRUDGame(
         Returns:
             CurrentGameData, optional: bd data object
         """
-        return self.model.objects(players__player__login=login).first()
+        return self._load(
+            ('last', login),
+            self.model.objects(players__player__login=login),
+                )
+
+    @timed('db_read')
+    def get_game(
+        self,
+        game_id: str,
+        login: str,
+        fields: Optional[Sequence[str]] = None,
+            ) -> Optional[CurrentGameData]:
+        """Get game of player by id
+
+        Args:
+            game_id (str): game id
+            login (str): player login
+            fields (Sequence[str], optional): parts of game to load with
+                                              players and state hash.
+                                              Default to whole game
+
+        Returns:
+            CurrentGameData, optional: bd data object
+        """
+        if not ObjectId.is_valid(game_id):
+            return None
+        return self._load(
+            (game_id, login, None if fields is None else tuple(fields)),
+            self.model.objects(id=game_id, players__player__login=login),
+            fields,
+                )
+
+    def get_games(
+        self,
+        login: str,
+        after: Optional[str] = None,
+        limit: int = 20,
+            ) -> list[CurrentGameData]:
+        """Get page of player games, newest first.
+        Only fields for games list are fetched.
+
+        Args:
+            login (str): player login
+            after (str, optional): id of last game of previous page.
+                                   Default to None
+            limit (int): page size. Default to 20
+
+        Returns:
+            list[CurrentGameData]: bd data objects
+        """
+        query = {'players__player__login': login}
+        if after is not None:
+            if not ObjectId.is_valid(after):
+                return []
+            query['id__lt'] = after
+        return list(
+            self.model.objects(**query)
+                .order_by('-id')
+                .only(
+                    'id', 'steps.game_turn', 'steps.turn_phase',
+                    'steps.is_game_ends', 'players.player.faction',
+                        )
+                .limit(limit)
+                )
 
     def save_game_logic(
         self,
         game_logic: GameLogic,
+        if_unchanged: bool = False,
             ) -> GameLogic:
-        """Flusch and save to db current data t0o db
+        """Flusch and save to db current data t0o db.
+        Game is not saved if state hash not changed since last save.
+        Partially loaded game is saved only by loaded parts.
 
         Args:
             proc (CurrentGameDataProcessor): game scheme processor
+            if_unchanged (bool): save only if stored game isn't changed
+                                 since load or last save. Default to False
 
         Returns:
             CurrentGameDataProcessor: game scheme processor
+
+        Raises:
+            HTTPException: if stored game is changed by another request
         """
-        game_logic.proc.flusch()
-        data = game_logic.proc.dict(
-            by_alias=True,
-            exclude={
-                'steps': {
-                    'last_id', 'current_ids', 'current', 'last'
-                    },
-                'players': {
-                    'player': {
-                        'agents': {
-                            'in_headquarter', 'terminated', 'agent_x',
-                            'on_leave', 'last', 'last_id', 'current_ids',
-                            },
-                        },
-                    'opponent': {
-                        'agents': {
-                            'in_headquarter', 'terminated', 'agent_x',
-                            'on_leave', 'last', 'last_id', 'current_ids',
-                            },
-                        },
+        stored_hash = game_logic.game.state_hash
+        state_hash = f'{game_logic.state_hash:016x}'
+        if state_hash == stored_hash:
+            return game_logic
 
-                    },
-                'decks': {
-                    'groups': {
-                        'deck', 'current_ids', 'last', 'last_id',
-                        },
-                    'objectives': {
-                        'deck', 'current_ids', 'last_id', 'mission'
-                        },
-                    }
-                },
-            )
+        fields = game_logic.fields
+        with stage('serialize'):
+            game_logic.proc.flusch()
+            data = game_logic.proc.dict(
+                by_alias=True,
+                include=None if fields is None else _include(fields),
+                exclude=STORED_EXCLUDE,
+                    )
         # from pprint import pprintx
         # pprint(data)
-        game_logic.game.modify(**data)
+        if fields is not None:
+            data = {
+                path.replace('.', '__'): _get_path(data, path) for path in fields
+                    }
+            # api view can't be rendered by part of game
+            data['api_view'] = None
+        else:
+            game_logic.game.state_hash = state_hash
+            with stage('serialize'):
+                data['api_view'] = game_logic.get_api_scheme().json()
+        data['state_hash'] = state_hash
+        data['updated_at'] = datetime.utcnow()
+        query = {'state_hash': stored_hash} if if_unchanged else {}
+        with stage('db_write'):
+            if fields is None:
+                saved = game_logic.game.modify(query=query, **data)
+            else:
+                saved = self.model.objects(
+                    id=game_logic.game.id, **query
+                        ).update_one(**data)
+        if if_unchanged and not saved:
+            game_logic.game.state_hash = stored_hash
+            raise HTTPException(
+                status_code=409,
+                detail="Game is changed by another request. Repeat the move."
+                    )
+        game_logic.game.state_hash = state_hash
         return game_logic
 
+    def get_new_game_template(self) -> dict[str, Any]:
+        """Get document of new game with dealt and not shuffled
+        objective deck. Template is built once per model in memory.
+
+        Returns:
+            dict[str, Any]: raw CurrentGameData document without id
+                            and logins
+        """
+        template = _templates.get(self.model)
+        if template is None:
+            template = _templates[self.model] = _build_new_game_template(self.model)
+        return template
+
+    def _new_game_documents(self, logins: Sequence[str]) -> list[dict[str, Any]]:
+        docs = []
+        template = self.get_new_game_template()
+        now = datetime.utcnow()
+        for login in logins:
+            doc = deepcopy(template)
+            doc['players']['player']['login'] = login
+            doc['updated_at'] = now
+            random.shuffle(doc['decks']['objectives']['current'])
+            docs.append(doc)
+        if docs:
+            for doc, value in zip(docs, hash_games(BatchGame.from_documents(docs))):
+                doc['state_hash'] = f'{int(value):016x}'
+        return docs
+
+    @timed('db_read')
+    def get_api_view(self, game_id: str, login: str) -> Optional[CurrentGameData]:
+        """Get game of player by id with only stored api view and state hash
+
+        Args:
+            game_id (str): game id
+            login (str): player login
+
+        Returns:
+            CurrentGameData, optional: bd data object
+        """
+        if not ObjectId.is_valid(game_id):
+            return None
+        # document is only read, so it is shared by concurrent callers
+        return self._views.do(
+            ('view', game_id, login),
+            self.model.objects(
+                id=game_id,
+                players__player__login=login
+                    ).only('api_view', 'state_hash').first,
+                )
+
+    def save_api_view(self, game_logic: GameLogic) -> str:
+        """Render api view of player side of game and store it. View
+        isn't stored, if game is changed after load. Api has no view of
+        opponent side, opponent is played by bot from whole game.
+
+        Args:
+            game_logic (GameLogic): game logic of whole game
+
+        Returns:
+            str: CurrentGameDataApi json
+        """
+        with stage('serialize'):
+            view = game_logic.get_api_scheme().json()
+        with stage('db_write'):
+            self.model.objects(
+                id=game_logic.game.id,
+                state_hash=game_logic.game.state_hash,
+                    ).update_one(set__api_view=view)
+        return view
+
+    def render_api_view(self, game_id: str, login: str) -> Optional[str]:
+        """Load whole game, render api view and store it. Concurrent
+        renders of same game share one load and one game processor.
+
+        Args:
+            game_id (str): game id
+            login (str): player login
+
+        Returns:
+            str, optional: CurrentGameDataApi json or None, if game
+                           isn't found
+        """
+        return self._views.do(
+            ('render', game_id, login),
+            self._render_api_view,
+            game_id,
+            login,
+                )
+
+    def _render_api_view(self, game_id: str, login: str) -> Optional[str]:
+        game = self.get_game(game_id, login)
+        return None if game is None else self.save_api_view(GameLogic(game))
+
     def create_new_game(
         self,
         login: str,
             ) -> CurrentGameData:
-        """Create new game processor
+        """Create new game with shuffled objective deck. Document is built
+        from template in memory and is inserted with one write.
 
         Args:
             login (str): player login
@@ -87,19 +370,32 @@ class CRUDGame(
         Returns:
             CurrentGameData, optional: bd data object
         """
-        data = {
-            'players': {
-                'player': {'login': login},
-                'opponent': {'login': settings.user2_login},
-                    }
-                }
-        game = self.model(**data)
-        game.save()
-        game_logic = GameLogic(game)
-        game_logic.proc.decks.objectives.deal().shuffle()
-        self.save_game_logic(game_logic)
+        with stage('serialize'):
+            doc = self._new_game_documents([login])[0]
+        with stage('db_write'):
+            self.model._get_collection().insert_one(doc)
+        return self.model._from_son(doc)
+
+    def create_new_games(
+        self,
+        logins: Sequence[str],
+            ) -> list[str]:
+        """Create many new games with one bulk insert, i.e. for tournaments
+        and load tests. Document objects are not built for created games.
+
+        Args:
+            logins (Sequence[str]): player login of every game
 
-        return game
+        Returns:
+            list[str]: ids of games in order of logins
+        """
+        with stage('serialize'):
+            docs = self._new_game_documents(logins)
+        if not docs:
+            return []
+        with stage('db_write'):
+            result = self.model._get_collection().insert_many(docs)
+        return [str(game_id) for game_id in result.inserted_ids]
 
 
 game = CRUDGame(CurrentGameData)
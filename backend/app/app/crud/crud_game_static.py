@@ -1,4 +1,5 @@
 import json
+import hashlib
 from typing import Union, Type
 from functools import lru_cache
 from app.crud import crud_base
@@ -52,4 +53,15 @@ class CRUDStatic(
                 }
         return StaticGameData(**db_cards)
 
+    @lru_cache
+    def get_static_etag(self) -> str:
+        """Get entity tag of static game data. Tag is changed only
+        with cards data, so clients can revalidate cached data.
+
+        Returns:
+            str: quoted hex digest of static game data
+        """
+        data = self.get_static_game_data().json(sort_keys=True)
+        return f'"{hashlib.sha1(data.encode()).hexdigest()}"'
+
 static = CRUDStatic(Agent, Group, Objective)
@@ -0,0 +1,99 @@
+import threading
+from time import perf_counter
+from typing import Any
+from pymongo import monitoring
+from app.core.metrics import registry
+
+
+POOL_CONNECTIONS = registry.gauge(
+    'coldwar_mongo_pool_connections',
+    'Open connections in mongodb connection pool',
+    ('address', ),
+        )
+POOL_CHECKED_OUT = registry.gauge(
+    'coldwar_mongo_pool_checked_out',
+    'Connections checked out from mongodb connection pool',
+    ('address', ),
+        )
+POOL_WAIT_SECONDS = registry.histogram(
+    'coldwar_mongo_pool_wait_seconds',
+    'Time spent waiting for connection from mongodb connection pool',
+    ('address', ),
+        )
+POOL_CHECKOUT_FAILED = registry.counter(
+    'coldwar_mongo_pool_checkout_failed_total',
+    'Failed checkouts from mongodb connection pool',
+    ('address', 'reason'),
+        )
+
+
+def _address(event: Any) -> str:
+    host, port = event.address
+    return f'{host}:{port}'
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Export mongodb connection pool statistics to metrics
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(
+        self,
+        event: monitoring.ConnectionCreatedEvent,
+            ) -> None:
+        POOL_CONNECTIONS.inc(1, _address(event))
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        POOL_CONNECTIONS.dec(1, _address(event))
+
+    def connection_check_out_started(
+        self,
+        event: monitoring.ConnectionCheckOutStartedEvent,
+            ) -> None:
+        self._local.started = perf_counter()
+
+    def connection_check_out_failed(
+        self,
+        event: monitoring.ConnectionCheckOutFailedEvent,
+            ) -> None:
+        self._observe_wait(event)
+        POOL_CHECKOUT_FAILED.inc(1, _address(event), str(event.reason))
+
+    def connection_checked_out(
+        self,
+        event: monitoring.ConnectionCheckedOutEvent,
+            ) -> None:
+        self._observe_wait(event)
+        POOL_CHECKED_OUT.inc(1, _address(event))
+
+    def connection_checked_in(
+        self,
+        event: monitoring.ConnectionCheckedInEvent,
+            ) -> None:
+        POOL_CHECKED_OUT.dec(1, _address(event))
+
+    def _observe_wait(self, event: Any) -> None:
+        started = getattr(self._local, 'started', None)
+        if started is not None:
+            POOL_WAIT_SECONDS.observe(perf_counter() - started, _address(event))
+            self._local.started = None
+
+
+pool_listener = PoolMetricsListener()
@@ -1,18 +1,28 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from mongoengine import connect
 from app.config import settings
+from app.db.monitoring import pool_listener
 from app.db.init_db import (
     check_db_cards_init, init_db_cards,
     check_db_users_init, init_db_users
         )
 from app.api.api_v1.api import api_router
+from app.core.timing import ServerTimingMiddleware
+from app.core.profiler import profiler
+from app.core.tasks import start_background_tasks, stop_background_tasks
+from app.core.actors import actors
+from app.core.cfr import solver
+from app.core.bot import bot
 
 
 connect(
     host=settings.mongodb_url,
     name=settings.db_name,
     alias='default',
+    event_listeners=[pool_listener],
+    **settings.mongodb_connection_kwargs,
     )
 
 if not check_db_cards_init():
@@ -37,7 +47,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
+app.add_middleware(ServerTimingMiddleware)
 
 
 app.include_router(api_router, prefix=settings.api_v1_str)
+profiler.instrument_routes(app.routes)
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    await run_in_threadpool(solver.prepare)
+    start_background_tasks()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    stop_background_tasks()
+    await actors.stop()
+    bot.shutdown()
@@ -0,0 +1,28 @@
+from datetime import datetime
+from mongoengine import (
+    Document, StringField, BooleanField, IntField, DateTimeField,
+    BinaryField, EnumField
+        )
+from app.constructs import Factions
+
+
+class ArchivedGame(Document):
+    """Finished or expired game, moved out of current games.
+
+    Full game document is stored compressed in data field,
+    summary fields are stored as is for analytics queries.
+    """
+    login = StringField(required=True)
+    opponent_login = StringField()
+    game_turn = IntField(min_value=1, default=1)
+    is_game_ends = BooleanField(default=False)
+    player_score = IntField(min_value=0, default=0)
+    opponent_score = IntField(min_value=0, default=0)
+    player_faction = EnumField(Factions, null=True)
+    created_at = DateTimeField(required=True)
+    archived_at = DateTimeField(default=datetime.utcnow)
+    data = BinaryField(required=True)
+
+    meta = {
+        'indexes': ['login', 'archived_at', ],
+            }
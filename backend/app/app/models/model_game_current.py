@@ -1,7 +1,7 @@
 from mongoengine import (
     Document, EmbeddedDocument, EmbeddedDocumentField, StringField,
     BooleanField, IntField, ListField, EmbeddedDocumentListField,
-    EnumField, queryset_manager
+    EnumField, DateTimeField, queryset_manager
         )
 from app.constructs import (
     Phases, Factions, AwaitingAbilities, Objectives, Agents, Groups
@@ -103,12 +103,20 @@ class Decks(EmbeddedDocument):
 class CurrentGameData(Document):
     """Summary of game data
 
-    This document have to deleted from db
-    on day 3 after its creation
+    Finished games and games not saved for settings.game_expire_seconds
+    are moved to archive by background job. updated_at is a time of
+    last save, games without it expire by creation time. state_hash is a hex
+    Zobrist hash of saved state, used to skip writes of unchanged games.
+    api_view is a rendered CurrentGameDataApi json of player side of
+    saved state or None, if it isn't rendered yet. Opponent side is
+    played by bot from whole game, so its view is never rendered
     """
     steps = EmbeddedDocumentField(Steps, default=Steps())
     players = EmbeddedDocumentField(Players, required=True)
     decks = EmbeddedDocumentField(Decks, default=Decks())
+    state_hash = StringField(null=True)
+    api_view = StringField(null=True)
+    updated_at = DateTimeField(null=True)
 
     @queryset_manager
     def objects(doc_cls, queryset):
@@ -117,5 +125,9 @@ class CurrentGameData(Document):
         return queryset.order_by('-$natural')
 
     meta = {
-        'expireAfterSeconds': 259200,
+        'indexes': [
+            {'fields': ['players.player.login', '-id']},
+            {'fields': ['steps.is_game_ends']},
+            {'fields': ['updated_at']},
+                ],
             }
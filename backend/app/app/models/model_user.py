@@ -7,6 +7,7 @@ class User(Document):
     login = StringField(max_length=50, min_length=5, unique=True, required=True)
     hashed_password = StringField(required=True)
     is_active = BooleanField(default=True)
+    is_admin = BooleanField(default=False)
 
     meta = {
         'indexes': ['login', ],
@@ -0,0 +1,17 @@
+from app.core.routing import Router
+from app.config import settings
+
+
+# Front process, that routes requests of same game to same api worker.
+# Run from backend/app directory with ROUTER_WORKERS list of worker urls:
+#
+#     uvicorn app.router:app --host 0.0.0.0 --port 8000
+
+if not settings.router_workers:
+    raise RuntimeError('Router workers are not set')
+
+app = Router(
+    settings.router_workers,
+    settings.router_vnodes,
+    settings.router_timeout_seconds,
+        )
@@ -42,6 +42,18 @@ class HttpError401(HttpErrorMessage):
         }
 
 
+class HttpError403(HttpErrorMessage):
+    """403 Forbidden
+    """
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "detail": "Not enough privileges",
+            }
+        }
+
+
 class HttpError404(HttpErrorMessage):
     """404 Not Found
     """
@@ -49,7 +61,7 @@ class HttpError404(HttpErrorMessage):
     class Config:
         schema_extra = {
             "example": {
-                "detail": "Cant find current game data in db. For start "
+                "detail": "Cant find game with this id in db. For start "
                           "new game use /game/create endpoint",
             }
         }
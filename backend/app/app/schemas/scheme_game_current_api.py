@@ -85,9 +85,56 @@ class Decks(BaseModel):
     objectives: ObjectivesDeck
 
 
+class LegalActions(BaseModel):
+    """Actions, available for player in current game state
+    """
+    preset: bool
+    next_turn: bool
+    next_phase: bool
+    phase_blockers: list[str]
+    analyst_look: bool
+    analyst_arrange: bool
+    agent_x: list[Agents]
+    recruit: bool
+    pass_influence: bool
+    nuclear_escalation: bool
+
+
 class CurrentGameDataApi(BaseModel):
-    """Current game data
+    """Current game data. state_version is changed with every saved
+    change of game, so clients can skip rerender of unchanged data.
     """
     steps: Steps
     players: Users
     decks: Decks
+    actions: LegalActions
+    state_version: Optional[str] = None
+
+
+class GameId(BaseModel):
+    """Game id
+    """
+    id: str
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "id": "63f3a9e0c5b1f2a4d8e7c6b5",
+            }
+        }
+
+
+class GameSummary(GameId):
+    """Short game state for games list
+    """
+    game_turn: int
+    turn_phase: Optional[Phases]
+    is_game_ends: bool
+    faction: Optional[Factions]
+
+
+class GamesList(BaseModel):
+    """Page of player games, newest first
+    """
+    games: list[GameSummary]
+    next: Optional[str]
@@ -75,12 +75,14 @@ class UserCreateUpdate(UserBase, UserPassword):
 class User(UserBase):
 
     is_active: Optional[bool] = True
+    is_admin: Optional[bool] = False
 
     class Config:
         schema_extra = {
             "example": {
                 "login": "DonaldTrump",
                 "is_active": True,
+                "is_admin": False,
             }
         }
 
@@ -93,6 +95,7 @@ class UserInDB(User): # TODO: rename to UserDb
             "example": {
                 "login": "DonaldTrump",
                 "is_active": True,
+                "is_admin": False,
                 "hashed_password":
                     "$2b$12$sifRrf5m7GM0hhFAF7BQ0.dIokOEZkfYOawlal8Jp/GeWh/4zn8la",
             }
@@ -0,0 +1,68 @@
+"""Benchmark of batch game engine against GameLogic.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_batch
+"""
+import timeit
+import numpy as np
+from time import perf_counter
+from fastapi import HTTPException
+from app.core.batch import BatchGame
+from app.core.logic import GameLogic
+from app.models.model_game_current import CurrentGameData
+from app.constructs import Agents, Factions, Sides
+
+
+def _make_logic() -> GameLogic:
+    agents = {'current': [{'name': agent} for agent in Agents.get_values()]}
+    game = CurrentGameData(
+        players={
+            'player': {'login': 'player', 'agents': agents},
+            'opponent': {'login': 'opponent', 'agents': agents},
+                }
+            )
+    return GameLogic(game).deal_and_shuffle_decks()
+
+
+def main(size: int = 10000, number: int = 10) -> None:
+    logic = _make_logic()
+    games = BatchGame.from_processors([logic.proc] * size)
+    rng = np.random.default_rng()
+
+    def step_batch() -> None:
+        games.set_faction(0)
+        games.set_mission_card()
+        games.set_balance(rng=rng)
+        games.set_next_phase()
+        games.set_agent_x(0, 0)
+        games.set_agent_x(1, 1)
+        games.set_next_phase()
+
+    def step_logic(logic: GameLogic) -> None:
+        logic.set_faction(Factions.CIA).set_mission_card().set_balance()
+        try:
+            logic.chek_phase_conditions_before_next() \
+                .set_next_phase() \
+                .set_phase_conditions_after_next()
+            logic.set_agent_x(Agents.SPY, Sides.PLAYER)
+            logic.set_agent_x(Agents.DEPUTY, Sides.OPPONENT)
+            logic.chek_phase_conditions_before_next() \
+                .set_next_phase() \
+                .set_phase_conditions_after_next()
+        except HTTPException:
+            pass
+
+    seconds = timeit.timeit(step_batch, number=number) / number
+    print(f'batch: {seconds / size * 1e6:8.3f} us per game step ({size=})')
+
+    logics = [_make_logic() for _ in range(100)]
+    start = perf_counter()
+    for logic in logics:
+        step_logic(logic)
+    seconds = (perf_counter() - start) / len(logics)
+    print(f'logic: {seconds * 1e6:8.3f} us per game step')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Benchmark of new game creation.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_create
+"""
+from time import perf_counter
+from mongoengine import connect, disconnect
+from app.crud.crud_game_current import game
+from app.config import settings
+
+
+def main(size: int = 1000) -> None:
+    connect(host=settings.test_mongodb_url, name='bench-db')
+    try:
+        game.create_new_game('player')
+
+        start = perf_counter()
+        for _ in range(size):
+            game.create_new_game('player')
+        seconds = perf_counter() - start
+        print(f'one by one: {seconds / size * 1e3:8.3f} ms per game ({size=})')
+
+        start = perf_counter()
+        game.create_new_games(['player'] * size)
+        seconds = perf_counter() - start
+        print(f'bulk:       {seconds / size * 1e3:8.3f} ms per game ({size=})')
+    finally:
+        game.model.objects(players__player__login='player').delete()
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
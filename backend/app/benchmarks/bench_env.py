@@ -0,0 +1,50 @@
+"""Benchmark of reinforcement learning environments.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_env
+"""
+import numpy as np
+from time import perf_counter
+from app.core.env import Env, BatchEnv, VectorEnv, random_actions
+
+
+def _run(env, steps: int, rng: np.random.Generator) -> float:
+    env.reset()
+    start = perf_counter()
+    for _ in range(steps):
+        env.step(random_actions(env.legal_action_mask(), rng))
+    return perf_counter() - start
+
+
+def main(size: int = 4096, steps: int = 100, workers: int = 2) -> None:
+    rng = np.random.default_rng()
+
+    env = Env()
+    env.reset()
+    start = perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(
+            int(rng.choice(np.flatnonzero(env.legal_action_mask())))
+                )
+        if terminated or truncated:
+            env.reset()
+    seconds = perf_counter() - start
+    print(f'env:        {steps / seconds:12.0f} steps per second')
+
+    seconds = _run(BatchEnv(size), steps, rng)
+    print(f'batch env:  {size * steps / seconds:12.0f} steps per second ({size=})')
+
+    env = VectorEnv(size, workers)
+    try:
+        seconds = _run(env, steps, rng)
+    finally:
+        env.close()
+    print(
+        f'vector env: {size * steps / seconds:12.0f} steps per second '
+        f'({size=}, {workers=})'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark of feature encoding of stored games.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_features
+"""
+from time import perf_counter
+from mongoengine import connect, disconnect
+from app.core.batch import BatchGame
+from app.core.features import encode_documents, encode_games
+from app.core.logic import GameLogic
+from app.crud.crud_game_current import game
+from app.models.model_game_current import CurrentGameData
+from app.constructs import Factions
+from app.config import settings
+
+
+def main(size: int = 10000) -> None:
+    connect(host=settings.test_mongodb_url, name='bench-db')
+    try:
+        game_logic = GameLogic(game.create_new_game('player')) \
+            .deal_and_shuffle_decks().set_faction(Factions.CIA).set_mission_card()
+        game.save_game_logic(game_logic)
+        doc = CurrentGameData.objects(id=game_logic.game.id).as_pymongo().first()
+    finally:
+        disconnect()
+    docs = [doc] * size
+
+    start = perf_counter()
+    encode_documents(docs)
+    seconds = perf_counter() - start
+    print(f'documents:  {seconds / size * 1e6:8.3f} us per game ({size=})')
+
+    count = min(size, 1000)
+    start = perf_counter()
+    encode_games(BatchGame.from_processors([
+        GameLogic(CurrentGameData._from_son(doc)).proc for doc in docs[:count]
+            ]))
+    seconds = perf_counter() - start
+    print(f'processors: {seconds / count * 1e6:8.3f} us per game ({count=})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark of micro-batching policy inference.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_inference
+"""
+import asyncio
+import numpy as np
+from time import perf_counter
+from app.core.batch import ACTIONS
+from app.core.env import OBSERVATION_SIZE
+from app.core.inference import BatchedPolicy, LinearPolicy
+
+
+async def _run(service: BatchedPolicy, requests: int) -> float:
+    rng = np.random.default_rng()
+    observations = rng.random((requests, OBSERVATION_SIZE), np.float32)
+    legal = np.ones((requests, len(ACTIONS)), bool)
+    start = perf_counter()
+    await asyncio.gather(*[
+        service.predict(observations[num], legal[num]) for num in range(requests)
+            ])
+    return perf_counter() - start
+
+
+def main(requests: int = 2048) -> None:
+    rng = np.random.default_rng()
+    policy = LinearPolicy(
+        rng.normal(size=(OBSERVATION_SIZE, len(ACTIONS))).astype(np.float32)
+            )
+    for max_batch_size in (1, 16, 64, 256):
+        service = BatchedPolicy(policy, max_batch_size, max_wait_ms=5.0)
+        seconds = asyncio.run(_run(service, requests))
+        print(
+            f'max batch {max_batch_size:4d}: '
+            f'{requests / seconds:10.0f} decisions per second ({requests=})'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Benchmark of legal actions enumeration.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_legal_actions
+"""
+import timeit
+from app.core.logic import GameLogic
+from app.models.model_game_current import CurrentGameData
+from app.constructs import Phases, Sides
+
+
+def main(number: int = 10000) -> None:
+    game = CurrentGameData(
+        players={
+            'player': {'login': 'player'},
+            'opponent': {'login': 'opponent'},
+                }
+            )
+    game_logic = GameLogic(game)
+
+    for phase in Phases:
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(phase.value)
+        for side in Sides:
+            seconds = timeit.timeit(
+                lambda: game_logic.get_legal_actions(side),
+                number=number,
+                    )
+            print(
+                f'{phase.value:<20} {side.value:<10} '
+                f'{seconds / number * 1e6:8.1f} us per call'
+                    )
+
+
+if __name__ == '__main__':
+    main()
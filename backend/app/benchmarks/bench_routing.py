@@ -0,0 +1,85 @@
+"""Benchmark of game cache hit rate with routing of games to workers.
+
+Every worker keeps last used games in LRU cache, i.e. live games of
+game actors. Requests are routed to random worker, like uvicorn workers
+get them, or to worker of game by consistent hashing.
+
+Run from backend/app directory:
+
+    python -m benchmarks.bench_routing
+"""
+import numpy as np
+from collections import OrderedDict
+from time import perf_counter
+from typing import Callable
+from app.core.routing import HashRing
+
+
+def _hit_rate(
+    games: np.ndarray,
+    workers: int,
+    capacity: int,
+    route: Callable[[int, int], int],
+        ) -> float:
+    caches: list[OrderedDict] = [OrderedDict() for _ in range(workers)]
+    hits = 0
+    for num, game_id in enumerate(games):
+        cache = caches[route(num, game_id)]
+        if game_id in cache:
+            hits += 1
+            cache.move_to_end(game_id)
+        else:
+            cache[game_id] = True
+            if len(cache) > capacity:
+                cache.popitem(last=False)
+    return hits / len(games)
+
+
+def main(
+    size: int = 200000,
+    active: int = 2000,
+    capacity: int = 256,
+    vnodes: int = 64,
+        ) -> None:
+    rng = np.random.default_rng(0)
+    # players make series of moves in own game, popular games are
+    # played more often
+    games = rng.zipf(1.2, size) % active
+    keys = [f'{game_id:024x}' for game_id in range(active)]
+
+    for workers in (4, 8, 16):
+        nodes = [f'http://worker-{num}:8000' for num in range(workers)]
+        ring = HashRing(nodes, vnodes)
+        owners = [nodes.index(ring.get(key)) for key in keys]
+        randoms = rng.integers(0, workers, size)
+
+        random_rate = _hit_rate(
+            games, workers, capacity, lambda num, game_id: randoms[num]
+                )
+        ring_rate = _hit_rate(
+            games, workers, capacity, lambda num, game_id: owners[game_id]
+                )
+
+        ring.add(f'http://worker-{workers}:8000')
+        moved = sum(
+            nodes[owner] != ring.get(key) for owner, key in zip(owners, keys)
+                ) / active
+        modulo_moved = np.mean(
+            np.arange(active) % workers != np.arange(active) % (workers + 1)
+                )
+
+        start = perf_counter()
+        for key in keys:
+            ring.get(key)
+        route_us = (perf_counter() - start) / active * 1e6
+
+        print(
+            f'{workers=:2d}: hit rate random {random_rate:6.1%}, '
+            f'consistent hash {ring_rate:6.1%}; '
+            f'moved on add {moved:5.1%} (modulo {modulo_moved:5.1%}); '
+            f'route {route_us:.2f} us'
+                )
+
+
+if __name__ == '__main__':
+    main()
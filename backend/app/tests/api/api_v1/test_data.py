@@ -45,6 +45,35 @@ class TestGameDataStatic:
         assert response.json()["groups"], 'no group cards'
         assert response.json()["objectives"], 'objective cards'
 
+    def test_game_data_static_return_304(
+        self,
+        monkeypatch,
+        client: TestClient,
+            ) -> None:
+        """Test game data static is not sent again if etag is matched
+        """
+        monkeypatch.setattr(
+            crud_game_static.static, "get_static_etag", lambda: '"tag"'
+                )
+        monkeypatch.setattr(
+            crud_game_static.static,
+            "get_static_game_data",
+            lambda: crud_game_static.StaticGameData(
+                agents={}, groups={}, objectives={}
+                    ),
+                )
+        response = client.get(f"{settings.api_v1_str}/game/data/static")
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.headers['etag'] == '"tag"', 'wrong etag'
+
+        response = client.get(
+            f"{settings.api_v1_str}/game/data/static",
+            headers={'If-None-Match': '"other", "tag"'}
+                )
+        assert response.status_code == 304, 'not cached'
+        assert not response.content, 'body sent'
+        assert response.headers['etag'] == '"tag"', 'wrong etag'
+
 
 class TestGameDataCurrent:
     """Test game/data/current
@@ -55,31 +84,71 @@ class TestGameDataCurrent:
         monkeypatch,
         connection: Generator,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test game data current return correct data
         """
         def mockreturn(*args, **kwargs) -> Callable:
             game = crud_game_current.CRUDGame(connection['CurrentGameData'])
-            return game.get_last_game(settings.user0_login)
+            return game.get_game(*args)
 
         def mock_user(*args, **kwargs) -> Callable:
             user = crud_user.CRUDUser(connection['User'])
             return user.get_by_login(settings.user0_login)
 
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mockreturn)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mockreturn)
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
 
         response = client.post(
-            f"{settings.api_v1_str}/game/data/current",
+            f"{settings.api_v1_str}/game/data/current/{game_id}",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
             )
         assert response.status_code == 200, f'{response.content=}'
+        assert response.json()['actions']['preset'] is True, 'wrong actions'
+
+        stored = connection['CurrentGameData'].objects(id=game_id).first()
+        assert stored.api_view == response.text, 'api view not stored'
+
+    def test_game_data_current_return_stored_view(
+        self,
+        monkeypatch,
+        connection: Generator,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test game data current return stored api view without render
+        """
+        def mock_user(*args, **kwargs) -> Callable:
+            user = crud_user.CRUDUser(connection['User'])
+            return user.get_by_login(settings.user0_login)
+
+        def mock_render(*args, **kwargs) -> None:
+            raise AssertionError('api view is rendered')
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(
+            crud_game_current.game, "render_api_view", mock_render
+                )
+        connection['CurrentGameData'].objects(id=game_id).update_one(
+            set__api_view='{"stored": true}'
+                )
+
+        response = client.post(
+            f"{settings.api_v1_str}/game/data/current/{game_id}",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.json() == {'stored': True}, 'wrong view'
 
     def test_game_data_current_return_401(self, client: TestClient,) -> None:
         """Test game data current return 401 for unauthorized
         """
-        response = client.post(f"{settings.api_v1_str}/game/data/current")
+        response = client.post(
+            f"{settings.api_v1_str}/game/data/current/63f3a9e0c5b1f2a4d8e7c6b5"
+                )
         assert response.status_code == 401, f'{response.content=}'
         assert response.json()['detail'] == 'Not authenticated', 'wrong detail'
@@ -1,12 +1,17 @@
+import time
 import pytest
 from typing import Callable, Generator
 from fastapi.testclient import TestClient
 from app.crud import crud_game_current, crud_user
-from app.core import logic
+from app.core import logic, bot
+from app.core.profiler import profiler
 from app.config import settings
 from app.constructs import Factions, Agents, Phases, Groups, Objectives
 
 
+GAME_ID = '63f3a9e0c5b1f2a4d8e7c6b5'
+
+
 class TestCreateNewGame:
     """Test game/create
     """
@@ -37,7 +42,88 @@ class TestCreateNewGame:
                 }
             )
         assert response.status_code == 201, f'{response.content=}'
-        assert connection['CurrentGameData'].objects().count() == 2, 'wrong count of data'
+        games = connection['CurrentGameData'].objects
+        assert games().count() == 2, 'wrong count of data'
+        assert response.json()['id'] == str(games[0].id), 'wrong game id'
+
+
+class TestListGames:
+    """Test game/list
+    """
+
+    def test_list_games_return_200(
+        self,
+        monkeypatch,
+        user: crud_user.CRUDUser,
+        game: crud_game_current.CRUDGame,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test list games returns pages of games
+        """
+        def mock_user(*args, **kwargs) -> Callable:
+            return user.get_by_login(settings.user0_login)
+
+        def mock_games(*args, **kwargs) -> Callable:
+            return game.get_games(*args, **kwargs)
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(crud_game_current.game, "get_games", mock_games)
+        new_id = str(game.create_new_game(settings.user0_login).id)
+
+        response = client.get(
+            f"{settings.api_v1_str}/game/list?limit=1",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.json()['games'][0]['id'] == new_id, 'wrong game'
+        assert response.json()['next'] == new_id, 'wrong next'
+
+        response = client.get(
+            f"{settings.api_v1_str}/game/list?limit=1&after={new_id}",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.json()['games'][0]['id'] == game_id, 'wrong game'
+        assert response.json()['games'][0]['turn_phase'] == Phases.BRIEFING.value, \
+            'wrong phase'
+
+    def test_list_games_return_401(self, client: TestClient) -> None:
+        """Test list games return 401 for unauthorized
+        """
+        response = client.get(f"{settings.api_v1_str}/game/list")
+        assert response.status_code == 401, f'{response.content=}'
+
+
+class TestGameNotFound:
+    """Test game resources for unknown game id
+    """
+
+    def test_next_turn_return_404(
+        self,
+        monkeypatch,
+        user: crud_user.CRUDUser,
+        connection: Generator,
+        client: TestClient,
+            ) -> None:
+        """Test game resource returns 404 if game not found
+        """
+        def mock_user(*args, **kwargs) -> Callable:
+            return user.get_by_login(settings.user0_login)
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+
+        response = client.patch(
+            f"{settings.api_v1_str}/game/{GAME_ID}/next_turn",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 404, f'{response.content=}'
 
 
 class TestPresetFaction:
@@ -45,27 +131,32 @@ class TestPresetFaction:
     """
 
     @pytest.mark.parametrize("faction", ["kgb", "cia", ])
+    @pytest.mark.parametrize("actors_enabled", [False, True])
     def test_preset_faction_return_200_409(
         self,
         user: crud_user.CRUDUser,
         game: crud_game_current.CRUDGame,
         monkeypatch,
         client: TestClient,
-        faction: str
+        game_id: str,
+        faction: str,
+        actors_enabled: bool,
             ) -> None:
         """Test game/prese/faction returns 200
         """
+        monkeypatch.setattr(settings, 'game_actors_enabled', actors_enabled)
+
         def mock_user(*args, **kwargs) -> Callable:
             return user.get_by_login(settings.user0_login)
 
         def mock_process(*args, **kwargs) -> Callable:
-            return game.get_last_game(args[0])
+            return game.get_game(*args)
 
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mock_process)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/preset?q={faction}",
+            f"{settings.api_v1_str}/game/{game_id}/preset?q={faction}",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -73,20 +164,21 @@ class TestPresetFaction:
         assert response.status_code == 200, f'{response.content=}'
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/preset?q={faction}",
+            f"{settings.api_v1_str}/game/{game_id}/preset?q={faction}",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
             )
         assert response.status_code == 409, f'{response.content=}'
-        assert response.json()['detail'] == 'You cant change faction because is chosen yet', \
-            'wrong detail'
+        assert response.json()['detail'] == \
+            'You cant change faction because is chosen yet', 'wrong detail'
 
     def test_preset_faction_return_422(
         self,
         user: crud_user.CRUDUser,
         monkeypatch,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test game/prese/faction returns 422/404 if data incorrect
         """
@@ -96,7 +188,7 @@ class TestPresetFaction:
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/preset?q=abc",
+            f"{settings.api_v1_str}/game/{game_id}/preset?q=abc",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -104,7 +196,7 @@ class TestPresetFaction:
         assert response.status_code == 422, f'{response.content=}'
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/preset",
+            f"{settings.api_v1_str}/game/{game_id}/preset",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -133,32 +225,67 @@ class TestNextTurn:
             return user.get_by_login(settings.user0_login)
 
         def mock_process(*args, **kwargs) -> Callable:
-            return started_game.get_last_game(args[0])
+            return started_game.get_game(*args)
 
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mock_process)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
 
     def test_next_turn_return_200(
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test game/next set next turn
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/next_turn",
+            f"{settings.api_v1_str}/game/{game_id}/next_turn",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
             )
         assert response.status_code == 200, f'{response.content=}'
 
+    def test_next_turn_is_profiled(
+        self,
+        mock_return,
+        monkeypatch,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test game logic of async game route is sampled by profiler
+        """
+        set_next_turn = logic.GameLogic.set_next_turn
+
+        def slow_next_turn(game_logic: logic.GameLogic) -> logic.GameLogic:
+            time.sleep(0.05)
+            return set_next_turn(game_logic)
+
+        monkeypatch.setattr(logic.GameLogic, 'set_next_turn', slow_next_turn)
+
+        profiler.start(interval=0.001)
+        try:
+            response = client.patch(
+                f"{settings.api_v1_str}/game/{game_id}/next_turn",
+                headers={
+                    'Authorization': f'Bearer {settings.user0_token}'
+                    }
+                )
+        finally:
+            result = profiler.stop()
+        assert response.status_code == 200, f'{response.content=}'
+        assert result.startswith(
+            f'PATCH {settings.api_v1_str}/game/{{game_id}}/next_turn;'
+                ), 'route not profiled'
+        assert 'slow_next_turn' in result, 'game logic not sampled'
+
     def test_next_turn_if_game_end_return_409(
         self,
         mock_return,
         started_game: crud_game_current.CRUDGame,
         game_logic: logic.GameLogic,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test turn can't be pushed if game end
         """
@@ -166,13 +293,15 @@ class TestNextTurn:
         started_game.save_game_logic(game_logic)
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/next_turn",
+            f"{settings.api_v1_str}/game/{game_id}/next_turn",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
             )
         assert response.status_code == 409, f'{response.content=}'
-        assert response.json()['detail'] == "Something can't be changed, because game is end"
+        assert response.json()['detail'] == \
+            "Something can't be changed, because game is end"
+
 
 class TestNextPhase:
     """Test game/next_phase
@@ -193,7 +322,7 @@ class TestNextPhase:
         game_logic.proc.players.player.agents.current[0].is_agent_x = True
         game_logic.proc.players.opponent.agents.current[0].is_agent_x = True
         game_logic.proc.players.player.has_balance = True
-        game_logic.proc.players.opponent.has_balance= False
+        game_logic.proc.players.opponent.has_balance = False
         game_logic.proc.decks.objectives.pop()
         started_game.save_game_logic(game_logic)
 
@@ -201,20 +330,21 @@ class TestNextPhase:
             return user.get_by_login(settings.user0_login)
 
         def mock_process(*args, **kwargs) -> Callable:
-            return started_game.get_last_game(args[0])
+            return started_game.get_game(*args)
 
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mock_process)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
 
     def test_next_phase_return_200_and_get_from_briefing(
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test game/next set next phase from briefing
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/next_phase",
+            f"{settings.api_v1_str}/game/{game_id}/next_phase",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -229,6 +359,7 @@ class TestNextPhase:
         started_game: crud_game_current.CRUDGame,
         game_logic: logic.GameLogic,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test last phases cant'be pushed
         """
@@ -236,13 +367,14 @@ class TestNextPhase:
         started_game.save_game_logic(game_logic)
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/next_phase",
+            f"{settings.api_v1_str}/game/{game_id}/next_phase",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
             )
         assert response.status_code == 409, f'{response.content=}'
-        assert response.json()['detail'] == "Something can't be changed, because game is end"
+        assert response.json()['detail'] == \
+            "Something can't be changed, because game is end"
 
 
 class TestAnalyst:
@@ -266,20 +398,21 @@ class TestAnalyst:
             return user.get_by_login(settings.user0_login)
 
         def mock_process(*args, **kwargs) -> Callable:
-            return started_game.get_last_game(args[0])
+            return started_game.get_game(*args)
 
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mock_process)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
 
     def test_analyst_get_return_200(
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /phase/briefing/analyst_look returns 200
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/phase/briefing/analyst_look",
+            f"{settings.api_v1_str}/game/{game_id}/phase/briefing/analyst_look",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -292,6 +425,7 @@ class TestAnalyst:
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
         game_logic: logic.GameLogic,
             ) -> None:
         """Test /phase/briefing/analyst_look returns 200
@@ -300,7 +434,7 @@ class TestAnalyst:
         top.reverse()
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/phase/briefing/analyst_arrange",
+            f"{settings.api_v1_str}/game/{game_id}/phase/briefing/analyst_arrange",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 },
@@ -332,20 +466,22 @@ class TestSetAgentX:
             return user.get_by_login(settings.user0_login)
 
         def mock_process(*args, **kwargs) -> Callable:
-            return started_game.get_last_game(args[0])
+            return started_game.get_game(*args)
 
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mock_process)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
 
     def test_set_agent_x_return_200(
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /phase/planning/agent_x returns 200
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/phase/planning/agent_x?q={Agents.DEPUTY.value}",
+            f"{settings.api_v1_str}/game/{game_id}/phase/planning/agent_x"
+            f"?q={Agents.DEPUTY.value}",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -356,11 +492,13 @@ class TestSetAgentX:
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /phase/planning/agent_x returns 422
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/phase/planning/agent_x?q=wrong_agent",
+            f"{settings.api_v1_str}/game/{game_id}/phase/planning/agent_x"
+            "?q=wrong_agent",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -373,6 +511,7 @@ class TestSetAgentX:
         started_game: crud_game_current.CRUDGame,
         game_logic: logic.GameLogic,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /phase/planning/agent_x returns 409
         """
@@ -380,7 +519,8 @@ class TestSetAgentX:
         started_game.save_game_logic(game_logic)
 
         response = client.patch(
-            f"{settings.api_v1_str}/game/phase/planning/agent_x?q={Agents.DEPUTY.value}",
+            f"{settings.api_v1_str}/game/{game_id}/phase/planning/agent_x"
+            f"?q={Agents.DEPUTY.value}",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -403,27 +543,29 @@ class TestInfluenceStruggleGroupsResources:
         """Mock user and game
         """
         game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.INFLUENCE)
-        game_logic.proc.decks.groups.owned_by_player.append(game_logic.proc.decks.groups.pop())
+        groups = game_logic.proc.decks.groups
+        groups.owned_by_player.append(groups.pop())
         started_game.save_game_logic(game_logic)
 
         def mock_user(*args, **kwargs) -> Callable:
             return user.get_by_login(settings.user0_login)
 
         def mock_process(*args, **kwargs) -> Callable:
-            return started_game.get_last_game(args[0])
+            return started_game.get_game(*args)
 
         monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
-        monkeypatch.setattr(crud_game_current.game, "get_last_game", mock_process)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
 
     def test_recruit_return_200(
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /game/influence_struggle/recruit returns 200
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/influence_struggle/recruit",
+            f"{settings.api_v1_str}/game/{game_id}/influence_struggle/recruit",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -434,11 +576,12 @@ class TestInfluenceStruggleGroupsResources:
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /game/influence_struggle/pass returns 200
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/influence_struggle/pass",
+            f"{settings.api_v1_str}/game/{game_id}/influence_struggle/pass",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -450,11 +593,13 @@ class TestInfluenceStruggleGroupsResources:
         self,
         mock_return,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /game/influence_struggle/pass returns 200
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/influence_struggle/activate?source{Groups.ARTISTS}",
+            f"{settings.api_v1_str}/game/{game_id}/influence_struggle/activate"
+            f"?source{Groups.ARTISTS}",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -467,13 +612,17 @@ class TestInfluenceStruggleGroupsResources:
         started_game: crud_game_current.CRUDGame,
         game_logic: logic.GameLogic,
         client: TestClient,
+        game_id: str,
             ) -> None:
         """Test /game/influence_struggle/nuclear_escalation returns 200
         """
-        game_logic.proc.decks.objectives.owned_by_player.append(Objectives.NUCLEARESCALATION)
+        game_logic.proc.decks.objectives.owned_by_player.append(
+            Objectives.NUCLEARESCALATION
+                )
         started_game.save_game_logic(game_logic)
         response = client.patch(
-            f"{settings.api_v1_str}/game/influence_struggle/nuclear_escalation",
+            f"{settings.api_v1_str}/game/{game_id}"
+            "/influence_struggle/nuclear_escalation",
             headers={
                 'Authorization': f'Bearer {settings.user0_token}'
                 }
@@ -481,19 +630,166 @@ class TestInfluenceStruggleGroupsResources:
         assert response.status_code == 200, f'{response.content=}'
 
 
+class TestOpponentBot:
+    """Test opponent bot
+    """
+
+    @pytest.fixture(scope="function")
+    def mock_return(
+        self,
+        user: crud_user.CRUDUser,
+        started_game: crud_game_current.CRUDGame,
+        game_logic: logic.GameLogic,
+        monkeypatch,
+            ) -> None:
+        """Mock user and game, set planning phase
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        started_game.save_game_logic(game_logic)
+
+        def mock_user(*args, **kwargs) -> Callable:
+            return user.get_by_login(settings.user0_login)
+
+        def mock_process(*args, **kwargs) -> Callable:
+            return started_game.get_game(*args)
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
+        monkeypatch.setattr(bot.bot, "seconds", 0.05)
+
+    def test_opponent_bot_return_200(
+        self,
+        mock_return,
+        started_game: crud_game_current.CRUDGame,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test /opponent/bot returns 200 and opponent choose agent
+        """
+        response = client.patch(
+            f"{settings.api_v1_str}/game/{game_id}/opponent/bot",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+
+        game_logic = logic.GameLogic(
+            started_game.get_game(game_id, settings.user0_login)
+                )
+        assert game_logic.proc.players.opponent.agents.agent_x is not None, \
+            'agent not choosen'
+
+    def test_opponent_bot_return_409(
+        self,
+        mock_return,
+        started_game: crud_game_current.CRUDGame,
+        game_logic: logic.GameLogic,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test /opponent/bot returns 409 if no actions available
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.BRIEFING)
+        game_logic.proc.steps.is_game_ends = True
+        started_game.save_game_logic(game_logic)
+
+        response = client.patch(
+            f"{settings.api_v1_str}/game/{game_id}/opponent/bot",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 409, f'{response.content=}'
+
+
+class TestOpponentPolicy:
+    """Test opponent policy
+    """
+
+    @pytest.fixture(scope="function")
+    def mock_return(
+        self,
+        user: crud_user.CRUDUser,
+        started_game: crud_game_current.CRUDGame,
+        game_logic: logic.GameLogic,
+        monkeypatch,
+            ) -> None:
+        """Mock user and game, set planning phase
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        started_game.save_game_logic(game_logic)
+
+        def mock_user(*args, **kwargs) -> Callable:
+            return user.get_by_login(settings.user0_login)
+
+        def mock_process(*args, **kwargs) -> Callable:
+            return started_game.get_game(*args)
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_process)
+
+    def test_opponent_policy_return_200(
+        self,
+        mock_return,
+        started_game: crud_game_current.CRUDGame,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test /opponent/policy returns 200 and opponent choose agent
+        """
+        response = client.patch(
+            f"{settings.api_v1_str}/game/{game_id}/opponent/policy",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+
+        game_logic = logic.GameLogic(
+            started_game.get_game(game_id, settings.user0_login)
+                )
+        assert game_logic.proc.players.opponent.agents.agent_x is not None, \
+            'agent not choosen'
+
+    def test_opponent_policy_return_409(
+        self,
+        mock_return,
+        started_game: crud_game_current.CRUDGame,
+        game_logic: logic.GameLogic,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test /opponent/policy returns 409 if no actions available
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.BRIEFING)
+        game_logic.proc.steps.is_game_ends = True
+        started_game.save_game_logic(game_logic)
+
+        response = client.patch(
+            f"{settings.api_v1_str}/game/{game_id}/opponent/policy",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 409, f'{response.content=}'
+
+
 class TestAutorizationError:
     """Test not acessed unautorized user
     """
 
     @pytest.mark.parametrize("test_input", [
-        '/game/preset?q=kgb',
-        '/game/next_turn',
-        '/game/next_phase',
-        '/game/phase/briefing/analyst_look',
-        '/game/influence_struggle/recruit',
-        '/game/influence_struggle/pass',
-        f'/game/influence_struggle/activate?source{Groups.ARTISTS}',
-        '/game/influence_struggle/nuclear_escalation',
+        f'/game/{GAME_ID}/preset?q=kgb',
+        f'/game/{GAME_ID}/next_turn',
+        f'/game/{GAME_ID}/next_phase',
+        f'/game/{GAME_ID}/phase/briefing/analyst_look',
+        f'/game/{GAME_ID}/influence_struggle/recruit',
+        f'/game/{GAME_ID}/influence_struggle/pass',
+        f'/game/{GAME_ID}/influence_struggle/activate?source{Groups.ARTISTS}',
+        f'/game/{GAME_ID}/influence_struggle/nuclear_escalation',
+        f'/game/{GAME_ID}/opponent/bot',
+        f'/game/{GAME_ID}/opponent/policy',
             ])
     def test_resource_return_401(
         self,
@@ -517,7 +813,7 @@ class TestAutorizationError:
         """Test analyst_arrnage return 401 for unauthorized
         """
         response = client.patch(
-            f"{settings.api_v1_str}/game/phase/briefing/analyst_arrange",
+            f"{settings.api_v1_str}/game/{GAME_ID}/phase/briefing/analyst_arrange",
             json=['one', 'two', 'three'],
                 )
         assert response.status_code == 401, f'{response.content=}'
@@ -0,0 +1,139 @@
+import pytest
+from typing import Callable
+from fastapi.testclient import TestClient
+from app.crud import crud_user, crud_game_archive
+from app.config import settings
+
+
+class TestMetrics:
+    """Test service/metrics
+    """
+
+    def test_metrics_return_200(self, client: TestClient) -> None:
+        """Test metrics are rendered in prometheus format
+        """
+        response = client.get(f"{settings.api_v1_str}/service/metrics")
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.headers['content-type'].startswith('text/plain'), \
+            'wrong content type'
+        assert '# TYPE coldwar_request_stage_seconds histogram' in response.text, \
+            'no stage histogram'
+
+
+class TestProfile:
+    """Test service/profile
+    """
+
+    @pytest.fixture(scope="function")
+    def mock_admin(
+        self,
+        user: crud_user.CRUDUser,
+        monkeypatch,
+            ) -> None:
+        """Mock admin user
+        """
+        def mock_user(*args, **kwargs) -> Callable:
+            admin = user.get_by_login(settings.user0_login)
+            admin.is_admin = True
+            return admin
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+
+    def test_profile_return_200(
+        self,
+        mock_admin,
+        monkeypatch,
+        client: TestClient,
+            ) -> None:
+        """Test profile returns collapsed stacks
+        """
+        monkeypatch.setattr(settings, 'profiler_enabled', True)
+        response = client.post(
+            f"{settings.api_v1_str}/service/profile?seconds=0.05",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.headers['content-type'].startswith('text/plain'), \
+            'wrong content type'
+
+    def test_profile_return_409_if_disabled(
+        self,
+        mock_admin,
+        monkeypatch,
+        client: TestClient,
+            ) -> None:
+        """Test profile returns 409 if profiler disabled
+        """
+        monkeypatch.setattr(settings, 'profiler_enabled', False)
+        response = client.post(
+            f"{settings.api_v1_str}/service/profile?seconds=0.05",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 409, f'{response.content=}'
+        assert response.json()['detail'] == 'Profiler is disabled.', \
+            'wrong detail'
+
+    def test_profile_return_403_if_not_admin(
+        self,
+        user: crud_user.CRUDUser,
+        monkeypatch,
+        client: TestClient,
+            ) -> None:
+        """Test profile returns 403 for not admin user
+        """
+        def mock_user(*args, **kwargs) -> Callable:
+            return user.get_by_login(settings.user0_login)
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(settings, 'profiler_enabled', True)
+
+        response = client.post(
+            f"{settings.api_v1_str}/service/profile?seconds=0.05",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 403, f'{response.content=}'
+
+    def test_profile_return_401(self, client: TestClient) -> None:
+        """Test profile returns 401 for unauthorized
+        """
+        response = client.post(f"{settings.api_v1_str}/service/profile")
+        assert response.status_code == 401, f'{response.content=}'
+
+
+class TestArchive:
+    """Test service/archive
+    """
+
+    def test_archive_return_200(
+        self,
+        user: crud_user.CRUDUser,
+        archive: crud_game_archive.CRUDArchive,
+        monkeypatch,
+        client: TestClient,
+            ) -> None:
+        """Test archive returns count of archived games
+        """
+        def mock_user(*args, **kwargs) -> Callable:
+            admin = user.get_by_login(settings.user0_login)
+            admin.is_admin = True
+            return admin
+
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(
+            crud_game_archive.archive, "archive_all", archive.archive_all
+                )
+
+        response = client.post(
+            f"{settings.api_v1_str}/service/archive",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+        assert response.json() == {'archived': 0}, 'wrong count'
@@ -5,8 +5,12 @@ from mongoengine.context_managers import switch_db
 from fastapi.testclient import TestClient
 from app.main import app
 from app.config import settings
-from app.models import model_user, model_game_current, model_game_static
-from app.crud import crud_game_static, crud_user, crud_game_current
+from app.models import (
+    model_user, model_game_current, model_game_static, model_game_archive
+        )
+from app.crud import (
+    crud_game_static, crud_user, crud_game_current, crud_game_archive
+        )
 from app.core.logic import GameLogic
 from app.db.init_db import init_db_cards, init_db_users, get_yaml
 
@@ -120,7 +124,8 @@ def connection(
             switch_db(model_game_current.CurrentGameData, 'test-db-alias') as CurrentGameData, \
             switch_db(model_game_static.Agent, 'test-db-alias') as Agent, \
             switch_db(model_game_static.Group, 'test-db-alias') as Group, \
-            switch_db(model_game_static.Objective, 'test-db-alias') as Objective \
+            switch_db(model_game_static.Objective, 'test-db-alias') as Objective, \
+            switch_db(model_game_archive.ArchivedGame, 'test-db-alias') as ArchivedGame \
                 :
 
             # init test user current game
@@ -135,6 +140,7 @@ def connection(
                 'Agent': Agent,
                 'Group': Group,
                 'Objective': Objective,
+                'ArchivedGame': ArchivedGame,
                 }
 
     finally:
@@ -149,6 +155,16 @@ def game(connection: Generator) -> crud_game_current.CRUDGame:
     return crud_game_current.CRUDGame(connection['CurrentGameData'])
 
 
+@pytest.fixture(scope="function")
+def archive(connection: Generator) -> crud_game_archive.CRUDArchive:
+    """Get crud archive object
+    """
+    return crud_game_archive.CRUDArchive(
+        connection['ArchivedGame'],
+        connection['CurrentGameData'],
+            )
+
+
 @pytest.fixture(scope="function")
 def user(connection: Generator) -> crud_user.CRUDUser:
     """Get crud game object
@@ -167,6 +183,13 @@ def static(connection: Generator) -> crud_game_static.CRUDStatic:
             )
 
 
+@pytest.fixture(scope="function")
+def game_id(game: crud_game_current.CRUDGame) -> str:
+    """Get id of test user game
+    """
+    return str(game.get_last_game(settings.user0_login).id)
+
+
 @pytest.fixture(scope="function")
 def game_logic(
     game: crud_game_current.CRUDGame,
@@ -0,0 +1,221 @@
+import asyncio
+import time
+import pytest
+from typing import Any
+from fastapi import HTTPException
+from app.crud import crud_game_current
+from app.core.actors import GameActors
+from app.core.logic import GameLogic
+from app.constructs import Factions
+from app.config import settings
+
+
+class TestGameActors:
+    """Test per-game actors
+    """
+
+    @pytest.fixture(scope="function")
+    def saves(
+        self,
+        monkeypatch,
+        game: crud_game_current.CRUDGame,
+            ) -> list[GameLogic]:
+        """Use test db in actors and record saves
+        """
+        saves = []
+
+        def mock_save(game_logic: GameLogic, *args: Any) -> GameLogic:
+            saves.append(game_logic)
+            return game.save_game_logic(game_logic, *args)
+
+        monkeypatch.setattr(settings, 'game_actors_enabled', True)
+        monkeypatch.setattr(crud_game_current.game, 'get_game', game.get_game)
+        monkeypatch.setattr(crud_game_current.game, 'save_game_logic', mock_save)
+        return saves
+
+    def test_moves_are_ordered_and_saved_once(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+        saves: list[GameLogic],
+            ) -> None:
+        """Test burst of moves is applied in order and saved by one write
+        """
+        actors = GameActors(flush_ms=50, idle_seconds=1)
+        order = []
+
+        def move(num: int) -> Any:
+            def apply(game_logic: GameLogic) -> int:
+                order.append(num)
+                if num == 0:
+                    game_logic.set_faction(Factions.CIA)
+                elif num == 1:
+                    game_logic.set_mission_card()
+                return num
+            return apply
+
+        async def run() -> list[int]:
+            return await asyncio.gather(*[
+                actors.play(game_id, settings.user0_login, move(num))
+                for num in range(3)
+                    ])
+
+        assert asyncio.run(run()) == [0, 1, 2], 'wrong results'
+        assert order == [0, 1, 2], 'wrong order'
+        assert len(saves) == 1, 'moves are not coalesced'
+
+        data = game.get_game(game_id, settings.user0_login)
+        assert data.players.player.faction == Factions.CIA, 'faction not saved'
+        assert data.decks.objectives.last is not None, 'mission not saved'
+
+    def test_rejected_move(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+        saves: list[GameLogic],
+            ) -> None:
+        """Test rejected move raises and doesn't drop other moves
+        """
+        actors = GameActors(flush_ms=50, idle_seconds=1)
+
+        async def run() -> list[Any]:
+            return await asyncio.gather(*[
+                actors.play(
+                    game_id,
+                    settings.user0_login,
+                    lambda game_logic: game_logic.set_faction(Factions.KGB),
+                        )
+                for _ in range(2)
+                    ], return_exceptions=True)
+
+        first, second = asyncio.run(run())
+        assert isinstance(first, GameLogic), 'move is not applied'
+        assert isinstance(second, HTTPException), 'move is not rejected'
+        assert second.status_code == 409, 'wrong status'
+        assert len(saves) == 1, 'wrong saves'
+        assert game.get_game(game_id, settings.user0_login) \
+            .players.player.faction == Factions.KGB, 'faction not saved'
+
+    def test_rejected_move_changed_game(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+        saves: list[GameLogic],
+            ) -> None:
+        """Test changes of move, that is rejected after it changes game,
+        aren't saved by next moves
+        """
+        actors = GameActors(flush_ms=50, idle_seconds=1)
+
+        def rejected(game_logic: GameLogic) -> None:
+            game_logic.set_faction(Factions.CIA)
+            raise HTTPException(status_code=409, detail="Objective deck is empty.")
+
+        async def run() -> list[Any]:
+            return await asyncio.gather(
+                actors.play(game_id, settings.user0_login, rejected),
+                actors.play(game_id, settings.user0_login, GameLogic.set_balance),
+                return_exceptions=True,
+                    )
+
+        first, second = asyncio.run(run())
+        assert isinstance(first, HTTPException), 'move is not rejected'
+        assert first.status_code == 409, 'wrong status'
+        assert isinstance(second, GameLogic), 'move is not applied'
+        assert len(saves) == 1, 'wrong saves'
+
+        data = game.get_game(game_id, settings.user0_login)
+        assert data.players.player.faction is None, 'rejected move saved'
+        assert data.players.player.has_balance is not None, 'move not saved'
+
+    def test_game_not_found(self, saves: list[GameLogic]) -> None:
+        """Test move to not existed game raises 404
+        """
+        actors = GameActors(flush_ms=0, idle_seconds=1)
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(actors.play(
+                'wrong_id', settings.user0_login, GameLogic.set_next_turn
+                    ))
+        assert exc.value.status_code == 404, 'wrong status'
+        assert saves == [], 'game saved'
+
+    def test_changed_game_is_reloaded(
+        self,
+        connection: dict[str, Any],
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+        saves: list[GameLogic],
+            ) -> None:
+        """Test actor doesn't overwrite game changed by another request
+        and loads game again by next move
+        """
+        actors = GameActors(flush_ms=0, idle_seconds=1)
+
+        def change(game_logic: GameLogic) -> None:
+            connection['CurrentGameData'].objects(id=game_id) \
+                .update_one(set__state_hash='changed')
+            game_logic.set_faction(Factions.CIA)
+
+        async def run() -> None:
+            await actors.play(game_id, settings.user0_login, GameLogic.set_balance)
+            with pytest.raises(HTTPException) as exc:
+                await actors.play(game_id, settings.user0_login, change)
+            assert exc.value.status_code == 409, 'wrong status'
+            await actors.play(
+                game_id,
+                settings.user0_login,
+                lambda game_logic: game_logic.set_faction(Factions.KGB),
+                    )
+
+        asyncio.run(run())
+        assert game.get_game(game_id, settings.user0_login) \
+            .players.player.faction == Factions.KGB, 'game is not reloaded'
+
+    def test_idle_actor_is_stopped(
+        self,
+        game_id: str,
+        saves: list[GameLogic],
+            ) -> None:
+        """Test actor is stopped, when game is idle
+        """
+        actors = GameActors(flush_ms=0, idle_seconds=0.05)
+
+        async def run() -> None:
+            await actors.play(game_id, settings.user0_login, GameLogic.set_balance)
+            actor = actors.get(game_id, settings.user0_login)
+            await asyncio.sleep(0.2)
+            assert actor.stopped, 'actor not stopped'
+            assert actors.get(game_id, settings.user0_login) is not actor, \
+                'stopped actor is used'
+            await actors.stop()
+
+        asyncio.run(run())
+
+    def test_stop_finishes_move_in_progress(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+        saves: list[GameLogic],
+            ) -> None:
+        """Test stop waits for move, that runs in thread, and saves it
+        """
+        actors = GameActors(flush_ms=1000, idle_seconds=1)
+
+        def slow(game_logic: GameLogic) -> str:
+            time.sleep(0.2)
+            game_logic.set_faction(Factions.CIA)
+            return 'done'
+
+        async def run() -> Any:
+            future = asyncio.ensure_future(
+                actors.play(game_id, settings.user0_login, slow)
+                    )
+            await asyncio.sleep(0.05)
+            await actors.stop()
+            return await asyncio.wait_for(future, 1)
+
+        assert asyncio.run(run()) == 'done', 'move not resolved'
+        assert len(saves) == 1, 'wrong saves'
+        assert game.get_game(game_id, settings.user0_login) \
+            .players.player.faction == Factions.CIA, 'move not saved'
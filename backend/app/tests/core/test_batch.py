@@ -0,0 +1,262 @@
+import pytest
+import random
+import numpy as np
+from typing import Any, Callable
+from fastapi import HTTPException
+from bgameb import Dice
+from app.core import batch
+from app.core.batch import BatchGame
+from app.core.logic import GameLogic
+from app.models.model_game_current import CurrentGameData
+from app.schemas.scheme_game_current_api import LegalActions
+from app.constructs import (
+    Agents, Groups, Objectives, Factions, Sides, AwaitingAbilities, Phases
+        )
+
+
+SIDES = (Sides.PLAYER, Sides.OPPONENT)
+ABILITIES = (
+    (AwaitingAbilities.DOUBLE, batch.AWAITING_DOUBLE),
+    (AwaitingAbilities.ANALYST, batch.AWAITING_ANALYST),
+        )
+
+
+def _make_logic(db_game_data: dict[str, Any], rnd: random.Random) -> GameLogic:
+    """Make started game with random scores, abilities and objectives
+    """
+    game_logic = GameLogic(CurrentGameData(**db_game_data))
+    game_logic.deal_and_shuffle_decks()
+    objectives = game_logic.proc.decks.objectives
+
+    for side in SIDES:
+        user = game_logic._get_side_proc(side)
+        user.score = rnd.randint(0, 3)
+        for ability, _ in ABILITIES:
+            if rnd.random() < 0.5:
+                user.awaiting_abilities.append(ability)
+
+    owner = rnd.choice(['owned_by_player', 'owned_by_opponent', None])
+    if owner is not None:
+        card = objectives.by_id(Objectives.NUCLEARESCALATION)[0]
+        objectives.current.remove(card)
+        getattr(objectives, owner).append(Objectives.NUCLEARESCALATION)
+
+    return game_logic
+
+
+def _apply(game_logic: GameLogic, action: Callable[[GameLogic], Any]) -> bool:
+    try:
+        action(game_logic)
+    except (HTTPException, IndexError):
+        return False
+    return True
+
+
+def _legal_mask(actions: LegalActions) -> list[bool]:
+    """Convert legal actions of GameLogic to batch actions mask
+    """
+    result = []
+    for action, arg in batch.ACTIONS:
+        if action == 'next_phase':
+            result.append(actions.next_phase)
+        elif action == 'next_turn':
+            result.append(actions.next_turn)
+        elif action == 'analyst_look':
+            result.append(actions.analyst_look)
+        elif action == 'analyst_arrange':
+            result.append(actions.analyst_arrange)
+        elif action == 'agent_x':
+            result.append(batch.AGENTS[arg] in actions.agent_x)
+        elif action == 'recruit':
+            result.append(actions.recruit)
+        elif action == 'pass':
+            result.append(actions.pass_influence)
+        elif action == 'nuclear_escalation':
+            result.append(actions.nuclear_escalation)
+    return result
+
+
+class TestBatchGame:
+    """Test batch game engine
+    """
+
+    def test_from_processors(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test batch is created from game processors
+        """
+        game_logic.set_faction(Factions.KGB).set_mission_card()
+        games = BatchGame.from_processors([game_logic.proc, game_logic.proc])
+
+        assert games.size == 2, 'wrong size'
+        assert (games.faction == [1, 0]).all(), 'wrong faction'
+        assert (games.group_zone == batch.ZONE_DECK).all(), 'wrong groups'
+        assert (games.objective_zone[0] == batch.ZONE_DECK).sum() == 20, \
+            'wrong objectives'
+        assert (games.objective_zone[0] == batch.ZONE_MISSION).sum() == 1, \
+            'wrong mission'
+        assert (games.agents == batch.IN_HEADQUARTER).all(), 'wrong agents'
+
+    def test_deal_and_shuffle_decks(self) -> None:
+        """Test decks are dealt and shuffled only for masked games
+        """
+        games = BatchGame(4)
+        mask = np.array([True, True, False, True])
+
+        ok = games.deal_and_shuffle_decks(mask, np.random.default_rng(0))
+
+        assert (ok == mask).all(), 'wrong mask'
+        assert (games.group_zone[mask] == batch.ZONE_DECK).all(), 'wrong zone'
+        assert (games.group_zone[~mask] == batch.ZONE_OUT).all(), 'wrong zone'
+        for pos in games.group_pos[mask]:
+            assert sorted(pos) == list(range(len(Groups))), 'wrong positions'
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_conformance_with_game_logic(
+        self,
+        seed: int,
+        db_game_data: dict[str, Any],
+        monkeypatch,
+            ) -> None:
+        """Test batch engine gives the same games as GameLogic
+        on random actions
+        """
+        rnd = random.Random(seed)
+        random.seed(seed)
+        rng = np.random.default_rng(seed)
+        size = 16
+
+        logics = [_make_logic(db_game_data, rnd) for _ in range(size)]
+        games = BatchGame.from_processors([logic.proc for logic in logics])
+
+        roll = [1]
+        monkeypatch.setattr(Dice, 'roll', lambda self: roll)
+
+        for step in range(300):
+            mask = rng.random(size) < 0.8
+            side = int(rng.integers(2))
+            kind = rng.choice([
+                'faction', 'mission', 'balance', 'next_phase', 'next_phase',
+                'next_turn', 'analyst_look', 'analyst_arrange', 'agent_x',
+                'recruit', 'recruit', 'pass', 'nuclear', 'ability',
+                    ])
+
+            if kind == 'faction':
+                faction = int(rng.integers(2))
+                ok = games.set_faction(faction, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.set_faction(Factions(batch.FACTIONS[faction]))
+            elif kind == 'mission':
+                ok = games.set_mission_card(mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.set_mission_card()
+            elif kind == 'balance':
+                coin = rng.integers(1, 3, size)
+                ok = games.set_balance(mask, coin)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    roll[0] = int(coin[num])
+                    logic.set_balance()
+            elif kind == 'next_phase':
+                ok = games.set_next_phase(mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.chek_phase_conditions_before_next() \
+                        .set_next_phase() \
+                        .set_phase_conditions_after_next()
+            elif kind == 'next_turn':
+                ok = games.set_next_turn(mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.set_next_turn()
+            elif kind == 'analyst_look':
+                ok = games.play_analyst_for_look_the_top(side, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.play_analyst_for_look_the_top(SIDES[side])
+            elif kind == 'analyst_arrange':
+                top = games.group_pos.argsort(axis=1)[:, -3:]
+                order = rng.permuted(top, axis=1)
+                wrong = rng.random(size) < 0.2
+                order[wrong] = rng.integers(len(Groups), size=(wrong.sum(), 3))
+                ok = games.play_analyst_for_arrange_the_top(order, side, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.play_analyst_for_arrange_the_top(
+                        [Groups(batch.GROUPS[ind]) for ind in order[num]],
+                        SIDES[side],
+                            )
+            elif kind == 'agent_x':
+                agent = int(rng.integers(len(Agents)))
+                ok = games.set_agent_x(agent, side, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.set_agent_x(Agents(batch.AGENTS[agent]), SIDES[side])
+            elif kind == 'recruit':
+                ok = games.recruit_group(side, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.recruit_group(SIDES[side])
+            elif kind == 'pass':
+                ok = games.pass_influence(side, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.pass_influence(SIDES[side])
+            elif kind == 'nuclear':
+                ok = games.nuclear_escalation(side, mask)
+
+                def action(logic: GameLogic, num: int) -> None:
+                    logic.nuclear_escalation(SIDES[side])
+            else:
+                ability, flag = ABILITIES[int(rng.integers(2))]
+                ok = mask & ~(games.awaiting[:, side] & flag).astype(bool)
+                games.awaiting[ok, side] |= flag
+
+                def action(logic: GameLogic, num: int) -> None:
+                    abilities = logic._get_side_proc(SIDES[side]).awaiting_abilities
+                    if ability in abilities:
+                        raise HTTPException(status_code=409)
+                    abilities.append(ability)
+
+            expected_ok = np.array([
+                bool(mask[num]) and _apply(logic, lambda game: action(game, num))
+                for num, logic in enumerate(logics)
+                    ])
+            expected = BatchGame.from_processors([logic.proc for logic in logics])
+
+            assert (ok == expected_ok).all(), f'wrong result of {kind} on {step=}'
+            for side in range(2):
+                legal = games.get_legal_actions(side)
+                expected_legal = np.array([
+                    _legal_mask(logic.get_legal_actions(SIDES[side]))
+                    for logic in logics
+                        ])
+                assert (legal == expected_legal).all(), \
+                    f'wrong legal actions after {kind} on {step=}'
+            for field in BatchGame.FIELDS:
+                assert np.array_equal(
+                    getattr(games, field), getattr(expected, field)
+                        ), f'wrong {field} after {kind} on {step=}'
+
+    def test_apply_actions(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test actions are applied by index for every game
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        games = BatchGame.from_processors([game_logic.proc] * 3)
+        spy = batch.ACTIONS.index(('agent_x', batch.AGENTS.index(Agents.SPY)))
+        recruit = batch.ACTIONS.index(('recruit', None))
+
+        legal = games.get_legal_actions()
+        assert legal[:, spy].all(), 'wrong legal actions'
+        assert not legal[:, recruit].any(), 'wrong legal actions'
+
+        ok = games.apply_actions(np.array([spy, recruit, spy]), mask=[1, 1, 0])
+
+        assert ok.tolist() == [True, False, False], 'wrong result'
+        assert not games.get_legal_actions()[0, spy], 'agent not set'
@@ -0,0 +1,129 @@
+import numpy as np
+from time import time
+from app.core import batch
+from app.core.batch import BatchGame
+from app.core.bot import MCTSBot, determinize, search, search_until, evaluate
+from app.core.logic import GameLogic
+from app.constructs import Agents, Phases, Sides
+
+
+class TestBot:
+    """Test Monte Carlo tree search bot
+    """
+
+    def test_determinize(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test determinize shuffles only unknown cards and agent x
+        """
+        game_logic.deal_and_shuffle_decks()
+        game_logic.proc.players.player.awaiting_abilities.append(Agents.ANALYST)
+        game_logic.play_analyst_for_look_the_top()
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        game_logic.set_agent_x(Agents.SPY, Sides.OPPONENT)
+        games = BatchGame.from_processors([game_logic.proc])
+
+        sample = determinize(games, 0, np.random.default_rng(0))
+        known = games.group_revealed[0, :, 0]
+
+        assert known.sum() == 3, 'wrong revealed'
+        assert (sample.group_pos[0, known] == games.group_pos[0, known]).all(), \
+            'known cards moved'
+        assert sorted(sample.group_pos[0]) == sorted(games.group_pos[0]), \
+            'wrong deck'
+        assert sorted(sample.objective_pos[0]) == sorted(games.objective_pos[0]), \
+            'wrong deck'
+        assert ((sample.agents[0, 1] & batch.AGENT_X) != 0).sum() == 1, \
+            'wrong agent x'
+        assert (sample.agents[0, 0] == games.agents[0, 0]).all(), \
+            'own agents changed'
+
+    def test_evaluate(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test evaluate prefers side with more groups
+        """
+        games = BatchGame.from_processors([game_logic.proc])
+        assert evaluate(games, 0) == 0.5, 'wrong evaluation'
+
+        games.group_zone[0, 0] = batch.ZONE_PLAYER
+        assert evaluate(games, 0) > 0.5, 'wrong evaluation'
+        assert evaluate(games, 1) < 0.5, 'wrong evaluation'
+
+    def test_search(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test search visits only legal root actions
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        games = BatchGame.from_processors([game_logic.proc])
+
+        visits = search(games, 1, 10.0, seed=0, iterations=50)
+        legal = games.get_legal_actions(1)[0]
+
+        assert visits.sum() == 50, 'wrong iterations'
+        assert (visits[~legal] == 0).all(), 'illegal action visited'
+
+    def test_choose_and_apply_action(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test bot choose legal action and apply it to game logic
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        bot = MCTSBot(seconds=0.05)
+
+        action = bot.play(game_logic, Sides.OPPONENT)
+
+        assert batch.ACTIONS[action][0] == 'agent_x', 'wrong action'
+        assert game_logic.proc.players.opponent.agents.agent_x is not None, \
+            'action not applied'
+
+    def test_choose_action_if_no_actions(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test bot returns None if side has no actions
+        """
+        game_logic.proc.steps.is_game_ends = True
+
+        assert MCTSBot(seconds=0.05).play(game_logic) is None, 'wrong action'
+
+    def test_search_until_deadline(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test search in worker does nothing after deadline
+        """
+        games = BatchGame.from_processors([game_logic.proc])
+
+        visits = search_until(time() - 1, games, 1, seed=0)
+
+        assert visits.sum() == 0, 'search after deadline'
+
+    def test_choose_action_with_workers(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test bot with workers meets think time and chooses legal action
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        games = BatchGame.from_processors([game_logic.proc])
+        legal = games.get_legal_actions(1)[0]
+        bot = MCTSBot(seconds=0.2, workers=2)
+
+        try:
+            action = bot.choose_action(game_logic, Sides.OPPONENT)
+            assert legal[action], 'illegal action'
+
+            start = time()
+            action = bot.choose_action(game_logic, Sides.OPPONENT, seconds=0)
+            assert time() - start < 1, 'think time exceeded'
+            assert legal[action], 'illegal fallback action'
+        finally:
+            bot.shutdown()
+
+        assert bot._pool is None, 'pool not stopped'
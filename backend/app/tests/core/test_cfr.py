@@ -0,0 +1,120 @@
+import numpy as np
+from pathlib import Path
+from app.core import batch
+from app.core.batch import BatchGame
+from app.core.bot import MCTSBot, agent_x_strategy
+from app.core.cfr import AgentXSolver, MASKS, TABLE, solve, solver
+from app.core.logic import GameLogic
+from app.constructs import Agents, Objectives, Phases, Sides
+
+
+class TestCFR:
+    """Test counterfactual regret minimization solver of agent X choice
+    """
+
+    def test_solve_matching_pennies(self) -> None:
+        """Test solve finds mixed equilibrium
+        """
+        payoff = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        masks = np.ones((1, 2), bool)
+
+        player, opponent = solve(payoff, masks, masks, 2000)
+
+        assert np.allclose(player, 0.5, atol=0.02), 'wrong player strategy'
+        assert np.allclose(opponent, 0.5, atol=0.02), 'wrong opponent strategy'
+
+    def test_solve_is_near_equilibrium(self) -> None:
+        """Test best response gains little against solved strategies
+        """
+        payoff = np.random.default_rng(0).normal(size=(6, 6))
+        size = len(MASKS)
+        player_masks = np.repeat(MASKS, size, axis=0)
+        opponent_masks = np.tile(MASKS, (size, 1))
+
+        player, opponent = solve(payoff, player_masks, opponent_masks)
+
+        best_player = np.where(player_masks, opponent @ payoff.T, -np.inf).max(axis=1)
+        best_opponent = np.where(opponent_masks, player @ payoff, np.inf).min(axis=1)
+        valid = player_masks.any(axis=1) & opponent_masks.any(axis=1)
+
+        assert (player[~player_masks] == 0).all(), 'unavailable agent played'
+        assert (opponent[~opponent_masks] == 0).all(), 'unavailable agent played'
+        assert np.allclose(player[valid].sum(axis=1), 1), 'wrong distribution'
+        assert (best_player - best_opponent)[valid].max() < 0.1, \
+            'strategies are exploitable'
+
+    def test_get_strategy(self) -> None:
+        """Test lookup of strategy by situation
+        """
+        strategy = solver.get_strategy(
+            [0, 1], range(6), Objectives.EGYPT, True, Sides.PLAYER
+                )
+
+        assert strategy.shape == (6, ), 'wrong shape'
+        assert np.isclose(strategy.sum(), 1), 'wrong distribution'
+        assert (strategy[2:] == 0).all(), 'unavailable agent played'
+        assert solver.get_table(10, True) is solver.get_table(10, True), \
+            'table not cached'
+
+    def test_save_and_load(self, tmp_path: Path) -> None:
+        """Test tables of all keys are saved and loaded from file
+        """
+        path = str(tmp_path / 'agent_x.npz')
+        agent_x_solver = AgentXSolver(
+            range(1, 7), {Objectives.EGYPT.value: 10}, iterations=20
+                )
+        agent_x_solver.save(path)
+
+        loaded = AgentXSolver(
+            range(1, 7), {Objectives.EGYPT.value: 10}, iterations=20
+                )
+        assert loaded.load(path), 'tables not loaded'
+        assert set(loaded._table) == set(agent_x_solver.keys()), 'wrong keys'
+        assert np.allclose(
+            loaded.get_table(10, True), agent_x_solver.get_table(10, True)
+                ), 'wrong table'
+
+        outdated = AgentXSolver(
+            range(1, 7), {Objectives.EGYPT.value: 10}, iterations=30
+                )
+        assert not outdated.load(path), 'outdated tables loaded'
+        assert not outdated.load(str(tmp_path / 'missing.npz')), \
+            'missing file loaded'
+
+    def test_shipped_tables(self) -> None:
+        """Test shipped file has tables of all keys of cards
+        """
+        agent_x_solver = AgentXSolver(solver.initiative, solver.victory_points)
+
+        assert agent_x_solver.load(TABLE), 'shipped tables are outdated'
+        assert set(agent_x_solver._table) == set(agent_x_solver.keys()), \
+            'wrong keys'
+
+    def test_agent_x_strategy(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test bot looks up agent X strategy only in planning phase
+        """
+        agent_x_solver = AgentXSolver(
+            range(1, 7), {Objectives.EGYPT.value: 10}, iterations=50
+                )
+        games = BatchGame.from_processors([game_logic.proc])
+        assert agent_x_strategy(games, 1, agent_x_solver) is None, \
+            'strategy out of planning'
+
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        game_logic.proc.players.player.agents.by_id(Agents.SPY)[0] \
+            .is_in_headquarter = False
+        games = BatchGame.from_processors([game_logic.proc])
+        strategy = agent_x_strategy(games, 1, agent_x_solver)
+
+        assert np.isclose(strategy.sum(), 1), 'wrong distribution'
+
+        bot = MCTSBot(seconds=0.05, agent_x_solver=agent_x_solver)
+        action = bot.play(game_logic, Sides.OPPONENT)
+
+        assert batch.ACTIONS[action][0] == 'agent_x', 'wrong action'
+        assert agent_x_strategy(
+            BatchGame.from_processors([game_logic.proc]), 1, agent_x_solver
+                ) is None, 'strategy after choice'
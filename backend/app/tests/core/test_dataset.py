@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+from pathlib import Path
+from app.core.dataset import Dataset, export_archive, export_games
+from app.core.features import encode_documents
+from app.core.logic import GameLogic
+from app.crud.crud_game_archive import CRUDArchive
+from app.crud.crud_game_current import CRUDGame
+from app.constructs import Factions
+
+
+class TestDataset:
+    """Test dataset export and reader
+    """
+
+    def test_export_games(
+        self,
+        game: CRUDGame,
+        game_logic: GameLogic,
+        tmp_path: Path,
+            ) -> None:
+        """Test games are exported to shards and read by rows
+        """
+        game_logic.deal_and_shuffle_decks()
+        docs = []
+        for num in range(7):
+            game_logic.proc.players.player.score = num
+            game.save_game_logic(game_logic)
+            doc = game.model.objects(id=game_logic.game.id).as_pymongo().first()
+            docs.append(doc)
+
+        assert export_games(iter(docs), tmp_path, shard_size=3, batch_size=2) == 7, \
+            'wrong rows'
+
+        dataset = Dataset(tmp_path)
+        assert len(dataset) == 7, 'wrong length'
+        assert len(dataset.index['shards']) == 3, 'wrong shards'
+        assert isinstance(dataset.shard('features', 0), np.memmap), 'not memory map'
+
+        features = encode_documents(docs)
+        assert (dataset.get('features', [6, 0, 4]) == features[[6, 0, 4]]).all(), \
+            'wrong rows'
+        batches = list(dataset.iter_batches(4, ['features', 'game_id']))
+        assert [len(batch['features']) for batch in batches] == [4, 3], \
+            'wrong batches'
+        assert (np.concatenate([batch['features'] for batch in batches])
+                == features).all(), 'wrong features'
+        assert batches[0]['game_id'][0].decode() == str(game_logic.game.id), \
+            'wrong game id'
+
+    def test_export_archive(
+        self,
+        archive: CRUDArchive,
+        game: CRUDGame,
+        game_logic: GameLogic,
+        tmp_path: Path,
+            ) -> None:
+        """Test archived games are exported
+        """
+        game_logic.set_faction(Factions.CIA)
+        game_logic.proc.steps.is_game_ends = True
+        game.save_game_logic(game_logic)
+        archive.archive_games()
+
+        assert export_archive(tmp_path / 'expired', is_game_ends=False) == 0, \
+            'wrong filter'
+        assert export_archive(tmp_path / 'all') == 1, 'wrong rows'
+
+        dataset = Dataset(tmp_path / 'all')
+        legal = dataset.get('legal_actions', [0])
+        assert not legal.any(), 'finished game has legal actions'
+
+    def test_version(
+        self,
+        tmp_path: Path,
+            ) -> None:
+        """Test unknown dataset version is not read
+        """
+        export_games([], tmp_path)
+        index = (tmp_path / 'index.json').read_text()
+        (tmp_path / 'index.json').write_text(
+            index.replace('"version": 1', '"version": 0')
+                )
+
+        with pytest.raises(ValueError):
+            Dataset(tmp_path)
@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+from app.core import batch
+from app.core.batch import BatchGame
+from app.core.bot import determinize
+from app.core.env import (
+    Env, BatchEnv, VectorEnv, OBSERVATION_SIZE, encode_observation, random_actions
+        )
+from app.core.logic import GameLogic
+from app.constructs import Agents, Phases, Sides
+
+
+class TestEnv:
+    """Test reinforcement learning environments
+    """
+
+    def test_encode_observation_hides_unknown(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test observation doesn't depend on cards and agents unknown to side
+        """
+        game_logic.deal_and_shuffle_decks()
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        game_logic.set_agent_x(Agents.SPY, Sides.OPPONENT)
+        games = BatchGame.from_processors([game_logic.proc])
+        rng = np.random.default_rng(0)
+
+        observation = encode_observation(games, 0)
+
+        assert observation.shape == (1, OBSERVATION_SIZE), 'wrong shape'
+        for _ in range(5):
+            assert (encode_observation(determinize(games, 0, rng), 0)
+                    == observation).all(), 'unknown information encoded'
+        assert not (encode_observation(games, 1) == observation).all(), \
+            'wrong side'
+
+    def test_env(self) -> None:
+        """Test reset and step of environment of one game
+        """
+        env = Env(max_steps=20)
+        observation, _ = env.reset(seed=0)
+
+        assert observation.shape == (OBSERVATION_SIZE, ), 'wrong shape'
+        with pytest.raises(ValueError):
+            env.step(int(np.flatnonzero(~env.legal_action_mask())[0]))
+
+        rng = np.random.default_rng(0)
+        for step in range(20):
+            action = int(rng.choice(np.flatnonzero(env.legal_action_mask())))
+            observation, reward, terminated, truncated, _ = env.step(action)
+            if terminated or truncated:
+                break
+
+        assert truncated and step == 19, 'wrong truncation'
+        assert env.game_logic.proc.steps.game_turn > 1, 'game not played'
+
+    def test_batch_env(self) -> None:
+        """Test batch environment steps all games and resets finished
+        """
+        env = BatchEnv(64, max_steps=10, seed=0)
+        observations = env.reset()
+
+        assert observations.shape == (64, OBSERVATION_SIZE), 'wrong shape'
+        assert (env.games.phase == batch.BRIEFING).all(), 'wrong start'
+
+        for _ in range(10):
+            observations, rewards, terminated, truncated = env.step(
+                random_actions(env.legal_action_mask(), env.rng)
+                    )
+
+        assert rewards.shape == (64, ), 'wrong rewards'
+        assert (terminated | truncated).all(), 'games not finished'
+        assert (env.games.turn == 1).all(), 'games not reset'
+        assert env.legal_action_mask().any(axis=1).all(), 'no legal actions'
+
+    def test_vector_env(self) -> None:
+        """Test vector environment returns results of all workers
+        """
+        env = VectorEnv(10, workers=2, seed=0)
+        try:
+            observations = env.reset()
+            assert observations.shape == (10, OBSERVATION_SIZE), 'wrong shape'
+            assert env.legal_action_mask().any(axis=1).all(), 'wrong masks'
+
+            rng = np.random.default_rng(0)
+            for _ in range(5):
+                observations, rewards, _, _ = env.step(
+                    random_actions(env.legal_action_mask(), rng)
+                        )
+
+            phase = observations[:, :len(batch.PHASES)]
+            assert (phase.sum(axis=1) == 1).all(), 'wrong observations'
+            assert (phase[:, batch.BRIEFING] == 0).any(), 'games not stepped'
+        finally:
+            env.close()
@@ -0,0 +1,68 @@
+import numpy as np
+from app.core.batch import BatchGame
+from app.core.bot import bot
+from app.core.features import (
+    FEATURES_SIZE, encode_documents, encode_games, encode_processor, feature_names
+        )
+from app.core.logic import GameLogic
+from app.crud.crud_game_current import CRUDGame
+from app.constructs import Factions, Sides
+from app.config import settings
+
+
+class TestFeatures:
+    """Test state feature encoder
+    """
+
+    def test_from_documents(
+        self,
+        game: CRUDGame,
+            ) -> None:
+        """Test batch from stored documents is equal to batch from processors
+        """
+        game_logic = GameLogic(game.get_last_game(settings.user0_login))
+        game_logic.deal_and_shuffle_decks().set_faction(Factions.KGB) \
+            .set_mission_card().set_balance()
+        rng = np.random.default_rng(0)
+        docs, procs = [], []
+
+        for step in range(60):
+            side = step % 2
+            legal = np.flatnonzero(
+                BatchGame.from_processors([game_logic.proc]).get_legal_actions(side)[0]
+                    )
+            if legal.size:
+                bot.apply_action(
+                    game_logic, int(rng.choice(legal)), Sides.get_values()[side]
+                        )
+            game.save_game_logic(game_logic)
+            doc = game.model.objects(id=game_logic.game.id).as_pymongo().first()
+            docs.append(doc)
+            procs.append(GameLogic(game.model._from_son(doc)).proc)
+
+        from_docs = BatchGame.from_documents(docs)
+        from_procs = BatchGame.from_processors(procs)
+
+        for field in BatchGame.FIELDS:
+            assert (getattr(from_docs, field) == getattr(from_procs, field)).all(), \
+                f'wrong {field}'
+        assert len(set(from_docs.phase)) > 1, 'game not played'
+
+    def test_encode(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test encode processor, document and batch
+        """
+        game_logic.deal_and_shuffle_decks()
+        features = encode_processor(game_logic.proc)
+
+        assert features.shape == (FEATURES_SIZE, ), 'wrong shape'
+        assert len(feature_names()) == FEATURES_SIZE, 'wrong names'
+        assert (encode_documents([game_logic.game]) == encode_games(
+            BatchGame.from_processors([GameLogic(game_logic.game).proc])
+                )).all(), 'wrong document encoding'
+
+        names = feature_names()
+        assert features[names.index('phase.briefing')] == 1, 'wrong phase'
+        assert features[names.index('turn')] == 1, 'wrong turn'
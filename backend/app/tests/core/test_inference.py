@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+import numpy as np
+from app.core.batch import ACTIONS
+from app.core.env import OBSERVATION_SIZE
+from app.core.inference import BatchedPolicy, LinearPolicy
+from app.core.logic import GameLogic
+from app.constructs import Phases, Sides
+
+
+class CountingPolicy(LinearPolicy):
+    """Policy, that records size of every call
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[int] = []
+
+    def __call__(self, observations: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        self.calls.append(len(observations))
+        return super().__call__(observations, legal)
+
+
+class TestInference:
+    """Test micro-batching policy inference
+    """
+
+    def test_linear_policy(self) -> None:
+        """Test policy gives probability only to legal actions
+        """
+        legal = np.zeros((2, len(ACTIONS)), bool)
+        legal[0, [1, 3]] = True
+        legal[1, 5] = True
+        weights = np.zeros((OBSERVATION_SIZE, len(ACTIONS)), np.float32)
+        weights[0, 3] = 1.0
+        observations = np.ones((2, OBSERVATION_SIZE), np.float32)
+
+        probabilities = LinearPolicy(weights)(observations, legal)
+
+        assert np.allclose(probabilities.sum(axis=1), 1), 'wrong distribution'
+        assert (probabilities[~legal] == 0).all(), 'illegal action'
+        assert probabilities[0, 3] > probabilities[0, 1], 'weights not used'
+        assert probabilities[1, 5] == 1, 'wrong single action'
+
+    def test_batching(self) -> None:
+        """Test concurrent decisions are evaluated in batches
+        """
+        policy = CountingPolicy()
+        service = BatchedPolicy(policy, max_batch_size=4, max_wait_ms=50)
+        legal = np.ones(len(ACTIONS), bool)
+        observation = np.zeros(OBSERVATION_SIZE, np.float32)
+
+        async def run() -> list[np.ndarray]:
+            return await asyncio.gather(*[
+                service.predict(observation, legal) for _ in range(10)
+                    ])
+
+        results = asyncio.run(run())
+
+        assert len(results) == 10, 'wrong results'
+        assert np.allclose(results[0], 1 / len(ACTIONS)), 'wrong result'
+        assert policy.calls == [4, 4, 2], 'wrong batches'
+
+    def test_error(self) -> None:
+        """Test error of policy is raised in all waiting requests
+        """
+        def broken(observations: np.ndarray, legal: np.ndarray) -> np.ndarray:
+            raise ValueError('broken')
+
+        service = BatchedPolicy(broken, max_wait_ms=10)
+        legal = np.ones(len(ACTIONS), bool)
+        observation = np.zeros(OBSERVATION_SIZE, np.float32)
+
+        async def run() -> None:
+            await asyncio.gather(*[
+                service.predict(observation, legal) for _ in range(2)
+                    ])
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+    def test_choose_action(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test choose legal action of side or None
+        """
+        service = BatchedPolicy(LinearPolicy(), max_wait_ms=1)
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+
+        action = asyncio.run(service.choose_action(game_logic, Sides.OPPONENT))
+        assert ACTIONS[action][0] == 'agent_x', 'wrong action'
+
+        game_logic.proc.steps.is_game_ends = True
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.BRIEFING)
+        assert asyncio.run(service.choose_action(game_logic)) is None, \
+            'action without legal actions'
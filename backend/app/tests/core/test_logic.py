@@ -3,6 +3,7 @@ from typing import Tuple, Union
 from collections import deque
 from fastapi import HTTPException
 from app.core.logic import GameLogic
+from app.crud.crud_game_current import CRUDGame
 from app.schemas.scheme_game_current import (
     CurrentGameDataProcessor, PlayerProcessor, OpponentProcessor,
     GroupInPlayProcessor,
@@ -123,6 +124,25 @@ class TestGameLogic:
         assert data['decks']['objectives']['deck'][0] == HiddenObjectives.HIDDEN.value, \
             'wrong objectives value'
         assert data['decks']['objectives']['pile'] == [], 'wrong objectives pile'
+        assert data['state_version'] == f'{game_logic.state_hash:016x}', \
+            'wrong state version'
+
+    def test_get_api_scheme_state_version(
+        self,
+        game: CRUDGame,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test state version of api scheme is changed with saved game
+        """
+        version = game_logic.get_api_scheme().state_version
+        game.save_game_logic(game_logic.deal_and_shuffle_decks())
+        saved = GameLogic(
+            game.get_game(str(game_logic.game.id), settings.user0_login)
+                ).get_api_scheme()
+
+        assert saved.state_version == game_logic.game.state_hash, \
+            'not stored version'
+        assert saved.state_version != version, 'version not changed'
 
     def test_deal_and_shuffle_decks(
         self,
@@ -633,6 +653,8 @@ class TestGameLogic:
         assert game_logic.proc.decks.groups.pile[0].id == Groups.MILITIA, \
             'wrong pile id'
         assert len(owned_ob) == 0, 'wrong owned objectives'
+        assert game_logic.get_api_scheme().decks.groups.pile \
+            == [Groups.MILITIA], 'wrong api pile'
 
     @pytest.mark.parametrize("test_input", [Sides.PLAYER, Sides.OPPONENT])
     def test_nuclear_escalation_raise_409_if_ability_not_available(
@@ -919,3 +941,96 @@ class TestSetPhaseConditions:
             'changed'
         assert players.opponent.agents.by_id(Agents.DEPUTY)[0].is_in_headquarter is True, \
             'changed'
+
+    def test_get_legal_actions_briefing(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test get_legal_actions() before game start and with analyst
+        """
+        actions = game_logic.get_legal_actions()
+
+        assert actions.preset is True, 'wrong preset'
+        assert actions.next_phase is False, 'wrong next phase'
+        assert actions.next_turn is False, 'wrong next turn'
+        assert actions.phase_blockers == game_logic.get_phase_blockers(), \
+            'wrong blockers'
+        assert actions.analyst_look is False, 'wrong analyst'
+
+        game_logic.proc.players.player.awaiting_abilities.append(Agents.ANALYST)
+        actions = game_logic.get_legal_actions()
+
+        assert actions.analyst_look is True, 'wrong analyst'
+        assert actions.analyst_arrange is True, 'wrong analyst'
+        assert game_logic.get_legal_actions(Sides.OPPONENT).analyst_look is False, \
+            'wrong opponent analyst'
+
+        game_logic.play_analyst_for_look_the_top()
+
+        assert game_logic.get_legal_actions().analyst_look is False, \
+            'wrong analyst'
+
+    def test_get_legal_actions_planning(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test get_legal_actions() returns agents in headquarter in planning
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.PLANNING)
+        game_logic.proc.players.player.agents.by_id(Agents.SPY)[0] \
+            .is_in_headquarter = False
+
+        actions = game_logic.get_legal_actions()
+
+        assert len(actions.agent_x) == 5, 'wrong agents'
+        assert Agents.SPY not in actions.agent_x, 'wrong agents'
+        for agent in actions.agent_x:
+            game_logic.set_agent_x(agent)
+
+    def test_get_legal_actions_influence(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test get_legal_actions() in influence struggle
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.INFLUENCE)
+
+        actions = game_logic.get_legal_actions()
+
+        assert actions.recruit is True, 'wrong recruit'
+        assert actions.pass_influence is False, 'wrong pass'
+        assert actions.nuclear_escalation is False, 'wrong nuclear escalation'
+
+        game_logic.recruit_group()
+        game_logic.proc.decks.objectives.owned_by_player.append(
+            Objectives.NUCLEARESCALATION
+                )
+        actions = game_logic.get_legal_actions()
+
+        assert actions.pass_influence is True, 'wrong pass'
+        assert actions.nuclear_escalation is True, 'wrong nuclear escalation'
+
+        game_logic.proc.players.player.influence_pass = True
+        game_logic.proc.players.opponent.influence_pass = True
+        actions = game_logic.get_legal_actions()
+
+        assert actions.recruit is False, 'wrong recruit'
+        assert actions.pass_influence is False, 'wrong pass'
+
+    def test_get_legal_actions_detente(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test get_legal_actions() allows only next turn in detente
+        """
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.DETENTE)
+
+        actions = game_logic.get_legal_actions()
+
+        assert actions.next_turn is True, 'wrong next turn'
+        assert actions.next_phase is False, 'wrong next phase'
+
+        game_logic.proc.steps.is_game_ends = True
+
+        assert game_logic.get_legal_actions().next_turn is False, \
+            'wrong next turn'
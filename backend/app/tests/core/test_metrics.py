@@ -0,0 +1,69 @@
+import pytest
+from app.core.metrics import Counter, Gauge, Histogram, Registry
+
+
+class TestMetrics:
+    """Test metrics primitives
+    """
+
+    def test_counter(self) -> None:
+        """Test counter increments and renders
+        """
+        counter = Counter('test_total', 'Test counter', ('kind', ))
+        counter.inc(1, 'a')
+        counter.inc(2, 'a')
+        assert counter.get('a') == 3.0, 'wrong value'
+
+        with pytest.raises(ValueError):
+            counter.inc(-1, 'a')
+        with pytest.raises(ValueError):
+            counter.inc(1)
+
+        text = counter.render()
+        assert '# TYPE test_total counter' in text, 'wrong type'
+        assert 'test_total{kind="a"} 3.0' in text, 'wrong sample'
+
+    def test_gauge(self) -> None:
+        """Test gauge can go up and down
+        """
+        gauge = Gauge('test_gauge', 'Test gauge')
+        gauge.inc(5)
+        gauge.dec(2)
+        assert gauge.get() == 3.0, 'wrong value'
+        gauge.set(10)
+        assert 'test_gauge 10' in gauge.render(), 'wrong sample'
+
+    def test_histogram(self) -> None:
+        """Test histogram buckets are cumulative
+        """
+        histogram = Histogram(
+            'test_seconds', 'Test histogram', ('stage', ), buckets=(0.1, 1.0)
+                )
+        histogram.observe(0.05, 'auth')
+        histogram.observe(0.5, 'auth')
+        histogram.observe(5.0, 'auth')
+        assert histogram.get_count('auth') == 3, 'wrong count'
+
+        text = histogram.render()
+        assert 'test_seconds_bucket{stage="auth",le="0.1"} 1' in text, \
+            'wrong bucket'
+        assert 'test_seconds_bucket{stage="auth",le="1.0"} 2' in text, \
+            'wrong bucket'
+        assert 'test_seconds_bucket{stage="auth",le="+Inf"} 3' in text, \
+            'wrong bucket'
+        assert 'test_seconds_sum{stage="auth"} 5.55' in text, 'wrong sum'
+        assert 'test_seconds_count{stage="auth"} 3' in text, 'wrong count'
+
+    def test_registry(self) -> None:
+        """Test registry renders all metrics
+        """
+        registry = Registry()
+        registry.counter('one_total', 'One').inc()
+        registry.histogram('two_seconds', 'Two').observe(0.1)
+
+        with pytest.raises(ValueError):
+            registry.counter('one_total', 'One')
+
+        text = registry.render()
+        assert 'one_total 1.0' in text, 'wrong counter'
+        assert 'two_seconds_count 1' in text, 'wrong histogram'
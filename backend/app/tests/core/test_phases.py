@@ -0,0 +1,175 @@
+import importlib.util
+import pytest
+import numpy as np
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+from app.core import phases
+from app.core.batch import BatchGame, ACTIONS
+from app.core.bot import bot, SIDES
+from app.core.logic import GameLogic
+from app.schemas.scheme_game_current_api import CurrentGameDataApi
+from app.constructs import Agents, Phases, Factions, Sides
+
+
+FRONTEND_RULES = Path(__file__).parents[4] / 'frontend' / 'app' / 'app' / 'rules.py'
+
+
+@pytest.fixture(scope="module")
+def frontend_rules() -> ModuleType:
+    """Load rules of frontend. Frontend shares api schemes and constructs
+    with backend, so rules are imported with backend modules.
+    """
+    if not FRONTEND_RULES.exists():
+        pytest.skip('frontend is not found')
+    spec = importlib.util.spec_from_file_location('frontend_rules', FRONTEND_RULES)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _get_view(game_logic: GameLogic) -> CurrentGameDataApi:
+    """Get api view as it is rendered after game is saved
+    """
+    game_logic.proc.flusch()
+    return game_logic.get_api_scheme()
+
+
+def _predicted_fields(data: CurrentGameDataApi) -> dict:
+    """Parts of game data, that frontend predicts
+    """
+    # order of lists in api is order of cards in deck
+    steps = data.steps.dict()
+    steps['turn_phases_left'] = sorted(
+        steps['turn_phases_left'], key=list(Phases).index
+            )
+    agents = data.players.player.agents.dict()
+    for name in ('in_headquarter', 'on_leave', 'terminated'):
+        agents[name] = sorted(agents[name], key=list(Agents).index)
+    return {
+        'steps': steps,
+        'player_faction': data.players.player.faction,
+        'opponent_faction': data.players.opponent.faction,
+        'player_agents': agents,
+        'player_pass': data.players.player.influence_pass,
+        'opponent_pass': data.players.opponent.influence_pass,
+            }
+
+
+class TestPhases:
+    """Test phase transition table
+    """
+
+    def test_phase_rules_cover_all_phases(self) -> None:
+        """Test every phase has rule and rules are chained in phase order
+        """
+        values = Phases.get_values()
+
+        assert list(phases.PHASE_RULES) == values, 'wrong phases'
+        for current, following in zip(values, values[1:] + [None]):
+            rule = phases.PHASE_RULES[current]
+            assert (rule.next.value if rule.next else None) == following, \
+                'wrong next phase'
+
+    def test_iter_blockers_is_lazy(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test iter_blockers() checks guards only on request
+        """
+        blockers = phases.iter_blockers(game_logic.proc)
+
+        assert next(blockers) == phases.BRIEFING_GUARDS[0].detail, \
+            'wrong first blocker'
+
+    def test_get_phase_blockers(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test get_phase_blockers() returns all failed guards
+        """
+        blockers = game_logic.get_phase_blockers()
+
+        assert blockers == [
+            "Faction not choosen. Use game/reset/faction to set faction.",
+            "Mission card undefined. Cant push to next phase.",
+            "No one side has balance. Cant push to next phase.",
+                ], 'wrong blockers'
+
+        game_logic.proc.players.player.faction = Factions.CIA
+        game_logic.proc.players.opponent.faction = Factions.KGB
+        game_logic.proc.players.player.has_balance = True
+        game_logic.proc.decks.objectives.pop()
+
+        assert game_logic.get_phase_blockers() == [], 'wrong blockers'
+
+    def test_get_phase_blockers_if_game_end(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test game end blocker is first
+        """
+        game_logic.proc.steps.is_game_ends = True
+
+        assert game_logic.get_phase_blockers()[0] == \
+            "Something can't be changed, because game is end", \
+            'wrong blockers'
+
+
+class TestFrontendRules:
+    """Test frontend rules predict the same as backend phase rules
+    """
+
+    def _check_move(
+        self,
+        predicted: Optional[CurrentGameDataApi],
+        game_logic: GameLogic,
+            ) -> None:
+        assert predicted is not None, 'legal move not predicted'
+        assert _predicted_fields(predicted) \
+            == _predicted_fields(_get_view(game_logic)), 'wrong prediction'
+
+    def test_rules_parity(
+        self,
+        frontend_rules: ModuleType,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test frontend blockers and predicted moves match backend on
+        states of random game
+        """
+        rng = np.random.default_rng(0)
+        game_logic.deal_and_shuffle_decks()
+
+        view = _get_view(game_logic)
+        assert frontend_rules.get_phase_blockers(view) \
+            == game_logic.get_phase_blockers(), 'wrong blockers'
+        predicted = frontend_rules.predict_preset(view, Factions.CIA)
+        game_logic.set_faction(Factions.CIA).set_mission_card().set_balance()
+        self._check_move(predicted, game_logic)
+
+        for _ in range(200):
+            view = _get_view(game_logic)
+            assert frontend_rules.get_phase_blockers(view) \
+                == game_logic.get_phase_blockers(), 'wrong blockers'
+            predicted = {
+                'next_phase': frontend_rules.predict_next_phase(view),
+                'next_turn': frontend_rules.predict_next_turn(view),
+                    }
+            assert (predicted['next_phase'] is not None) \
+                == view.actions.next_phase, 'wrong next phase legality'
+            assert (predicted['next_turn'] is not None) \
+                == view.actions.next_turn, 'wrong next turn legality'
+
+            side = int(rng.integers(2))
+            legal = np.flatnonzero(
+                BatchGame.from_processors([game_logic.proc])
+                .get_legal_actions(side)[0]
+                    )
+            if not legal.size:
+                break
+            action = int(rng.choice(legal))
+            bot.apply_action(game_logic, action, Sides(SIDES[side]))
+
+            name = ACTIONS[action][0]
+            if name in predicted:
+                self._check_move(predicted[name], game_logic)
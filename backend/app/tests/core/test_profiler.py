@@ -0,0 +1,88 @@
+import time
+import asyncio
+import threading
+import pytest
+from app.core.profiler import SamplingProfiler
+
+
+def busy_function(seconds: float) -> int:
+    """Burn cpu for given time
+    """
+    result = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        result += 1
+    return result
+
+
+class TestSamplingProfiler:
+    """Test SamplingProfiler class
+    """
+
+    def test_profiler_collects_stacks(self) -> None:
+        """Test profiler collect collapsed stacks of wrapped function
+        """
+        profiler = SamplingProfiler()
+        wrapped = profiler.wrap(busy_function, 'PATCH /busy', '/busy')
+
+        profiler.start(interval=0.001)
+        thread = threading.Thread(target=wrapped, args=(0.1, ))
+        thread.start()
+        thread.join()
+        result = profiler.stop()
+
+        assert result, 'no samples'
+        line = result.splitlines()[0]
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0, 'wrong count'
+        assert stack.startswith('PATCH /busy;busy_function'), 'wrong stack root'
+        assert profiler.is_running is False, 'profiler is running'
+
+    def test_profiler_is_scoped_by_route(self) -> None:
+        """Test profiler ignore routes out of scope
+        """
+        profiler = SamplingProfiler()
+        wrapped = profiler.wrap(busy_function, 'PATCH /busy', '/busy')
+
+        profiler.start(route='/other', interval=0.001)
+        wrapped(0.05)
+        assert profiler.stop() == '', 'out of scope route is profiled'
+
+    def test_profiler_not_sampled_if_stopped(self) -> None:
+        """Test wrapped function is not profiled while profiler stopped
+        """
+        profiler = SamplingProfiler()
+        wrapped = profiler.wrap(busy_function, 'PATCH /busy', '/busy')
+        assert wrapped(0.001) > 0, 'wrong return'
+        assert profiler.collapsed() == '', 'stopped profiler has samples'
+
+    def test_profiler_cant_start_twice(self) -> None:
+        """Test running profiler can't be started
+        """
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            with pytest.raises(RuntimeError):
+                profiler.start()
+        finally:
+            profiler.stop()
+
+    def test_profiler_samples_threadpool_of_async_route(self) -> None:
+        """Test work of async endpoint, that runs in threadpool, is sampled
+        under route of endpoint
+        """
+        profiler = SamplingProfiler()
+
+        async def endpoint(seconds: float) -> int:
+            return await profiler.run_in_threadpool(busy_function, seconds)
+
+        wrapped = profiler.wrap(endpoint, 'PATCH /busy', '/busy')
+
+        profiler.start(interval=0.001)
+        assert asyncio.run(wrapped(0.1)) > 0, 'wrong return'
+        result = profiler.stop()
+
+        assert result.startswith('PATCH /busy;busy_function'), 'wrong stack root'
+        assert asyncio.run(profiler.run_in_threadpool(busy_function, 0.001)) > 0, \
+            'wrong return'
+        assert profiler.collapsed() == result, 'not profiled call is sampled'
@@ -0,0 +1,188 @@
+import asyncio
+import pytest
+from collections import Counter
+from typing import Any
+from app.core.routing import HashRing, Router, get_route_key
+
+
+KEYS = [f'{num:024x}' for num in range(4000)]
+
+
+class TestHashRing:
+    """Test consistent hash ring
+    """
+
+    def test_keys_are_balanced(self) -> None:
+        """Test keys are spread over all nodes
+        """
+        ring = HashRing([f'node{num}' for num in range(4)])
+        counts = Counter(ring.get(key) for key in KEYS)
+
+        assert len(counts) == 4, 'wrong nodes'
+        assert min(counts.values()) > len(KEYS) / 4 * 0.5, 'keys not balanced'
+
+    def test_added_node_moves_only_own_keys(self) -> None:
+        """Test only keys of new node change node, when node is added
+        """
+        ring = HashRing([f'node{num}' for num in range(4)])
+        before = {key: ring.get(key) for key in KEYS}
+        ring.add('node4')
+        after = {key: ring.get(key) for key in KEYS}
+
+        moved = [key for key in KEYS if before[key] != after[key]]
+        assert all(after[key] == 'node4' for key in moved), \
+            'keys moved between old nodes'
+        assert len(moved) < len(KEYS) * 0.4, 'too many keys moved'
+
+        ring.remove('node4')
+        assert {key: ring.get(key) for key in KEYS} == before, \
+            'keys not returned after remove'
+
+    def test_empty_ring(self) -> None:
+        """Test empty ring raises
+        """
+        with pytest.raises(LookupError):
+            HashRing().get('key')
+
+    @pytest.mark.parametrize("path, authorization, result", [
+        ('/api/v1/game/63ea7e5b7bc8d2a1c1e2e000/next_turn', None,
+         '63ea7e5b7bc8d2a1c1e2e000'),
+        ('/api/v1/game/data/current/63ea7e5b7bc8d2a1c1e2e000', 'Bearer t',
+         '63ea7e5b7bc8d2a1c1e2e000'),
+        ('/api/v1/game/list', 'Bearer t', 'Bearer t'),
+        ('/api/v1/game/data/static', None, None),
+            ])
+    def test_get_route_key(
+        self,
+        path: str,
+        authorization: str,
+        result: str,
+            ) -> None:
+        """Test route key of request
+        """
+        assert get_route_key(path, authorization) == result, 'wrong key'
+
+
+class TestRouter:
+    """Test ASGI router
+    """
+
+    def test_request_is_forwarded(self) -> None:
+        """Test request and response are proxied to worker of game
+        """
+        received = []
+
+        async def worker(
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+                ) -> None:
+            head = await reader.readuntil(b'\r\n\r\n')
+            received.append(head + await reader.readexactly(2))
+            writer.write(
+                b'HTTP/1.1 409 Conflict\r\ncontent-type: application/json\r\n'
+                b'transfer-encoding: chunked\r\n\r\n'
+                b'4\r\n{"a"\r\n3\r\n: 1\r\n1\r\n}\r\n0\r\n\r\n'
+                    )
+            await writer.drain()
+            writer.close()
+
+        async def run() -> list[dict[str, Any]]:
+            server = await asyncio.start_server(worker, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            router = Router([f'http://127.0.0.1:{port}'])
+            messages = [
+                {'type': 'http.request', 'body': b'{}', 'more_body': False}
+                    ]
+            sent = []
+
+            async def receive() -> dict[str, Any]:
+                return messages.pop(0)
+
+            async def send(message: dict[str, Any]) -> None:
+                sent.append(message)
+
+            await router({
+                'type': 'http',
+                'method': 'PATCH',
+                'path': '/api/v1/game/63ea7e5b7bc8d2a1c1e2e000/preset',
+                'raw_path': b'/api/v1/game/63ea7e5b7bc8d2a1c1e2e000/preset',
+                'query_string': b'q=kgb',
+                'headers': [
+                    (b'authorization', b'Bearer t'), (b'connection', b'keep-alive'),
+                        ],
+                'client': ('10.0.0.1', 5000),
+                    }, receive, send)
+            server.close()
+            await server.wait_closed()
+            return sent
+
+        start, body = asyncio.run(run())
+        request = received[0]
+        assert request.startswith(
+            b'PATCH /api/v1/game/63ea7e5b7bc8d2a1c1e2e000/preset?q=kgb HTTP/1.0'
+                ), 'wrong request line'
+        assert b'authorization: Bearer t' in request, 'header not forwarded'
+        assert b'keep-alive' not in request, 'hop header forwarded'
+        assert b'x-forwarded-for: 10.0.0.1' in request, 'client not forwarded'
+        assert request.endswith(b'{}'), 'body not forwarded'
+
+        assert start['status'] == 409, 'wrong status'
+        assert (b'content-type', b'application/json') in start['headers'], \
+            'wrong headers'
+        assert (b'content-length', b'8') in start['headers'], 'wrong length'
+        assert body['body'] == b'{"a": 1}', 'wrong body'
+
+    def test_worker_not_available(self) -> None:
+        """Test router returns 502, if worker is down
+        """
+        router = Router(['http://127.0.0.1:1'])
+        sent = []
+
+        async def receive() -> dict[str, Any]:
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        asyncio.run(router({
+            'type': 'http',
+            'method': 'GET',
+            'path': '/api/v1/game/data/static',
+            'headers': [],
+                }, receive, send))
+        assert sent[0]['status'] == 502, 'wrong status'
+
+    def test_worker_timeout(self) -> None:
+        """Test router returns 504, if worker doesn't respond in timeout
+        """
+        sent = []
+
+        async def worker(
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+                ) -> None:
+            await asyncio.sleep(1)
+            writer.close()
+
+        async def receive() -> dict[str, Any]:
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        async def run() -> None:
+            server = await asyncio.start_server(worker, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            router = Router([f'http://127.0.0.1:{port}'], timeout=0.05)
+            await router({
+                'type': 'http',
+                'method': 'GET',
+                'path': '/api/v1/game/data/static',
+                'headers': [],
+                    }, receive, send)
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(run())
+        assert sent[0]['status'] == 504, 'wrong status'
+        assert sent[1]['body'] == b'Gateway timeout', 'wrong body'
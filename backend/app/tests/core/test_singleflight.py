@@ -0,0 +1,67 @@
+import pytest
+from threading import Event, Thread
+from app.core.singleflight import SingleFlight, SINGLEFLIGHT_COALESCED
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent calls
+    """
+
+    def test_concurrent_calls_are_coalesced(self) -> None:
+        """Test callers with same key wait for one call
+        """
+        group = SingleFlight('test_coalesced')
+        started = Event()
+        release = Event()
+        calls = []
+
+        def func(value: int) -> int:
+            calls.append(value)
+            started.set()
+            release.wait(5)
+            return value
+
+        results = []
+        leader = Thread(target=lambda: results.append(group.do('key', func, 1)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            Thread(target=lambda: results.append(group.do('key', func, 2)))
+            for _ in range(3)
+                ]
+        for thread in followers:
+            thread.start()
+        while SINGLEFLIGHT_COALESCED.get('test_coalesced') < 3:
+            pass
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        assert calls == [1], 'function called more than once'
+        assert results == [1, 1, 1, 1], 'wrong results'
+        assert SINGLEFLIGHT_COALESCED.get('test_coalesced') == 3, \
+            'coalesced calls not counted'
+
+    def test_calls_after_done_are_not_coalesced(self) -> None:
+        """Test result isn't cached after call is done
+        """
+        group = SingleFlight('test_sequential')
+        calls = []
+
+        assert group.do('key', calls.append, 1) is None, 'wrong result'
+        assert group.do('key', calls.append, 2) is None, 'wrong result'
+        assert calls == [1, 2], 'result is cached'
+        assert SINGLEFLIGHT_COALESCED.get('test_sequential') == 0, \
+            'sequential calls counted'
+
+    def test_error_is_raised_and_key_is_released(self) -> None:
+        """Test error of call is raised and next call runs function
+        """
+        group = SingleFlight('test_error')
+
+        def func() -> None:
+            raise ValueError('test')
+
+        with pytest.raises(ValueError):
+            group.do('key', func)
+        assert group.do('key', lambda: 1) == 1, 'key not released'
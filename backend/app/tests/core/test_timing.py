@@ -0,0 +1,85 @@
+from typing import Callable, Generator
+from fastapi.testclient import TestClient
+from app.core import timing
+from app.crud import crud_game_current, crud_user
+from app.config import settings
+
+
+class TestTiming:
+    """Test stage timing
+    """
+
+    def test_stage_is_not_measured_if_disabled(self, monkeypatch) -> None:
+        """Test stage do nothing if timing disabled
+        """
+        monkeypatch.setattr(settings, 'timing_enabled', False)
+        count = timing.STAGE_SECONDS.get_count('test_disabled')
+
+        with timing.stage('test_disabled'):
+            pass
+
+        assert timing.STAGE_SECONDS.get_count('test_disabled') == count, \
+            'stage is measured'
+
+    def test_stage_is_measured(self, monkeypatch) -> None:
+        """Test stage and timed decorator are observed in histogram
+        """
+        monkeypatch.setattr(settings, 'timing_enabled', True)
+        count = timing.STAGE_SECONDS.get_count('test_enabled')
+
+        @timing.timed('test_enabled')
+        def func(value: int) -> int:
+            return value
+
+        with timing.stage('test_enabled'):
+            assert func(1) == 1, 'wrong return'
+
+        assert timing.STAGE_SECONDS.get_count('test_enabled') == count + 2, \
+            'stage is not measured'
+
+    def test_format_server_timing(self) -> None:
+        """Test format of Server-Timing header
+        """
+        value = timing.format_server_timing([('auth', 0.0015), ('rules', 0.01)])
+        assert value == 'auth;dur=1.500, rules;dur=10.000', 'wrong format'
+
+    def test_server_timing_header(
+        self,
+        monkeypatch,
+        connection: Generator,
+        client: TestClient,
+        game_id: str,
+            ) -> None:
+        """Test response has Server-Timing header with request stages
+        """
+        def mock_game(*args, **kwargs) -> Callable:
+            game = crud_game_current.CRUDGame(connection['CurrentGameData'])
+            return game.get_game(*args)
+
+        def mock_user(*args, **kwargs) -> Callable:
+            user = crud_user.CRUDUser(connection['User'])
+            return user.get_by_login(settings.user0_login)
+
+        monkeypatch.setattr(crud_game_current.game, "get_game", mock_game)
+        monkeypatch.setattr(crud_user.user, "get_by_login", mock_user)
+        monkeypatch.setattr(settings, 'timing_enabled', True)
+
+        response = client.post(
+            f"{settings.api_v1_str}/game/data/current/{game_id}",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert response.status_code == 200, f'{response.content=}'
+        header = response.headers['Server-Timing']
+        for name in ['auth', 'db_read', 'fill_process', 'serialize']:
+            assert f'{name};dur=' in header, f'{name} stage not in header'
+
+        monkeypatch.setattr(settings, 'timing_enabled', False)
+        response = client.post(
+            f"{settings.api_v1_str}/game/data/current/{game_id}",
+            headers={
+                'Authorization': f'Bearer {settings.user0_token}'
+                }
+            )
+        assert 'Server-Timing' not in response.headers, 'header is sent'
@@ -0,0 +1,91 @@
+import numpy as np
+from app.core.batch import BatchGame
+from app.core.logic import GameLogic
+from app.core.zobrist import hash_games
+from app.core.bot import bot, SIDES
+from app.constructs import Phases, Agents, Factions, Sides
+
+
+class TestZobrist:
+    """Test Zobrist state hash
+    """
+
+    def test_hash_games(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test equal games have equal hashes
+        """
+        games = BatchGame.from_processors([game_logic.proc, game_logic.proc])
+        hashes = hash_games(games)
+
+        assert hashes.dtype == np.uint64, 'wrong type'
+        assert hashes[0] == hashes[1], 'wrong hash'
+        assert int(hashes[0]) == game_logic.state_hash, 'wrong hash'
+
+        games.turn[1] += 1
+
+        assert hash_games(games)[0] != hash_games(games)[1], 'hash not changed'
+
+    def test_state_hash_follows_moves(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test hash is equal to hash of batch game after moves
+        """
+        start = game_logic.state_hash
+
+        game_logic.set_faction(Factions.CIA).set_mission_card()
+        game_logic.proc.players.player.has_balance = True
+        game_logic.chek_phase_conditions_before_next() \
+            .set_next_phase() \
+            .set_phase_conditions_after_next()
+        game_logic.set_agent_x(Agents.SPY)
+        game_logic.set_agent_x(Agents.DEPUTY, Sides.OPPONENT)
+
+        assert game_logic.state_hash != start, 'hash not changed'
+        games = BatchGame.from_processors([game_logic.proc])
+        assert game_logic.state_hash == int(hash_games(games)[0]), 'wrong hash'
+
+    def test_state_hash_returns_to_same_value(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test hash depends only on state
+        """
+        start = game_logic.state_hash
+
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.DETENTE)
+        assert game_logic.state_hash != start, 'hash not changed'
+
+        game_logic.proc.steps.last = game_logic.proc.steps.c.by_id(Phases.BRIEFING)
+        assert game_logic.state_hash == start, 'wrong hash'
+
+    def test_cached_hash_follows_random_moves(
+        self,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test cached hash is equal to full recompute after random moves
+        """
+        rng = np.random.default_rng(0)
+        game_logic.deal_and_shuffle_decks() \
+            .set_faction(Factions.CIA) \
+            .set_mission_card() \
+            .set_balance()
+
+        for _ in range(60):
+            side = int(rng.integers(2))
+            legal = np.flatnonzero(
+                BatchGame.from_processors([game_logic.proc])
+                .get_legal_actions(side)[0]
+                    )
+            if not legal.size:
+                break
+            before = game_logic.state_hash
+            bot.apply_action(game_logic, int(rng.choice(legal)), Sides(SIDES[side]))
+
+            value = game_logic.state_hash
+            assert game_logic.state_hash == value, 'cached hash changed'
+            games = BatchGame.from_processors([game_logic.proc])
+            assert value == int(hash_games(games)[0]), 'stale hash'
+            assert value != before, 'hash not changed'
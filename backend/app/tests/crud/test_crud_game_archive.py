@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from typing import Any, Generator
+from bson import ObjectId
+from app.crud import crud_game_archive, crud_game_current
+from app.core.logic import GameLogic
+from app.constructs import Factions
+from app.config import settings
+
+
+class TestCRUDArchive:
+    """Test CRUDArchive class
+    """
+
+    def test_archive_finished_games(
+        self,
+        archive: crud_game_archive.CRUDArchive,
+        game: crud_game_current.CRUDGame,
+        game_logic: GameLogic,
+        game_id: str,
+        connection: Generator,
+            ) -> None:
+        """Test finished games are moved to archive
+        """
+        assert archive.archive_games() == 0, 'not finished game is archived'
+
+        game_logic.proc.steps.is_game_ends = True
+        game.save_game_logic(game_logic)
+
+        assert archive.archive_games() == 1, 'wrong count of archived'
+        assert connection['CurrentGameData'].objects().count() == 0, \
+            'game not removed'
+
+        archived = connection['ArchivedGame'].objects().first()
+        assert str(archived.id) == game_id, 'wrong archived id'
+        assert archived.login == settings.user0_login, 'wrong login'
+        assert archived.is_game_ends is True, 'wrong game end'
+
+        games = list(archive.iter_games(login=settings.user0_login))
+        assert len(games) == 1, 'wrong archived games'
+        assert str(games[0]['_id']) == game_id, 'wrong game id'
+        assert len(games[0]['decks']['groups']['current']) == 24, \
+            'wrong game data'
+
+    def test_archive_expired_games(
+        self,
+        archive: crud_game_archive.CRUDArchive,
+        connection: Generator,
+        db_game_data: dict[str, Any],
+            ) -> None:
+        """Test expired games are moved to archive in batches
+        """
+        old = datetime.utcnow() - timedelta(seconds=settings.game_expire_seconds + 60)
+        for _ in range(3):
+            connection['CurrentGameData'](
+                id=ObjectId.from_datetime(old), **db_game_data
+                    ).save()
+            old += timedelta(seconds=1)
+
+        assert archive.archive_games(batch_size=2) == 2, 'wrong batch'
+        assert archive.archive_all(batch_size=2) == 1, 'wrong count of archived'
+        assert connection['CurrentGameData'].objects().count() == 1, \
+            'live game is archived'
+        assert connection['ArchivedGame'].objects().count() == 3, \
+            'wrong archive count'
+
+    def test_changed_game_is_not_deleted(
+        self,
+        monkeypatch,
+        archive: crud_game_archive.CRUDArchive,
+        game: crud_game_current.CRUDGame,
+        game_logic: GameLogic,
+        game_id: str,
+        connection: Generator,
+            ) -> None:
+        """Test game changed after archive snapshot is kept in current games
+        """
+        game_logic.proc.steps.is_game_ends = True
+        game.save_game_logic(game_logic)
+        to_archive = archive._to_archive
+
+        def mock_to_archive(doc: dict[str, Any]) -> dict[str, Any]:
+            connection['CurrentGameData'].objects(id=game_id) \
+                .update_one(set__state_hash='changed', set__steps__game_turn=2)
+            return to_archive(doc)
+
+        monkeypatch.setattr(archive, '_to_archive', mock_to_archive)
+
+        assert archive.archive_games() == 0, 'changed game is archived'
+        current = connection['CurrentGameData'].objects(id=game_id).first()
+        assert current is not None, 'changed game is deleted'
+        assert current.steps.game_turn == 2, 'move is lost'
+
+        monkeypatch.undo()
+        assert archive.archive_games() == 1, 'game is not archived again'
+        assert connection['ArchivedGame'].objects().first().game_turn == 2, \
+            'stale snapshot in archive'
+
+    def test_played_old_game_is_not_archived(
+        self,
+        archive: crud_game_archive.CRUDArchive,
+        connection: Generator,
+        db_game_data: dict[str, Any],
+            ) -> None:
+        """Test game expires by time of last save, not by creation time
+        """
+        now = datetime.utcnow()
+        old = now - timedelta(seconds=settings.game_expire_seconds + 60)
+        connection['CurrentGameData'](
+            id=ObjectId.from_datetime(old), updated_at=now, **db_game_data
+                ).save()
+        connection['CurrentGameData'](
+            id=ObjectId.from_datetime(now), updated_at=old, **db_game_data
+                ).save()
+
+        assert archive.archive_all() == 1, 'wrong count of archived'
+        current = connection['CurrentGameData'].objects().first()
+        assert current.id.generation_time.replace(tzinfo=None) < now, \
+            'played game is archived'
+
+    def test_save_updates_last_save_time(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_logic: GameLogic,
+        game_id: str,
+            ) -> None:
+        """Test saved game has time of last save
+        """
+        start = datetime.utcnow()
+        game_logic.set_faction(Factions.CIA)
+        game.save_game_logic(game_logic)
+
+        updated_at = game.get_game(game_id, settings.user0_login).updated_at
+        assert updated_at is not None and updated_at >= start.replace(
+            microsecond=start.microsecond // 1000 * 1000
+                ), 'time of last save not updated'
+
+    def test_acquire_run(
+        self,
+        archive: crud_game_archive.CRUDArchive,
+        connection: Generator,
+            ) -> None:
+        """Test archive runs in one worker, until its lease expires
+        """
+        assert archive.acquire_run('first', 60) is True, 'lease not taken'
+        assert archive.acquire_run('second', 60) is False, 'lease taken twice'
+        assert archive.acquire_run('first', -1) is True, 'lease not renewed'
+        assert archive.acquire_run('second', 60) is True, 'expired lease not taken'
+        assert archive.acquire_run('first', 60) is False, 'lease taken twice'
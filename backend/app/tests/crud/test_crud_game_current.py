@@ -1,7 +1,9 @@
-from typing import Generator
+from threading import Event, Thread
+from typing import Any, Generator
 from app.crud import crud_game_current
 from app.config import settings
 from app.core.logic import GameLogic
+from app.core.singleflight import SINGLEFLIGHT_COALESCED
 from app.constructs import Phases, Agents, Groups, Objectives
 
 
@@ -91,6 +93,39 @@ class TestCRUDGameCurrent:
         assert connection['CurrentGameData'].objects[0].id != connection['CurrentGameData'].objects[1].id, \
             'not current'
 
+    def test_create_new_game_document(
+        self,
+        game: crud_game_current.CRUDGame,
+            ) -> None:
+        """Test new game is inserted with dealt objectives and state hash
+        """
+        new = game.create_new_game(settings.user0_login)
+        game_logic = GameLogic(game.get_game(str(new.id), settings.user0_login))
+
+        assert len(game_logic.proc.decks.objectives.current) == 21, \
+            'objectives not dealt'
+        assert game_logic.game.state_hash == f'{game_logic.state_hash:016x}', \
+            'wrong state hash'
+        assert game.get_new_game_template()['players']['player']['login'] == '', \
+            'template changed'
+
+    def test_create_new_games(
+        self,
+        game: crud_game_current.CRUDGame,
+        connection: Generator,
+            ) -> None:
+        """Test many games are created with one insert
+        """
+        assert game.create_new_games([]) == [], 'wrong empty'
+
+        ids = game.create_new_games([settings.user0_login, settings.user1_login])
+        assert len(set(ids)) == 2, 'wrong ids'
+        assert connection['CurrentGameData'].objects().count() == 3, \
+            'wrong count of data'
+        second = game.get_game(ids[1], settings.user1_login)
+        assert second is not None, 'wrong login'
+        assert GameLogic(second).game.state_hash is not None, 'no state hash'
+
     def test_save_game_logic(
         self,
         game: crud_game_current.CRUDGame,
@@ -104,3 +139,215 @@ class TestCRUDGameCurrent:
         game.save_game_logic(game_logic)
 
         assert connection['CurrentGameData'].objects().count() == 1, 'wrong count of data'
+
+    def test_get_game_fields(
+        self,
+        game: crud_game_current.CRUDGame,
+            ) -> None:
+        """Test game is loaded only by given parts
+        """
+        new = game.create_new_game(settings.user0_login)
+        partial = game.get_game(
+            str(new.id), settings.user0_login, [crud_game_current.STEPS]
+                )
+        assert partial.players.player.login == settings.user0_login, \
+            'players not loaded'
+        assert partial.decks.objectives.current == [], 'objectives loaded'
+
+        new.modify(state_hash=None)
+        legacy = game.get_game(
+            str(new.id), settings.user0_login, [crud_game_current.STEPS]
+                )
+        assert len(legacy.decks.objectives.current) == 21, \
+            'game without hash not loaded as whole'
+        assert GameLogic(legacy, [crud_game_current.STEPS]).fields is None, \
+            'game without hash is saved by fields'
+
+    def test_save_game_logic_fields(
+        self,
+        game: crud_game_current.CRUDGame,
+            ) -> None:
+        """Test partially loaded game is saved by loaded parts and
+        state hash is hash of whole game
+        """
+        new = game.create_new_game(settings.user0_login)
+        fields = [crud_game_current.STEPS]
+        game_logic = GameLogic(
+            game.get_game(str(new.id), settings.user0_login, fields), fields
+                )
+        game_logic.proc.steps.game_turn = 2
+        game.save_game_logic(game_logic)
+
+        full = GameLogic(game.get_game(str(new.id), settings.user0_login))
+        assert full.proc.steps.game_turn == 2, 'steps not saved'
+        assert len(full.proc.decks.objectives.current) == 21, \
+            'not loaded parts changed'
+        assert full.game.state_hash == f'{full.state_hash:016x}', \
+            'wrong state hash'
+        assert game_logic.game.state_hash == full.game.state_hash, \
+            'state hash of game object not changed'
+
+    def test_save_game_logic_api_view(
+        self,
+        game: crud_game_current.CRUDGame,
+            ) -> None:
+        """Test api view is stored with whole game and cleared by partial save
+        """
+        new = game.create_new_game(settings.user0_login)
+        assert game.get_api_view(str(new.id), settings.user0_login).api_view is None, \
+            'view of new game'
+
+        game_logic = GameLogic(game.get_game(str(new.id), settings.user0_login))
+        game.save_game_logic(game_logic.deal_and_shuffle_decks())
+        stored = game.get_api_view(str(new.id), settings.user0_login)
+        fresh = GameLogic(game.get_game(str(new.id), settings.user0_login))
+        assert stored.api_view == fresh.get_api_scheme().json(), 'wrong view'
+        assert stored.decks.objectives.current == [], 'not projected'
+
+        fields = [crud_game_current.STEPS]
+        game_logic = GameLogic(
+            game.get_game(str(new.id), settings.user0_login, fields), fields
+                )
+        game_logic.proc.steps.game_turn = 2
+        game.save_game_logic(game_logic)
+        assert game.get_api_view(str(new.id), settings.user0_login).api_view is None, \
+            'view not cleared'
+
+    def test_save_api_view(
+        self,
+        game: crud_game_current.CRUDGame,
+            ) -> None:
+        """Test api view is stored only for not changed game
+        """
+        new = game.create_new_game(settings.user0_login)
+        game_logic = GameLogic(game.get_game(str(new.id), settings.user0_login))
+        view = game.save_api_view(game_logic)
+        assert game.get_api_view(str(new.id), settings.user0_login).api_view == view, \
+            'view not stored'
+
+        new.modify(api_view=None, state_hash='0')
+        game.save_api_view(game_logic)
+        assert game.get_api_view(str(new.id), settings.user0_login).api_view is None, \
+            'view of changed game stored'
+
+    def test_save_game_logic_skip_unchanged(
+        self,
+        monkeypatch,
+        game: crud_game_current.CRUDGame,
+        game_logic: GameLogic,
+            ) -> None:
+        """Test unchanged game is not written to db again
+        """
+        game.save_game_logic(game_logic)
+        saved = game.get_last_game(settings.user0_login)
+
+        assert saved.state_hash == f'{game_logic.state_hash:016x}', \
+            'wrong state hash'
+
+        writes = []
+        monkeypatch.setattr(
+            game_logic.game, 'modify', lambda **kwargs: writes.append(kwargs)
+                )
+        game.save_game_logic(game_logic)
+
+        assert writes == [], 'unchanged game is saved'
+
+        game_logic.set_mission_card()
+        game.save_game_logic(game_logic)
+
+        assert len(writes) == 1, 'changed game is not saved'
+
+    def test_get_game(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+            ) -> None:
+        """Test get game by id returns only game of given player
+        """
+        data = game.get_game(game_id, settings.user0_login)
+        assert str(data.id) == game_id, 'wrong game'
+
+        assert game.get_game(game_id, settings.user1_login) is None, \
+            'game of another player'
+        assert game.get_game('wrong_id', settings.user0_login) is None, \
+            'wrong id'
+
+    def test_get_game_coalesced(
+        self,
+        monkeypatch,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+            ) -> None:
+        """Test concurrent loads of game share one fetch, but get own
+        documents
+        """
+        fetch = game._fetch
+        started = Event()
+        release = Event()
+        calls = []
+
+        def mock_fetch(*args, **kwargs) -> Any:
+            calls.append(args)
+            started.set()
+            release.wait(5)
+            return fetch(*args, **kwargs)
+
+        monkeypatch.setattr(game, '_fetch', mock_fetch)
+        coalesced = SINGLEFLIGHT_COALESCED.get('game_load')
+        results = []
+
+        def load() -> None:
+            results.append(game.get_game(game_id, settings.user0_login))
+
+        threads = [Thread(target=load) for _ in range(2)]
+        threads[0].start()
+        started.wait(5)
+        threads[1].start()
+        while SINGLEFLIGHT_COALESCED.get('game_load') == coalesced:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) == 1, 'game fetched twice'
+        assert [str(data.id) for data in results] == [game_id, game_id], \
+            'wrong games'
+        assert results[0] is not results[1], 'document is shared'
+        assert results[0].players.player.agents is not \
+            results[1].players.player.agents, 'document data is shared'
+
+    def test_render_api_view(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+            ) -> None:
+        """Test api view is rendered and stored
+        """
+        view = game.render_api_view(game_id, settings.user0_login)
+        assert game.get_api_view(game_id, settings.user0_login).api_view \
+            == view, 'view not stored'
+        assert game.render_api_view(game_id, settings.user1_login) is None, \
+            'game of another player'
+
+    def test_get_games(
+        self,
+        game: crud_game_current.CRUDGame,
+        game_id: str,
+            ) -> None:
+        """Test get games returns pages of player games, newest first
+        """
+        new_ids = [
+            str(game.create_new_game(settings.user0_login).id) for _ in range(2)
+                ]
+
+        page = game.get_games(settings.user0_login, limit=2)
+        assert [str(data.id) for data in page] == new_ids[::-1], \
+            'wrong first page'
+
+        page = game.get_games(settings.user0_login, after=str(page[-1].id), limit=2)
+        assert [str(data.id) for data in page] == [game_id], 'wrong last page'
+        assert page[0].steps.game_turn == 1, 'wrong game turn'
+
+        assert game.get_games(settings.user1_login) == [], 'wrong player'
+        assert game.get_games(settings.user0_login, after='wrong_id') == [], \
+            'wrong after'
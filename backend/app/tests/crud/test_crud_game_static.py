@@ -46,3 +46,12 @@ class TestCRUDStatic:
         assert data.groups_factions == GroupFactions.get_values(), \
             'wrong groups factions'
         assert data.agents_ids == Agents.get_values(), 'wrong agents'
+
+    def test_get_static_etag(self, static: CRUDStatic) -> None:
+        """Test etag of static data
+        """
+        etag = static.get_static_etag()
+
+        assert etag.startswith('"') and etag.endswith('"'), 'not quoted'
+        assert len(etag) == 42, 'wrong digest'
+        assert static.get_static_etag() == etag, 'etag changed'
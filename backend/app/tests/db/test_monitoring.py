@@ -0,0 +1,52 @@
+from pymongo import monitoring
+from app.db.monitoring import (
+    PoolMetricsListener, POOL_CONNECTIONS, POOL_CHECKED_OUT,
+    POOL_WAIT_SECONDS, POOL_CHECKOUT_FAILED,
+        )
+
+
+class TestPoolMetricsListener:
+    """Test PoolMetricsListener class
+    """
+
+    def test_pool_stats_are_exported(self) -> None:
+        """Test connections, checkouts and wait time are in metrics
+        """
+        address = ('test-pool', 27017)
+        label = 'test-pool:27017'
+        listener = PoolMetricsListener()
+        waits = POOL_WAIT_SECONDS.get_count(label)
+
+        listener.connection_created(
+            monitoring.ConnectionCreatedEvent(address, 1)
+                )
+        assert POOL_CONNECTIONS.get(label) == 1, 'wrong connections'
+
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+                )
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(address, 1)
+                )
+        assert POOL_CHECKED_OUT.get(label) == 1, 'wrong checked out'
+        assert POOL_WAIT_SECONDS.get_count(label) == waits + 1, 'wrong wait'
+
+        listener.connection_checked_in(
+            monitoring.ConnectionCheckedInEvent(address, 1)
+                )
+        assert POOL_CHECKED_OUT.get(label) == 0, 'wrong checked out'
+
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+                )
+        listener.connection_check_out_failed(
+            monitoring.ConnectionCheckOutFailedEvent(address, 'timeout')
+                )
+        assert POOL_CHECKOUT_FAILED.get(label, 'timeout') == 1, \
+            'wrong failed checkout'
+        assert POOL_WAIT_SECONDS.get_count(label) == waits + 2, 'wrong wait'
+
+        listener.connection_closed(
+            monitoring.ConnectionClosedEvent(address, 1, 'idle')
+                )
+        assert POOL_CONNECTIONS.get(label) == 0, 'wrong connections'
@@ -0,0 +1,56 @@
+import pytest
+from pydantic import ValidationError
+from app.config import Settings, settings
+
+
+class TestSettings:
+    """Test Settings class
+    """
+
+    def test_mongodb_connection_kwargs(self) -> None:
+        """Test connection pool options
+        """
+        data = Settings(
+            mongodb_max_pool_size=20,
+            mongodb_min_pool_size=2,
+            mongodb_wait_queue_timeout_ms=500,
+            mongodb_server_selection_timeout_ms=1000,
+            mongodb_compressors=['zstd', 'snappy'],
+            mongodb_write_concern='majority',
+            mongodb_read_preference='primaryPreferred',
+                )
+        assert data.mongodb_connection_kwargs == {
+            'maxPoolSize': 20,
+            'minPoolSize': 2,
+            'waitQueueTimeoutMS': 500,
+            'serverSelectionTimeoutMS': 1000,
+            'compressors': 'zstd,snappy',
+            'w': 'majority',
+            'readPreference': 'primaryPreferred',
+                }, 'wrong connection options'
+
+        data = Settings(mongodb_write_concern=1)
+        assert data.mongodb_connection_kwargs['w'] == 1, 'wrong write concern'
+        assert 'compressors' not in data.mongodb_connection_kwargs, \
+            'wrong compressors'
+
+    @pytest.mark.parametrize("test_input", [
+        {'mongodb_max_pool_size': 0},
+        {'mongodb_max_pool_size': 5, 'mongodb_min_pool_size': 10},
+        {'mongodb_wait_queue_timeout_ms': 0},
+        {'mongodb_compressors': ['lz4']},
+        {'mongodb_write_concern': 'all'},
+        {'mongodb_write_concern': -1},
+        {'mongodb_read_preference': 'anywhere'},
+            ])
+    def test_mongodb_connection_validation(self, test_input: dict) -> None:
+        """Test wrong connection pool options raises error
+        """
+        with pytest.raises(ValidationError):
+            Settings(**test_input)
+
+    def test_default_settings(self) -> None:
+        """Test default connection pool options
+        """
+        assert settings.mongodb_connection_kwargs['maxPoolSize'] == 100, \
+            'wrong default pool size'
@@ -0,0 +1,182 @@
+import os
+import time
+import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+import streamlit as st
+from typing import Any, Optional, Union
+from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.schemas.scheme_game_static import StaticGameData
+
+
+API_ROOT = os.environ.get('API_ROOT')
+if not API_ROOT:
+    raise RuntimeError('Api root uri not set')
+
+API_VERSION: str = "api/v1"
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (
+    float(os.environ.get('API_CONNECT_TIMEOUT', 3.05)),
+    float(os.environ.get('API_READ_TIMEOUT', 30)),
+        )
+POOL_SIZE = int(os.environ.get('API_POOL_SIZE', 10))
+RETRIES = int(os.environ.get('API_RETRIES', 3))
+# seconds while cached static data is used without revalidation
+STATIC_MAX_AGE = float(os.environ.get('API_STATIC_MAX_AGE', 300))
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Get keep-alive session shared by all reruns and users. Idempotent
+    requests are retried on connection errors and gateway errors.
+
+    Returns:
+        requests.Session: session with connection pool
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        raise_on_status=False,
+            )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry,
+            )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Get thread pool for concurrent requests shared by all reruns
+    and users. Threads only send requests, widgets are drawn by
+    script thread.
+
+    Returns:
+        ThreadPoolExecutor: thread pool
+    """
+    return ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='api')
+
+
+def request(
+    method: str,
+    path: str,
+    token: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    **kwargs: Any,
+        ) -> Response:
+    """Send request to api
+
+    Args:
+        method (str): http method
+        path (str): path after api version, i.e. 'game/create'
+        token (str, optional): access token
+        session (requests.Session, optional): session. Default to
+                                              shared session
+        kwargs: other arguments of requests.Session.request
+
+    Returns:
+        Response: response object
+    """
+    headers = kwargs.pop('headers', {})
+    if token is not None:
+        headers['Authorization'] = f'Bearer {token}'
+    session = get_session() if session is None else session
+    return session.request(
+        method,
+        os.path.join(API_ROOT, API_VERSION, path),
+        headers=headers,
+        timeout=TIMEOUT,
+        **kwargs,
+            )
+
+
+def submit_request(
+    method: str,
+    path: str,
+    token: Optional[str] = None,
+    **kwargs: Any,
+        ) -> 'Future[Response]':
+    """Send request to api in background thread
+
+    Args:
+        method (str): http method
+        path (str): path after api version, i.e. 'game/create'
+        token (str, optional): access token
+        kwargs: other arguments of requests.Session.request
+
+    Returns:
+        Future[Response]: future of response object
+    """
+    return get_executor().submit(
+        request, method, path, token, get_session(), **kwargs
+            )
+
+
+@st.cache_resource
+def _static_cache() -> dict[str, Any]:
+    """Cache of static data shared by all reruns and users
+
+    Returns:
+        dict[str, Any]: etag, data and time of last check
+    """
+    return {}
+
+
+def get_static_data() -> Union[StaticGameData, Response]:
+    """Get static data. Cached data is revalidated with conditional GET
+    not often than once in STATIC_MAX_AGE seconds, so body is sent
+    again only if cards data is changed.
+
+    Returns:
+        Union[StaticGameData, Response]: static data or response
+                                         object with api error
+    """
+    return _get_static_data(get_session(), _static_cache())
+
+
+def submit_static_data() -> 'Future[Union[StaticGameData, Response]]':
+    """Start static data request in background, so it is sent together
+    with requests of script thread. Future is done at once if cached data
+    is fresh.
+
+    Returns:
+        Future[Union[StaticGameData, Response]]: future of
+                                                 get_static_data result
+    """
+    cache = _static_cache()
+    if cache and time.monotonic() - cache['checked'] < STATIC_MAX_AGE:
+        future: Future = Future()
+        future.set_result(cache['data'])
+        return future
+    return get_executor().submit(_get_static_data, get_session(), cache)
+
+
+def _get_static_data(
+    session: requests.Session,
+    cache: dict[str, Any],
+        ) -> Union[StaticGameData, Response]:
+    now = time.monotonic()
+    if cache and now - cache['checked'] < STATIC_MAX_AGE:
+        return cache['data']
+
+    headers = {'If-None-Match': cache['etag']} if cache.get('etag') else {}
+    r = request('get', 'game/data/static', session=session, headers=headers)
+    if r.status_code == 304 and cache:
+        cache['checked'] = now
+    elif r.status_code == 200:
+        cache.update(
+            etag=r.headers.get('ETag'),
+            data=StaticGameData(**r.json()),
+            checked=now,
+                )
+    else:
+        return r
+    return cache['data']
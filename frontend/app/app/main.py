@@ -1,24 +1,33 @@
 import streamlit as st
-import requests, os, time
-import streamlit_nested_layout
 from typing import Literal, Optional
-from requests import Response
+from concurrent.futures import Future
+from requests import RequestException, Response
 from streamlit.delta_generator import DeltaGenerator
+from app import api, rules
+from app.constructs import Factions
 from app.schemas.scheme_game_current_api import (
-    CurrentGameDataApi, GroupsDeck, ObjectivesDeck
+    CurrentGameDataApi, GroupsDeck, ObjectivesDeck, GamesList, LegalActions
         )
-from app.schemas.scheme_game_static import StaticGameData, Objective
-from app.constructs import Phases, Factions
+from app.schemas.scheme_game_static import Objective
 
 
-API_ROOT = os.environ.get('API_ROOT')
-if not API_ROOT:
-    raise RuntimeError('Api root uri not set')
+st.set_page_config(page_title='Dashboard', layout="wide")
 
-API_VERSION: str = "api/v1"
 
+def get_error_detail(r: Response) -> str:
+    """Get error detail from response. Responses of proxy or crashed
+    server can have not json body.
 
-st.set_page_config(page_title='Dashboard', layout="wide")
+    Args:
+        r (Response): response object
+
+    Returns:
+        str: error detail
+    """
+    try:
+        return str(r.json()['detail'])
+    except (ValueError, KeyError, TypeError):
+        return f'{r.status_code} {r.reason}'
 
 
 def show_api_error(r: Response) -> None:
@@ -27,7 +36,7 @@ def show_api_error(r: Response) -> None:
     Args:
         r (Response): response object
     """
-    st.write(r.json()['detail'])
+    st.write(get_error_detail(r))
     st.stop()
 
 
@@ -35,28 +44,104 @@ def get_current_data() -> None:
     """Request for current data
     """
     token = st.session_state.get('access_token')
-    url = os.path.join(API_ROOT, API_VERSION, 'game/data/current')
-    r = requests.post(
-        url,
-        headers={
-            'Authorization': f'Bearer {token}'
-                }
-            )
+    game_id = st.session_state.get('game_id')
+    r = api.request('post', f'game/data/current/{game_id}', token)
     if r.status_code == 200:
         st.session_state['current'] = CurrentGameDataApi(**r.json())
     else:
         show_api_error(r)
 
 
-def get_static_data() -> None:
-    """Request for static data
+def get_static_data(static: Future) -> None:
+    """Wait for static data request. Data is cached between reruns and
+    revalidated by etag.
+
+    Args:
+        static (Future): future of static data request
+    """
+    data = static.result()
+    if isinstance(data, Response):
+        show_api_error(data)
+    st.session_state['static'] = data
+
+
+def get_state_version() -> Optional[str]:
+    """Get state version of current game data
+
+    Returns:
+        str, optional: version or None, if game isn't loaded
+    """
+    current = st.session_state.get('current')
+    return None if current is None else current.state_version
+
+
+def rerun_if_changed() -> None:
+    """Rerun whole app if game state is changed since last full run.
+    Otherwise only calling fragment is rerendered, so panels with
+    unchanged data are not redrawn and current data is not requested.
+    """
+    if get_state_version() != st.session_state.get('state_version'):
+        st.rerun()
+
+
+def move(
+    path: str,
+    predicted: Optional[CurrentGameDataApi],
+    text: Optional[str] = None,
+    **kwargs,
+        ) -> None:
+    """Send move to server and show predicted game data at once.
+    Server response is reconciled in the end of next run. If move isn't
+    legal by local rules, server is asked directly to get error detail.
+
+    Args:
+        path (str): path of move after api version
+        predicted (CurrentGameDataApi, optional): predicted game data
+        text (str, optional): text of coin shown while move is pending
+        kwargs: other arguments of request
+    """
+    token = st.session_state.get('access_token')
+    if predicted is None:
+        r = api.request('patch', path, token, **kwargs)
+        if r.status_code == 200:
+            get_current_data()
+            rerun_if_changed()
+        else:
+            show_api_error(r)
+        return
+
+    st.session_state['pending'] = {
+        'future': api.submit_request('patch', path, token, **kwargs),
+        'rollback': st.session_state.current,
+        'text': text,
+            }
+    st.session_state['current'] = predicted
+    st.rerun()
+
+
+def reconcile_move() -> None:
+    """Wait for server response to predicted move. Predicted data is
+    replaced by server state or rolled back if move is rejected or
+    request failed.
     """
-    url = os.path.join(API_ROOT, API_VERSION, 'game/data/static')
-    r = requests.get(url)
+    pending = st.session_state.pop('pending', None)
+    if pending is None:
+        return
+
+    try:
+        r = pending['future'].result()
+    except RequestException as exc:
+        st.session_state['current'] = pending['rollback']
+        st.session_state['move_error'] = f'Server is not available: {exc}'
+        rerun_if_changed()
+        return
+
     if r.status_code == 200:
-        st.session_state['static'] = StaticGameData(** r.json())
+        get_current_data()
     else:
-        show_api_error(r)
+        st.session_state['current'] = pending['rollback']
+        st.session_state['move_error'] = get_error_detail(r)
+    rerun_if_changed()
 
 
 def show_current_data() -> None:
@@ -152,14 +237,29 @@ def start_new_game() -> None:
     """Start new game
     """
     token = st.session_state.get('access_token')
-    url = os.path.join(API_ROOT, API_VERSION, 'game/create')
-    r = requests.post(
-        url,
-        headers={
-            'Authorization': f'Bearer {token}'
-                }
-            )
-    if r.status_code != 201:
+    r = api.request('post', 'game/create', token)
+    if r.status_code == 201:
+        st.session_state['game_id'] = r.json()['id']
+    else:
+        show_api_error(r)
+
+
+def load_last_game() -> bool:
+    """Find last game of player
+
+    Returns:
+        bool: is game found
+    """
+    token = st.session_state.get('access_token')
+    r = api.request('get', 'game/list', token, params={'limit': 1})
+    if r.status_code == 200:
+        games = GamesList(**r.json()).games
+        if games:
+            st.session_state['game_id'] = games[0].id
+            return True
+        st.caption('No games found. Start new game.')
+        return False
+    else:
         show_api_error(r)
 
 
@@ -175,10 +275,10 @@ def show_log_in(holder: DeltaGenerator) -> None:
         submit = st.form_submit_button(label='login')
 
         if submit:
-            url = os.path.join(API_ROOT, API_VERSION, 'user/login')
-            r = requests.post(
-                url,
-                headers = {
+            r = api.request(
+                'post',
+                'user/login',
+                headers={
                     'accept': 'application/json',
                     'Content-Type': 'application/x-www-form-urlencoded',
                         },
@@ -207,7 +307,7 @@ def show_autorized() -> None:
         logout = st.button("logout")
     st.markdown("---")
 
-    if load_game:
+    if load_game and load_last_game():
         get_current_data()
 
     if new_game:
@@ -217,16 +317,16 @@ def show_autorized() -> None:
     if logout:
         st.session_state['access_token'] = None
         st.session_state['login'] = None
+        st.session_state['game_id'] = None
         st.session_state['current'] = None
-        st.experimental_rerun()
+        st.rerun()
 
 
-def show_choose_side(holder: DeltaGenerator) -> None:
+@st.fragment
+def show_choose_side() -> None:
     """Choise side scenario
-
-    Args:
-        holder (DeltaGenerator): holder for change and clear displayed data
     """
+    rerun_if_changed()
     st.subheader("Choose your faction")
     choice = st.radio(
         label='Choose your faction:',
@@ -238,19 +338,12 @@ def show_choose_side(holder: DeltaGenerator) -> None:
     st.markdown("---")
 
     if push and choice:
-        token = st.session_state.get('access_token')
-        url = os.path.join(API_ROOT, API_VERSION, f'game/preset?q={choice}')
-        r = requests.patch(
-            url,
-            headers={
-                'Authorization': f'Bearer {token}'
-                    }
+        game_id = st.session_state.get('game_id')
+        move(
+            f'game/{game_id}/preset',
+            rules.predict_preset(st.session_state.current, Factions(choice)),
+            params={'q': choice},
                 )
-        if r.status_code == 200:
-            get_current_data()
-            holder.empty()
-        else:
-            show_api_error(r)
 
 
 def show_coin(holder: DeltaGenerator, text: str) -> None:
@@ -273,60 +366,50 @@ def show_coin(holder: DeltaGenerator, text: str) -> None:
             )
 
 
-def next_step(
-    step: Literal['turn', 'phase'],
-    holder: DeltaGenerator
-        ) -> None:
+def next_step(step: Literal['turn', 'phase']) -> None:
     """Get next phase or turn
 
     Args:
         step (str): typo of next
-        holder (DeltaGenerator): holder for change and clear displayed data
     """
-    token = st.session_state.get('access_token')
-    url = os.path.join(API_ROOT, API_VERSION, f'game/next_{step}')
-    r = requests.patch(
-        url,
-        headers={
-            'Authorization': f'Bearer {token}'
-                }
-            )
-    if r.status_code == 200:
-        text = "-> go to next turn" if step == 'turn' else "-> go to the next phase"
-        show_coin(holder, text)
-        time.sleep(2)
-        holder.empty()
-        get_current_data()
+    game_id = st.session_state.get('game_id')
+    current = st.session_state.current
+    if step == 'turn':
+        predicted = rules.predict_next_turn(current)
+        text = "-> go to next turn"
     else:
-        show_api_error(r)
+        predicted = rules.predict_next_phase(current)
+        text = "-> go to the next phase"
+    move(f'game/{game_id}/next_{step}', predicted, text)
 
 
-def show_next(holder: DeltaGenerator):
+@st.fragment
+def show_next():
     """Show next turn/phase scenario
     """
+    rerun_if_changed()
+    pending = st.session_state.get('pending')
+    if pending is not None and pending['text'] is not None:
+        show_coin(st.empty(), pending['text'])
     col1, col2, _ = st.columns([1, 1, 2])
 
-    phase: Phases = st.session_state.current.steps.turn_phase
-    faction: Optional[Factions] = st.session_state.current.players.player.faction
-
-    p = False if phase != Phases.DETENTE.value and faction is not None else True
-    t = False if phase == Phases.DETENTE.value else True
+    actions: LegalActions = st.session_state.current.actions
 
     with col1:
-        st.button(
+        phase = st.button(
             'next phase',
-            disabled=p,
-            on_click=next_step,
-            args=('phase', holder)
+            disabled=not actions.next_phase,
+            help='\n\n'.join(actions.phase_blockers) or None,
                 )
     with col2:
-        st.button(
+        turn = st.button(
             'next turn',
-            disabled=t,
-            on_click=next_step,
-            args=('turn', holder)
+            disabled=not actions.next_turn,
                 )
 
+    if phase or turn:
+        next_step('phase' if phase else 'turn')
+
 
 def show_special_cards_of_opponent():
 
@@ -343,7 +426,9 @@ def show_special_cards_of_opponent():
                 st.caption(b[1])
 
 
+@st.fragment
 def show_special_cards_of_player():
+    rerun_if_changed()
 
     buttons = zip(
         st.columns([1, 1, 1, 1, 1, 1]),
@@ -358,22 +443,17 @@ def show_special_cards_of_player():
 
 def main():
 
-    get_static_data()
+    # static data is loaded while current data is requested
+    static = api.submit_static_data()
 
     left, right = st.columns([3, 1], gap='medium')
 
-    with left:
-        st.header("Opponent")
-        if st.session_state.get('current') is not None:
-            show_special_cards_of_opponent()
-        st.markdown("---")
-        st.markdown("---")
-        st.header("Player")
-        if st.session_state.get('current') is not None:
-            show_special_cards_of_player()
-
     with right:
 
+        error = st.session_state.pop('move_error', None)
+        if error is not None:
+            st.write(error)
+
         holder1 = st.empty()
         with holder1.container():
             if st.session_state.get('access_token') is None:
@@ -382,18 +462,38 @@ def main():
         if st.session_state.get('access_token'):
             show_autorized()
 
+        # fragments rerun whole app only if state is changed after this
+        st.session_state['state_version'] = get_state_version()
+
+        if st.session_state.get('access_token'):
             if st.session_state.get('current') is not None \
                     and st.session_state.current.players.player.faction is None:
-                holder2 = st.empty()
-                with holder2.container():
-                    show_choose_side(holder2)
+                show_choose_side()
 
             if st.session_state.get('current') is not None:
-                holder3 = st.empty()
                 show_current_data()
-                show_objectives()
-                show_groups()
-                show_next(holder3)
+
+    get_static_data(static)
+
+    with left:
+        st.header("Opponent")
+        if st.session_state.get('current') is not None:
+            show_special_cards_of_opponent()
+        st.markdown("---")
+        st.markdown("---")
+        st.header("Player")
+        if st.session_state.get('current') is not None:
+            show_special_cards_of_player()
+
+    with right:
+
+        if st.session_state.get('access_token') \
+                and st.session_state.get('current') is not None:
+            show_objectives()
+            show_groups()
+            show_next()
+
+    reconcile_move()
 
 
 if __name__ == '__main__':
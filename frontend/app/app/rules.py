@@ -0,0 +1,235 @@
+from typing import Callable, NamedTuple, Optional
+from app.schemas.scheme_game_current_api import CurrentGameDataApi, LegalActions
+from app.constructs import Phases, Agents, Factions
+
+
+# Mirror of backend app.core.phases rules, that is checked on api scheme.
+# Effects change only data visible to player, other changes are
+# got from server after move.
+
+class Guard(NamedTuple):
+    """Condition, that must be true to push phase to next
+    """
+    check: Callable[[CurrentGameDataApi], bool]
+    detail: str
+
+
+class PhaseRule(NamedTuple):
+    """Phase transition rule
+    """
+    phase: Phases
+    next: Optional[Phases]
+    guards: tuple[Guard, ...]
+    effect: Optional[Callable[[CurrentGameDataApi], None]]
+
+
+GAME_GUARDS = (
+    Guard(
+        lambda data: data.steps.is_game_ends is not True,
+        "Something can't be changed, because game is end"
+            ),
+        )
+
+BRIEFING_GUARDS = (
+    Guard(
+        lambda data: data.players.player.faction is not None
+        and data.players.opponent.faction is not None,
+        "Faction not choosen. Use game/reset/faction to set faction."
+            ),
+    Guard(
+        lambda data: data.decks.objectives.mission is not None,
+        "Mission card undefined. Cant push to next phase."
+            ),
+    Guard(
+        lambda data: data.players.player.has_balance
+        is not data.players.opponent.has_balance,
+        "No one side has balance. Cant push to next phase."
+            ),
+    Guard(
+        lambda data: Agents.ANALYST not in data.players.player.awaiting_abilities,
+        "Analyst ability must be used by player."
+            ),
+    Guard(
+        lambda data: Agents.ANALYST not in data.players.opponent.awaiting_abilities,
+        "Analyst ability must be used by opponent."
+            ),
+        )
+
+PLANNING_GUARDS = (
+    Guard(
+        lambda data: data.players.player.agents.agent_x is not None,
+        "Agent for player not choosen."
+            ),
+    Guard(
+        lambda data: data.players.opponent.agents.agent_x is not None,
+        "Agent for opponent not choosen."
+            ),
+        )
+
+INFLUENCE_GUARDS = (
+    Guard(
+        lambda data: data.players.player.influence_pass is True
+        and data.players.opponent.influence_pass is True,
+        "Both side must pass in group subgame before next phase."
+            ),
+        )
+
+DETENTE_GUARDS = (
+    Guard(
+        lambda data: False,
+        "This phase is last in a turn. Change turn number "
+        "before get next phase"
+            ),
+        )
+
+PENDING = 'Waiting for server.'
+
+
+def enter_influence(data: CurrentGameDataApi) -> None:
+    """Return all agents from leave
+    """
+    agents = data.players.player.agents
+    agents.in_headquarter = [
+        agent for agent in agents.in_headquarter if agent not in agents.on_leave
+            ]
+    agents.on_leave = []
+
+
+def enter_ceasefire(data: CurrentGameDataApi) -> None:
+    """Clear influence struggle pass
+    """
+    data.players.player.influence_pass = False
+    data.players.opponent.influence_pass = False
+
+
+def enter_detente(data: CurrentGameDataApi) -> None:
+    """Put agents of player from play to leave
+    """
+    agents = data.players.player.agents
+    agents.agent_x = None
+    if Agents.DEPUTY not in agents.in_headquarter:
+        agents.in_headquarter.append(Agents.DEPUTY)
+    agents.on_leave = [
+        agent for agent in Agents
+        if agent != Agents.DEPUTY or agent in agents.on_leave
+            ]
+
+
+PHASE_RULES: dict[str, PhaseRule] = {
+    rule.phase.value: rule for rule in (
+        PhaseRule(Phases.BRIEFING, Phases.PLANNING, BRIEFING_GUARDS, None),
+        PhaseRule(Phases.PLANNING, Phases.INFLUENCE, PLANNING_GUARDS, None),
+        PhaseRule(
+            Phases.INFLUENCE, Phases.CEASEFIRE, INFLUENCE_GUARDS, enter_influence
+                ),
+        PhaseRule(Phases.CEASEFIRE, Phases.DEBRIFIENG, (), enter_ceasefire),
+        PhaseRule(Phases.DEBRIFIENG, Phases.DETENTE, (), None),
+        PhaseRule(Phases.DETENTE, None, DETENTE_GUARDS, enter_detente),
+            )
+        }
+
+
+def _get_rule(phase: Optional[Phases]) -> Optional[PhaseRule]:
+    return None if phase is None else PHASE_RULES.get(Phases(phase).value)
+
+
+def get_phase_blockers(data: CurrentGameDataApi) -> list[str]:
+    """Get all reasons, why phase can't be pushed to next
+
+    Args:
+        data (CurrentGameDataApi): current game data
+
+    Returns:
+        list[str]: details of failed phase guards
+    """
+    rule = _get_rule(data.steps.turn_phase)
+    guards = GAME_GUARDS if rule is None else GAME_GUARDS + rule.guards
+    return [guard.detail for guard in guards if not guard.check(data)]
+
+
+def _pending(data: CurrentGameDataApi) -> CurrentGameDataApi:
+    """Block all actions until server state is received
+    """
+    data.actions = LegalActions(
+        preset=False,
+        next_turn=False,
+        next_phase=False,
+        phase_blockers=[PENDING],
+        analyst_look=False,
+        analyst_arrange=False,
+        agent_x=[],
+        recruit=False,
+        pass_influence=False,
+        nuclear_escalation=False,
+            )
+    data.state_version = None
+    return data
+
+
+def predict_next_phase(data: CurrentGameDataApi) -> Optional[CurrentGameDataApi]:
+    """Predict game data after push to next phase
+
+    Args:
+        data (CurrentGameDataApi): current game data
+
+    Returns:
+        CurrentGameDataApi, optional: predicted data or None,
+                                      if move is not legal
+    """
+    if get_phase_blockers(data):
+        return None
+    data = data.copy(deep=True)
+    steps = data.steps
+    if steps.turn_phase != Phases.DETENTE and steps.turn_phases_left:
+        # phases left are not ordered in api, next phase is first by order
+        order = list(Phases)
+        steps.turn_phase = min(steps.turn_phases_left, key=order.index)
+        steps.turn_phases_left.remove(steps.turn_phase)
+        rule = _get_rule(steps.turn_phase)
+        if rule is not None and rule.effect is not None:
+            rule.effect(data)
+    return _pending(data)
+
+
+def predict_next_turn(data: CurrentGameDataApi) -> Optional[CurrentGameDataApi]:
+    """Predict game data after push to next turn
+
+    Args:
+        data (CurrentGameDataApi): current game data
+
+    Returns:
+        CurrentGameDataApi, optional: predicted data or None,
+                                      if move is not legal
+    """
+    if data.steps.is_game_ends is True or data.steps.turn_phase != Phases.DETENTE:
+        return None
+    data = data.copy(deep=True)
+    phases = list(Phases)
+    data.steps.game_turn += 1
+    data.steps.turn_phase = phases[0]
+    data.steps.turn_phases_left = phases[1:]
+    return _pending(data)
+
+
+def predict_preset(
+    data: CurrentGameDataApi,
+    faction: Factions,
+        ) -> Optional[CurrentGameDataApi]:
+    """Predict game data after faction is chosen. Mission card is
+    dealt by server.
+
+    Args:
+        data (CurrentGameDataApi): current game data
+        faction (Factions): player faction
+
+    Returns:
+        CurrentGameDataApi, optional: predicted data or None,
+                                      if move is not legal
+    """
+    if data.players.player.faction is not None:
+        return None
+    data = data.copy(deep=True)
+    data.players.player.faction = faction
+    data.players.opponent.faction = Factions.KGB \
+        if faction == Factions.CIA else Factions.CIA
+    return _pending(data)